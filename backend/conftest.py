@@ -0,0 +1,4 @@
+"""
+Общая конфигурация pytest (тесты - в tests/, запуск: make test)
+"""
+pytest_plugins = ["core.pytest_plugin"]
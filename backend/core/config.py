@@ -3,7 +3,7 @@
 Согласно rules.md: использование переменных окружения, безопасность
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -41,13 +41,91 @@ class Settings(BaseSettings):
     # Redis (для rate limiting и refresh tokens)
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Rate limiting
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (один воркер) | redis (несколько воркеров)
+    RATE_LIMIT_DEFAULT: str = "200/hour"  # Общий лимит на путь для пользователя/адреса
+    
     # Загрузка файлов (согласно rules.md)
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "/var/uploads"  # Вне /static
+
+    # Аватары детей (services/media_service.py): стороны квадратных превью WebP, пикселей
+    AVATAR_SIZES: List[int] = [64, 128, 256]
+    AVATAR_MAX_PIXELS: int = 40_000_000  # Защита от decompression bomb
+    MEDIA_WORKERS: int = 2  # Процессы для уменьшения изображений
+    
+    # Идемпотентность мутирующих запросов (заголовок Idempotency-Key)
+    IDEMPOTENCY_BACKEND: str = "postgres"  # postgres | redis
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60  # Сколько хранить ответ для повторов
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # Сколько держать ключ захваченным, пока запрос выполняется
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 64 * 1024  # Ответы больше не кэшируются
+    
+    # Копилка: контрольная точка баланса после N операций журнала
+    PIGGY_SNAPSHOT_INTERVAL: int = 100
+    
+    # Хранение растущих таблиц, дней (старше - выгрузка в ARCHIVE_DIR, services/archive_service.py)
+    # star_history, notifications - месячные партиции: отсоединяются и выгружаются целиком
+    # piggy_history - удаляются только строки, покрытые снимком баланса; refresh_tokens - без выгрузки
+    HISTORY_RETENTION_DAYS: Dict[str, int] = {
+        "star_history": 365,
+        "notifications": 180,
+        "piggy_history": 730,
+        "refresh_tokens": 90,
+    }
+    PARTITIONS_AHEAD_MONTHS: int = 3  # Сколько будущих месячных партиций держать созданными
+    ARCHIVE_DIR: str = "/var/archive"  # Выгрузки партиций и журнала (CSV, gzip)
+    
+    # Фоновые задачи обслуживания в процессе приложения (core/scheduler.py)
+    # Каждую задачу выполняет один воркер: advisory-блокировка Postgres + отметка запуска в scheduled_jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_JITTER_SECONDS: int = 30  # Случайная задержка старта, чтобы воркеры не стучались в БД разом
+    SCHEDULER_SCHEDULES: Dict[str, str] = {}  # Переопределение расписаний: {"history_archive": "30 4 * * *"}
+    
+    # Доставка уведомлений (services/notification_delivery.py): запрос только пишет строку PENDING,
+    # воркеры арендуют пачки (FOR UPDATE SKIP LOCKED + next_attempt_at = now() + аренда), доставляют
+    # вне транзакции и повторяют с экспоненциальной задержкой
+    NOTIFICATION_DELIVERY_ENABLED: bool = True
+    NOTIFICATION_WORKERS: int = 2  # asyncio-воркеров на процесс
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_POLL_INTERVAL: float = 1.0  # Пауза, если очередь пуста, секунд
+    NOTIFICATION_LEASE_SECONDS: int = 600  # Аренда пачки: больше BATCH_SIZE x таймаут канала (SMTP - 10 с)
+    NOTIFICATION_MAX_ATTEMPTS: int = 8  # После - FAILED
+    NOTIFICATION_RETRY_BASE_SECONDS: int = 30  # Задержка повтора: base * 2^(попытка - 1), не больше max
+    NOTIFICATION_RETRY_MAX_SECONDS: int = 3600
+    NOTIFICATION_CHANNEL: str = "log"  # log | file (JSON Lines, тесты и локально) | smtp
+    NOTIFICATION_FILE_PATH: str = "/var/log/dnevnik/notifications.jsonl"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_FROM: str = "noreply@dnevnik-uspekha.ru"
+    
+    # Сводки активности детей (services/notification_digest.py): события копятся в буфере
+    # и раз в час/день превращаются в одно уведомление родителю
+    NOTIFICATION_DIGEST_BACKEND: str = "memory"  # memory (один воркер) | redis (несколько воркеров)
+    NOTIFICATION_DIGEST_DEFAULT_FREQUENCY: str = "hourly"  # hourly | daily | off, если семья не выбрала
+    NOTIFICATION_DIGEST_MAX_EVENTS: int = 200  # Событий в буфере на родителя (старые отбрасываются)
+    
+    # Кэш согласий родителей для check_parent_consent (core/consent_cache.py)
+    CONSENT_CACHE_BACKEND: str = "memory"  # memory | redis (общий для воркеров)
+    CONSENT_CACHE_TTL_SECONDS: int = 60 * 60  # Согласие дано (Redis)
+    CONSENT_CACHE_NEGATIVE_TTL_SECONDS: int = 30  # Согласия нет: короткий кэш от повторных запросов
+    CONSENT_CACHE_LOCAL_TTL_SECONDS: int = 60  # В памяти процесса: предел устаревания в других воркерах
+    CONSENT_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Метрики Prometheus (GET /metrics): доступ только из этих сетей
+    METRICS_ENABLED: bool = True
+    METRICS_ALLOWED_NETWORKS: List[str] = ["127.0.0.0/8", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "::1/128"]
+    
+    # Бюджет SQL-запросов на HTTP-запрос и поиск N+1 (core/query_budget.py)
+    QUERY_BUDGET_MODE: str = "off"  # off (продакшен) | log | raise (тесты)
+    QUERY_REPEAT_THRESHOLD: int = 5  # Больше N одинаковых по форме запросов за запрос - N+1
     
     # Логирование
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # Согласно rules.md: JSON логи
+    LOG_PROFILE: str = "default"  # default | hot_path_quiet (auth/middleware только WARNING, access-логи 10%)
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # Доля записей ниже WARNING по логгеру, например {"uvicorn.access": 0.1}
+    LOG_QUEUE_SIZE: int = 10000  # При переполнении записи отбрасываются, а не блокируют event loop
+    LOG_BATCH_SIZE: int = 256  # Записей на один write в stdout
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,111 @@
+"""
+Кэш согласий родителей (check_parent_consent в core/dependencies.py)
+Согласие меняется редко, а проверяется в каждом мутирующем запросе ребёнка: результат
+запроса к parent_consents кэшируется по child_id
+- в памяти процесса (LRU, CONSENT_CACHE_LOCAL_TTL_SECONDS - предел устаревания между воркерами)
+- и, если CONSENT_CACHE_BACKEND=redis, в Redis (общий для воркеров, CONSENT_CACHE_TTL_SECONDS)
+Запись согласия (create_parent_consent) пишет новое значение в кэш после коммита (write-through, set).
+Значение, прочитанное из БД проверкой, кладётся только если ключа ещё нет (populate: SET NX и
+локально - setdefault): чтение, начатое до отзыва согласия, не перетирает записанный отзыв.
+Отсутствие согласия кэшируется на короткое CONSENT_CACHE_NEGATIVE_TTL_SECONDS: ребёнок без согласия
+не делает запрос к БД на каждый вызов, а только что данное согласие видно быстро и в других воркерах
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConsentCache:
+    """Двухуровневый кэш: child_id -> согласие дано (True/False)"""
+
+    KEY_PREFIX = "consent:"
+
+    def __init__(self, redis_url: Optional[str] = None, use_redis: Optional[bool] = None):
+        self._local: "OrderedDict[int, Tuple[bool, float]]" = OrderedDict()
+        if use_redis is None:
+            use_redis = settings.CONSENT_CACHE_BACKEND == "redis"
+        self.redis = None
+        if use_redis:
+            import redis.asyncio as aioredis
+            self.redis = aioredis.from_url(redis_url or settings.REDIS_URL)
+
+    @staticmethod
+    def _ttl(given: bool) -> int:
+        return settings.CONSENT_CACHE_TTL_SECONDS if given else settings.CONSENT_CACHE_NEGATIVE_TTL_SECONDS
+
+    def _local_live(self, child_id: int) -> bool:
+        entry = self._local.get(child_id)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def _set_local(self, child_id: int, given: bool) -> None:
+        ttl = min(self._ttl(given), settings.CONSENT_CACHE_LOCAL_TTL_SECONDS)
+        self._local[child_id] = (given, time.monotonic() + ttl)
+        self._local.move_to_end(child_id)
+        while len(self._local) > settings.CONSENT_CACHE_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def get(self, child_id: int) -> Optional[bool]:
+        """Закэшированное значение или None (нужен запрос к БД)"""
+        entry = self._local.get(child_id)
+        if entry is not None:
+            given, expires_at = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(child_id)
+                return given
+            del self._local[child_id]
+
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(f"{self.KEY_PREFIX}{child_id}")
+        except Exception:
+            # Redis недоступен: проверка идёт в БД, запрос не падает
+            logger.warning("Кэш согласий: Redis недоступен", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        given = raw == b"1"
+        self._set_local(child_id, given)
+        return given
+
+    async def populate(self, child_id: int, given: bool) -> None:
+        """Значение, прочитанное из БД: только если в кэше его ещё нет (не перетирает write-through)"""
+        if self.redis is not None:
+            key = f"{self.KEY_PREFIX}{child_id}"
+            try:
+                if not await self.redis.set(key, b"1" if given else b"0", ex=self._ttl(given), nx=True):
+                    # Ключ уже записан (в том числе отзыв согласия): локально - значение из Redis
+                    raw = await self.redis.get(key)
+                    if raw is not None:
+                        given = raw == b"1"
+            except Exception:
+                logger.warning("Кэш согласий: запись в Redis не удалась", exc_info=True)
+                return
+        if not self._local_live(child_id):
+            self._set_local(child_id, given)
+
+    async def set(self, child_id: int, given: bool) -> None:
+        """Запись значения после коммита изменения согласия (write-through, перезаписывает кэш)"""
+        self._set_local(child_id, given)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(f"{self.KEY_PREFIX}{child_id}", b"1" if given else b"0", ex=self._ttl(given))
+        except Exception:
+            logger.warning("Кэш согласий: запись в Redis не удалась", exc_info=True)
+
+
+_cache: Optional[ConsentCache] = None
+
+
+def get_consent_cache() -> ConsentCache:
+    """Кэш по настройке CONSENT_CACHE_BACKEND (один на процесс)"""
+    global _cache
+    if _cache is None:
+        _cache = ConsentCache()
+    return _cache
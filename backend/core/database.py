@@ -5,6 +5,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from core.config import settings
+from core.metrics import instrument_engine
 
 # Создание async engine
 engine = create_async_engine(
@@ -13,6 +14,9 @@ engine = create_async_engine(
     future=True
 )
 
+# Метрики: число и время SQL-запросов (core/metrics.py)
+instrument_engine(engine)
+
 # Создание async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -12,6 +12,7 @@ from repositories.user_repository import UserRepository
 from repositories.child_repository import ChildRepository
 from repositories.subscription_repository import ParentConsentRepository
 from core.exceptions import ForbiddenError
+from core.consent_cache import get_consent_cache
 from models.user import UserRole
 
 security = HTTPBearer(auto_error=False)  # Отключаем автоматическую ошибку для отладки
@@ -43,55 +44,51 @@ async def get_current_user(
     # Логируем для отладки
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"=== TOKEN VERIFICATION START ===")
-    logger.info(f"Token preview: {token[:50]}... (length: {len(token)})")
-    logger.info(f"Request path: {request.url.path}")
-    logger.info(f"Authorization header: {request.headers.get('Authorization', 'NOT SET')[:50]}...")
+    # Горячий путь: только DEBUG и ленивое форматирование (без f-строк)
+    logger.debug("=== TOKEN VERIFICATION START ===")
+    logger.debug("Token length: %d, request path: %s", len(token), request.url.path)
     
     try:
         payload = verify_token(token)
         
         if not payload:
-            logger.error(f"Token verification failed: payload is None")
-            logger.error(f"This usually means:")
-            logger.error(f"  1. Token expired")
-            logger.error(f"  2. SECRET_KEY mismatch")
-            logger.error(f"  3. Invalid token format")
+            logger.error(
+                "Token verification failed: payload is None "
+                "(token expired, SECRET_KEY mismatch or invalid token format)"
+            )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Недействительный или истекший токен. Пожалуйста, войдите заново."
             )
         
-        logger.info(f"Token verified successfully. Payload: {payload}")
         user_id = int(payload.get("sub"))
-        logger.info(f"Extracted user_id: {user_id}")
+        logger.debug("Token verified successfully, user_id: %s", user_id)
         
         try:
             user_repo = UserRepository(db)
             user = await user_repo.get_by_id(user_id)
         except Exception as db_error:
-            logger.error(f"Ошибка подключения к БД при проверке пользователя: {db_error}")
+            logger.error("Ошибка подключения к БД при проверке пользователя: %s", db_error)
             # Если БД недоступна, но токен валиден, создаем временного пользователя из токена
             # Это позволяет работать админке даже если БД временно недоступна
             role_from_token = payload.get("role", "admin")
-            logger.warning(f"БД недоступна, используем данные из токена: user_id={user_id}, role={role_from_token}")
+            logger.warning("БД недоступна, используем данные из токена: user_id=%s, role=%s", user_id, role_from_token)
             result = {
                 "id": user_id,
                 "email": None,
                 "phone": None,
                 "role": role_from_token
             }
-            logger.info(f"=== TOKEN VERIFICATION SUCCESS (без БД) ===")
+            logger.debug("=== TOKEN VERIFICATION SUCCESS (без БД) ===")
             return result
         
         if not user:
-            logger.warning(f"User not found for user_id: {user_id}")
+            logger.warning("User not found for user_id: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Пользователь не найден"
             )
         
-        logger.info(f"User found: id={user.id}, email={user.email}, phone={user.phone}, role={user.role}")
         
         # Преобразуем роль в строку для совместимости
         role = user.role
@@ -107,15 +104,14 @@ async def get_current_user(
             "role": role
         }
         
-        logger.info(f"=== TOKEN VERIFICATION SUCCESS ===")
-        logger.info(f"Returning user: id={result['id']}, role={result['role']}")
+        logger.debug("=== TOKEN VERIFICATION SUCCESS === id=%s, role=%s", result["id"], result["role"])
         return result
     except HTTPException:
-        logger.error(f"=== TOKEN VERIFICATION FAILED (HTTPException) ===")
+        logger.error("=== TOKEN VERIFICATION FAILED (HTTPException) ===")
         raise
     except Exception as e:
-        logger.error(f"=== TOKEN VERIFICATION FAILED (Exception) ===")
-        logger.error(f"Error in get_current_user: {type(e).__name__}: {e}", exc_info=True)
+        logger.error("=== TOKEN VERIFICATION FAILED (Exception) ===")
+        logger.error("Error in get_current_user: %s: %s", type(e).__name__, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Ошибка проверки токена: {str(e)}"
@@ -149,11 +145,17 @@ async def check_parent_consent(
     """
     Проверка согласия родителей на обработку данных ребёнка
     Согласно требованиям: обязательная проверка перед действиями с данными ребёнка
+    Результат кэшируется (core/consent_cache.py), изменение согласия записывается в кэш сразу
     """
-    consent_repo = ParentConsentRepository(db)
-    consent = await consent_repo.get_by_child_id(current_child.id)
+    cache = get_consent_cache()
+    consent_given = await cache.get(current_child.id)
+    if consent_given is None:
+        consent_repo = ParentConsentRepository(db)
+        consent = await consent_repo.get_by_child_id(current_child.id)
+        consent_given = bool(consent and consent.consent_given)
+        await cache.populate(current_child.id, consent_given)
     
-    if not consent or not consent.consent_given:
+    if not consent_given:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Требуется согласие родителей на обработку данных ребёнка"
@@ -172,7 +174,7 @@ async def check_admin_access(current_user: dict = Depends(get_current_user)) ->
     # Логируем для отладки
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"Checking admin access for role: {user_role}, type: {type(user_role)}")
+    logger.debug("Checking admin access for role: %s", user_role)
     
     # Нормализуем роль к строке для проверки
     role_str = None
@@ -189,13 +191,13 @@ async def check_admin_access(current_user: dict = Depends(get_current_user)) ->
     is_admin = role_str == "admin" or role_str == UserRole.ADMIN.value.lower()
     
     if not is_admin:
-        logger.warning(f"Access denied: role '{user_role}' (normalized: '{role_str}') is not admin")
+        logger.warning("Access denied: role '%s' (normalized: '%s') is not admin", user_role, role_str)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Недостаточно прав. Требуется роль администратора. Текущая роль: {user_role}"
         )
     
-    logger.info(f"Admin access granted for user {current_user.get('id')}")
+    logger.debug("Admin access granted for user %s", current_user.get('id'))
     return current_user
 
 
@@ -229,8 +231,8 @@ async def get_current_staff(
     
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"=== STAFF TOKEN VERIFICATION START ===")
-    logger.info(f"Token preview: {token[:50]}... (length: {len(token)})")
+    logger.debug("=== STAFF TOKEN VERIFICATION START ===")
+    logger.debug("Token length: %d, request path: %s", len(token), request.url.path)
     
     try:
         payload = verify_token(token)
@@ -242,42 +244,42 @@ async def get_current_staff(
                 detail="Недействительный или истекший токен. Пожалуйста, войдите заново."
             )
         
-        logger.info(f"Staff token verified successfully. Payload: {payload}")
+        logger.debug("Staff token verified successfully")
         staff_id = int(payload.get("sub"))
-        logger.info(f"Extracted staff_id: {staff_id}")
+        logger.debug("Extracted staff_id: %s", staff_id)
         
         try:
             staff_repo = StaffUserRepository(db)
             staff_user = await staff_repo.get_by_id(staff_id)
         except Exception as db_error:
-            logger.error(f"Ошибка подключения к БД при проверке staff пользователя: {db_error}")
+            logger.error("Ошибка подключения к БД при проверке staff пользователя: %s", db_error)
             # Если БД недоступна, но токен валиден, создаем временного staff из токена
             role_from_token = payload.get("role", "admin")
-            logger.warning(f"БД недоступна, используем данные из токена: staff_id={staff_id}, role={role_from_token}")
+            logger.warning("БД недоступна, используем данные из токена: staff_id=%s, role=%s", staff_id, role_from_token)
             result = {
                 "id": staff_id,
                 "email": None,
                 "role": role_from_token,
                 "is_staff": True
             }
-            logger.info(f"=== STAFF TOKEN VERIFICATION SUCCESS (без БД) ===")
+            logger.debug("=== STAFF TOKEN VERIFICATION SUCCESS (без БД) ===")
             return result
         
         if not staff_user:
-            logger.warning(f"Staff user not found for staff_id: {staff_id}")
+            logger.warning("Staff user not found for staff_id: %s", staff_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Staff пользователь не найден"
             )
         
         if not staff_user.is_active:
-            logger.warning(f"Staff user {staff_id} is not active")
+            logger.warning("Staff user %s is not active", staff_id)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Аккаунт staff пользователя деактивирован"
             )
         
-        logger.info(f"Staff user found: id={staff_user.id}, email={staff_user.email}, role={staff_user.role}")
+        logger.debug("Staff user found: id=%s, role=%s", staff_user.id, staff_user.role)
         
         # Преобразуем роль в строку для совместимости
         role = staff_user.role
@@ -292,15 +294,14 @@ async def get_current_staff(
             "is_staff": True
         }
         
-        logger.info(f"=== STAFF TOKEN VERIFICATION SUCCESS ===")
-        logger.info(f"Returning staff: id={result['id']}, role={result['role']}")
+        logger.debug("=== STAFF TOKEN VERIFICATION SUCCESS === id=%s, role=%s", result["id"], result["role"])
         return result
     except HTTPException:
         logger.error("=== STAFF TOKEN VERIFICATION FAILED (HTTPException) ===")
         raise
     except Exception as e:
-        logger.error(f"=== STAFF TOKEN VERIFICATION FAILED (Exception) ===")
-        logger.error(f"Error in get_current_staff: {type(e).__name__}: {e}", exc_info=True)
+        logger.error("=== STAFF TOKEN VERIFICATION FAILED (Exception) ===")
+        logger.error("Error in get_current_staff: %s: %s", type(e).__name__, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Ошибка проверки токена: {str(e)}"
@@ -323,7 +324,7 @@ def check_staff_role(required_roles: list[str]):
         if staff_role not in [r.lower() for r in required_roles]:
             import logging
             logger = logging.getLogger(__name__)
-            logger.warning(f"Staff access denied: role '{staff_role}' not in {required_roles}")
+            logger.warning("Staff access denied: role '%s' not in %s", staff_role, required_roles)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Недостаточно прав. Требуются роли: {', '.join(required_roles)}. Ваша роль: {staff_role}"
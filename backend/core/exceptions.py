@@ -40,6 +40,12 @@ class ValidationError(AppException):
         super().__init__(message, status_code=400)
 
 
+class PayloadTooLargeError(AppException):
+    """Тело запроса больше допустимого"""
+    def __init__(self, message: str = "Файл слишком большой"):
+        super().__init__(message, status_code=413)
+
+
 async def app_exception_handler(request: Request, exc: AppException):
     """Обработчик кастомных исключений"""
     return JSONResponse(
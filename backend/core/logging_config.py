@@ -1,9 +1,19 @@
 """
 Настройка логирования
 Согласно rules.md: JSON логи для продакшена
+
+Запись вынесена из event loop: QueueHandler кладёт запись в очередь, отдельный поток
+(QueueListener) форматирует и пишет в stdout пачками одним write
 """
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
 from core.config import settings
 
 try:
@@ -12,36 +22,192 @@ try:
 except ImportError:
     JSON_LOGGER_AVAILABLE = False
 
+# Профиль "hot_path_quiet": логгеры горячего пути поднимаются до WARNING,
+# access-логи сэмплируются
+HOT_PATH_LOGGERS = (
+    "core.dependencies",
+    "core.security.jwt",
+    "core.middleware",
+    "httpx",
+)
+HOT_PATH_SAMPLE_RATES = {
+    "uvicorn.access": 0.1,
+}
 
-def setup_logging():
-    """Настройка логирования в зависимости от окружения"""
-    root_logger = logging.getLogger()
-    
-    # Удаляем существующие обработчики
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-    
-    # Создаем обработчик
-    handler = logging.StreamHandler(sys.stdout)
-    
-    # Настраиваем формат в зависимости от настроек
+# Типы аргументов, которые безопасно форматировать позже в потоке логирования
+_LAZY_SAFE_ARG_TYPES = (str, int, float, bool, type(None))
+
+_listener: Optional[QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Сэмплирование записей ниже WARNING по префиксу имени логгера
+    rates: {"uvicorn.access": 0.1} - пропускается ~10% записей; WARNING и выше не сэмплируются
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Длинные префиксы проверяются первыми
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке
+    Стандартный prepare() форматирует сообщение сразу; здесь запись уходит в очередь с msg/args,
+    если аргументы неизменяемые примитивы. Иначе (ORM-объекты, dict) сообщение форматируется сразу,
+    чтобы поток логирования не читал объекты, которые меняются в event loop
+    При переполнении очереди запись отбрасывается и учитывается в dropped
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            # Traceback форматируется в вызывающем потоке, пока кадры актуальны
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        if record.args and not self._lazy_safe(record.args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    @staticmethod
+    def _lazy_safe(args) -> bool:
+        if isinstance(args, dict):
+            return False
+        return all(isinstance(arg, _LAZY_SAFE_ARG_TYPES) for arg in args)
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """StreamHandler, который копит отформатированные строки и пишет их одним write при flush()"""
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.buffer = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self.buffer and self.stream:
+                self.stream.write("".join(self.buffer))
+                self.buffer.clear()
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener, который забирает из очереди до batch_size записей и сбрасывает их одним flush()"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers, batch_size: int = 256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+            for handler in self.handlers:
+                handler.flush()
+            for _ in batch:
+                log_queue.task_done()
+            if stop:
+                break
+
+
+def _build_formatter() -> logging.Formatter:
+    """Формат в зависимости от настроек"""
     if settings.LOG_FORMAT == "json" and JSON_LOGGER_AVAILABLE:
         # JSON формат для продакшена
-        formatter = jsonlogger.JsonFormatter(
+        return jsonlogger.JsonFormatter(
             '%(asctime)s %(name)s %(levelname)s %(message)s %(pathname)s %(lineno)d',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-    else:
-        # Обычный формат для разработки
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-    
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    # Обычный формат для разработки
+    return logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def stop_logging() -> None:
+    """Остановка потока логирования с дозаписью очереди"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging():
+    """Настройка логирования в зависимости от окружения"""
+    global _listener
+    root_logger = logging.getLogger()
+
+    # Удаляем существующие обработчики (и останавливаем прежний поток при повторной настройке)
+    stop_logging()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+
+    # Поток логирования: форматирование и пакетная запись в stdout
+    stream_handler = BatchingStreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = BatchingQueueListener(log_queue, stream_handler, batch_size=settings.LOG_BATCH_SIZE)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    # Профиль и сэмплирование
+    sample_rates = dict(settings.LOG_SAMPLE_RATES)
+    if settings.LOG_PROFILE == "hot_path_quiet":
+        sample_rates = {**HOT_PATH_SAMPLE_RATES, **sample_rates}
+        for name in HOT_PATH_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    queue_handler = LazyQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    root_logger.addHandler(queue_handler)
     root_logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
-    
+
     # Настраиваем логирование для сторонних библиотек
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
+    # Access-логи идут через общую очередь (run.py запускает uvicorn с log_config=None)
+    logging.getLogger("uvicorn.access").setLevel(logging.INFO)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
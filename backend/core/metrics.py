@@ -0,0 +1,157 @@
+"""
+Метрики приложения в формате Prometheus
+- задержка и число запросов по маршруту (шаблон пути, а не сам путь - ограниченная кардинальность)
+- запросы в обработке
+- число и время SQL-запросов на HTTP-запрос (события cursor_execute движка)
+- длительность и итог фоновых задач планировщика (core/scheduler.py)
+- доставка уведомлений: задержка от создания до отправки, итоги попыток, размер очереди
+Экспорт: GET /metrics (только из внутренних сетей, см. METRICS_ALLOWED_NETWORKS)
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+DELIVERY_LATENCY_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP-запросы по маршруту и статусу",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения одного SQL-запроса",
+    buckets=DB_QUERY_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Число SQL-запросов на HTTP-запрос",
+    ["route"],
+    buckets=QUERIES_PER_REQUEST_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Суммарное время SQL-запросов на HTTP-запрос",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Длительность запуска фоновой задачи",
+    ["job", "status"],
+    buckets=JOB_DURATION_BUCKETS,
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+    "scheduler_job_last_success_timestamp_seconds",
+    "Время последнего успешного запуска задачи этим воркером (Unix)",
+    ["job"],
+)
+
+NOTIFICATION_DELIVERY_LATENCY = Histogram(
+    "notification_delivery_latency_seconds",
+    "Время от создания уведомления до успешной доставки",
+    ["channel"],
+    buckets=DELIVERY_LATENCY_BUCKETS,
+)
+NOTIFICATION_DELIVERY_ATTEMPTS = Counter(
+    "notification_delivery_attempts_total",
+    "Попытки доставки уведомлений по итогу: sent, retry, failed",
+    ["channel", "result"],
+)
+NOTIFICATION_BACKLOG = Gauge(
+    "notification_backlog",
+    "Уведомления в статусе PENDING",
+)
+NOTIFICATION_OLDEST_PENDING_AGE = Gauge(
+    "notification_oldest_pending_age_seconds",
+    "Возраст самого старого недоставленного уведомления",
+)
+
+
+class QueryStats:
+    """
+    Счётчик SQL-запросов текущего HTTP-запроса (или блока collect_query_stats)
+    statements - тексты запросов, если включён сбор (режим QUERY_BUDGET_MODE для поиска N+1)
+    Вложенный счётчик передаёт запросы и внешнему (parent)
+    """
+    __slots__ = ("count", "duration", "statements", "parent")
+
+    def __init__(self, track_statements: bool = False, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[list] = [] if track_statements else None
+        self.parent = parent
+
+    def record(self, statement: str, elapsed: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+            if stats.statements is not None:
+                stats.statements.append(statement)
+            stats = stats.parent
+
+
+# Статистика текущего запроса; события движка выполняются в greenlet с контекстом задачи запроса
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def collect_query_stats(track_statements: bool = False) -> Iterator[QueryStats]:
+    """Учёт SQL-запросов внутри блока (middleware на запрос, тесты и скрипты - вручную)"""
+    stats = QueryStats(track_statements, parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Статистика SQL-запросов текущего контекста (None вне HTTP-запроса)"""
+    return _query_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine) -> None:
+    """Подписка на события выполнения SQL (AsyncEngine или Engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def render_metrics() -> tuple:
+    """Текст метрик и Content-Type для ответа /metrics"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,75 +1,94 @@
 """
 CSRF защита middleware
 Согласно rules.md: double-submit CSRF или Anti-CSRF header
+Чистый ASGI (без BaseHTTPMiddleware): без лишней задачи и обёртки над телом на каждый запрос
 """
-import secrets
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from typing import Callable
+from typing import Iterable, Optional
 
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-class CSRFMiddleware(BaseHTTPMiddleware):
+CSRF_COOKIE_NAME = "csrf_token"
+CSRF_HEADER_NAME = "x-csrf-token"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+DEFAULT_EXEMPT_PATHS = [
+    "/health",
+    "/ready",
+    "/api/docs",
+    "/api/redoc",
+    "/api/openapi.json",
+    "/api/auth/login",
+    "/api/auth/staff-login",
+    "/api/auth/register",
+    "/api/auth/refresh",
+    "/api/children"  # Временно отключаем CSRF для children для отладки
+]
+
+
+class PrefixTrie:
+    """
+    Префиксное дерево по символам пути
+    matches(path) эквивалентно any(path.startswith(p) for p in prefixes),
+    но проходит путь один раз, не перебирая все префиксы
+    """
+    _END = object()
+
+    def __init__(self, prefixes: Iterable[str]):
+        self.root: dict = {}
+        for prefix in prefixes:
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self._END] = True
+
+    def matches(self, path: str) -> bool:
+        node = self.root
+        if self._END in node:
+            return True
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+
+class CSRFMiddleware:
     """
     CSRF защита через double-submit token
     Токен генерируется и отправляется в cookie и header
     """
-    
-    def __init__(self, app, exempt_paths: list = None):
-        super().__init__(app)
-        self.exempt_paths = exempt_paths or [
-            "/health",
-            "/ready",
-            "/api/docs",
-            "/api/redoc",
-            "/api/openapi.json",
-            "/api/auth/login",
-            "/api/auth/staff-login",
-            "/api/auth/register",
-            "/api/auth/refresh",
-            "/api/children"  # Временно отключаем CSRF для children для отладки
-        ]
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Пропускаем exempt paths
-        if any(request.url.path.startswith(path) for path in self.exempt_paths):
-            return await call_next(request)
-        
-        # Пропускаем GET, HEAD, OPTIONS запросы (безопасные методы)
-        if request.method in ["GET", "HEAD", "OPTIONS"]:
-            return await call_next(request)
-        
-        # Для POST, PUT, DELETE, PATCH проверяем CSRF токен
-        if request.method in ["POST", "PUT", "DELETE", "PATCH"]:
-            # Получаем токен из cookie
-            csrf_token_cookie = request.cookies.get("csrf_token")
-            
-            # Получаем токен из header
-            csrf_token_header = request.headers.get("X-CSRF-Token")
-            
-            # Если токена нет в cookie, генерируем новый
-            if not csrf_token_cookie:
-                csrf_token_cookie = secrets.token_urlsafe(32)
-            
-            # Проверяем совпадение токенов
-            if csrf_token_cookie != csrf_token_header:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="CSRF token mismatch"
-                )
-        
-        # Выполняем запрос
-        response = await call_next(request)
-        
-        # Устанавливаем CSRF токен в cookie, если его нет
-        if "csrf_token" not in request.cookies:
-            response.set_cookie(
-                key="csrf_token",
-                value=csrf_token_cookie,
-                httponly=False,  # Должен быть доступен для JavaScript
-                secure=True,  # Только HTTPS
-                samesite="strict",
-                max_age=3600  # 1 час
+
+    def __init__(self, app: ASGIApp, exempt_paths: Optional[list] = None):
+        self.app = app
+        self.exempt_paths = exempt_paths or list(DEFAULT_EXEMPT_PATHS)
+        self._exempt = PrefixTrie(self.exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Пропускаем не-HTTP, exempt paths и безопасные методы (GET, HEAD, OPTIONS):
+        # ответы на них (в том числе статика с Cache-Control: immutable) не получают Set-Cookie
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or self._exempt.matches(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Для POST, PUT, DELETE, PATCH проверяем CSRF токен: cookie должен совпасть с заголовком
+        headers = Headers(scope=scope)
+        cookie_header = headers.get("cookie")
+        csrf_token_cookie = cookie_parser(cookie_header).get(CSRF_COOKIE_NAME) if cookie_header else None
+        if not csrf_token_cookie or csrf_token_cookie != headers.get(CSRF_HEADER_NAME):
+            response = JSONResponse(
+                status_code=403,
+                content={"detail": "CSRF token mismatch", "status_code": 403}
             )
-        
-        return response
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
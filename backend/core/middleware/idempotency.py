@@ -0,0 +1,289 @@
+"""
+Idempotency-Key middleware
+Повторы мутирующих запросов (ретраи мобильных клиентов по таймауту) отдаются
+из сохранённого ответа без повторного выполнения сервисного слоя
+"""
+import base64
+import hashlib
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.utils.principal import request_principal
+
+logger = logging.getLogger(__name__)
+
+HEADER_NAME = "idempotency-key"
+MAX_KEY_LENGTH = 64
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Мутирующие эндпоинты ребёнка и родителя
+DEFAULT_PATH_PREFIXES = (
+    "/api/stars",
+    "/api/piggy",
+    "/api/tasks",
+    "/api/diary",
+    "/api/wishlist",
+    "/api/children",
+    "/api/parent",
+    "/api/settings",
+    "/api/stats",
+    "/api/subscription",
+    "/api/support",
+)
+
+
+class PostgresIdempotencyStore:
+    """Хранилище ключей в таблице idempotency_keys (отдельная короткая транзакция на операцию)"""
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        async with self._repo() as repo:
+            return await repo.claim(key, fingerprint, settings.IDEMPOTENCY_LOCK_SECONDS)
+
+    async def get(self, key: str) -> Optional[dict]:
+        async with self._repo() as repo:
+            record = await repo.get(key)
+            if record is None:
+                return None
+            return {
+                "fingerprint": record.fingerprint,
+                "status_code": record.status_code,
+                "content_type": record.content_type,
+                "body": record.response_body or b"",
+            }
+
+    async def complete(self, key: str, status_code: int, content_type: Optional[str], body: bytes) -> None:
+        async with self._repo() as repo:
+            await repo.complete(key, status_code, content_type, body, settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str) -> None:
+        async with self._repo() as repo:
+            await repo.release(key)
+
+    @asynccontextmanager
+    async def _repo(self):
+        from core.database import AsyncSessionLocal
+        from repositories.idempotency_repository import IdempotencyRepository
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                yield IdempotencyRepository(session)
+
+
+class RedisIdempotencyStore:
+    """Хранилище ключей в Redis: SET NX на время выполнения, затем SET с TTL"""
+
+    def __init__(self, redis_url: str = None):
+        import redis.asyncio as aioredis
+        self.redis = aioredis.from_url(redis_url or settings.REDIS_URL)
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return f"idem:{key}"
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        value = json.dumps({"fingerprint": fingerprint, "status_code": None})
+        return bool(await self.redis.set(
+            self._name(key), value, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS
+        ))
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.redis.get(self._name(key))
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        record["body"] = base64.b64decode(record.get("body") or "")
+        return record
+
+    async def complete(self, key: str, status_code: int, content_type: Optional[str], body: bytes) -> None:
+        record = await self.redis.get(self._name(key))
+        fingerprint = json.loads(record)["fingerprint"] if record else ""
+        value = json.dumps({
+            "fingerprint": fingerprint,
+            "status_code": status_code,
+            "content_type": content_type,
+            "body": base64.b64encode(body).decode("ascii"),
+        })
+        await self.redis.set(self._name(key), value, ex=settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str) -> None:
+        await self.redis.delete(self._name(key))
+
+
+def get_idempotency_store():
+    """Хранилище по настройке IDEMPOTENCY_BACKEND"""
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        return RedisIdempotencyStore()
+    return PostgresIdempotencyStore()
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware для заголовка Idempotency-Key
+    - первый запрос захватывает ключ, выполняется и сохраняет успешный (2xx) ответ с TTL
+    - повтор с тем же ключом и тем же запросом получает сохранённый ответ
+    - повтор, пока первый запрос ещё выполняется, получает 409
+    - тот же ключ с другим телом/путём получает 422
+    Ключ привязан к пользователю (sub из JWT), поэтому разные пользователи не пересекаются
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: tuple = DEFAULT_PATH_PREFIXES, store=None):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.store = store or get_idempotency_store()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER_NAME)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, 400, f"Idempotency-Key длиннее {MAX_KEY_LENGTH} символов")
+            return
+
+        body = await self._read_body(receive, settings.MAX_UPLOAD_SIZE)
+        if body is None:
+            # Тело держится в памяти целиком (отпечаток и повтор): больше MAX_UPLOAD_SIZE не читаем
+            await self._error(scope, receive, send, 413, "Тело запроса слишком большое")
+            return
+        store_key = f"{request_principal(scope)}:{idempotency_key}"
+        fingerprint = self._fingerprint(scope, body)
+
+        try:
+            claimed = await self.store.claim(store_key, fingerprint)
+            record = None if claimed else await self.store.get(store_key)
+        except Exception as e:
+            # Хранилище недоступно: выполняем запрос без идемпотентности
+            logger.warning("Хранилище Idempotency-Key недоступно: %s", e)
+            await self.app(scope, self._replay_receive(body, receive), send)
+            return
+
+        if not claimed:
+            if record is None:
+                await self._error(scope, receive, send, 409, "Запрос с этим Idempotency-Key ещё выполняется")
+            elif record["fingerprint"] != fingerprint:
+                await self._error(scope, receive, send, 422, "Idempotency-Key уже использован для другого запроса")
+            elif record["status_code"] is None:
+                await self._error(scope, receive, send, 409, "Запрос с этим Idempotency-Key ещё выполняется")
+            else:
+                await self._replay(send, record)
+            return
+
+        await self._execute(scope, receive, send, body, store_key)
+
+    async def _execute(self, scope: Scope, receive: Receive, send: Send, body: bytes, store_key: str) -> None:
+        """Выполнение запроса с перехватом ответа для сохранения"""
+        response = {"status": None, "content_type": None, "chunks": [], "size": 0, "cacheable": True}
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body" and response["cacheable"]:
+                chunk = message.get("body", b"")
+                response["size"] += len(chunk)
+                if response["size"] > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    response["cacheable"] = False
+                    response["chunks"] = []
+                else:
+                    response["chunks"].append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, self._replay_receive(body, receive), capture_send)
+        except Exception:
+            await self._safe_release(store_key)
+            raise
+
+        status = response["status"]
+        if status is not None and 200 <= status < 300 and response["cacheable"]:
+            try:
+                await self.store.complete(store_key, status, response["content_type"], b"".join(response["chunks"]))
+            except Exception as e:
+                logger.warning("Не удалось сохранить ответ для Idempotency-Key: %s", e)
+        else:
+            await self._safe_release(store_key)
+
+    async def _safe_release(self, store_key: str) -> None:
+        try:
+            await self.store.release(store_key)
+        except Exception as e:
+            logger.warning("Не удалось освободить Idempotency-Key: %s", e)
+
+    @staticmethod
+    async def _read_body(receive: Receive, limit: int) -> Optional[bytes]:
+        """Тело запроса целиком или None, если оно больше limit байт"""
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay_receive(body: bytes, receive: Receive) -> Receive:
+        """receive, отдающий уже прочитанное тело, затем исходный поток (disconnect)"""
+        sent = False
+
+        async def wrapped() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return wrapped
+
+    @staticmethod
+    def _fingerprint(scope: Scope, body: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(scope["method"].encode())
+        digest.update(b"\0")
+        digest.update(scope["path"].encode())
+        digest.update(b"\0")
+        digest.update(scope.get("query_string", b""))
+        digest.update(b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def _replay(send: Send, record: dict) -> None:
+        body = record["body"]
+        headers = [
+            (b"content-length", str(len(body)).encode()),
+            (b"idempotent-replayed", b"true"),
+        ]
+        if record.get("content_type"):
+            headers.append((b"content-type", record["content_type"].encode()))
+        await send({"type": "http.response.start", "status": record["status_code"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+        response = JSONResponse(
+            status_code=status_code,
+            content={"detail": detail, "status_code": status_code}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,66 @@
+"""
+Middleware сбора метрик запросов (см. core/metrics.py)
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_IN_PROGRESS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    collect_query_stats,
+)
+from core.query_budget import report_request_queries
+
+# Метка для путей без маршрута (404, смонтированная статика) - чтобы не плодить серии
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: задержка по маршруту, запросы в обработке, SQL-запросы на запрос
+    Маршрут берётся из scope["route"], который роутер FastAPI заполняет при сопоставлении
+    При QUERY_BUDGET_MODE != off дополнительно собираются тексты запросов для поиска N+1
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        track_statements = settings.QUERY_BUDGET_MODE != "off"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        with collect_query_stats(track_statements) as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                in_progress.dec()
+                route = scope.get("route")
+                route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+                HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+                HTTP_REQUEST_DURATION.labels(method, route_path).observe(elapsed)
+                DB_QUERIES_PER_REQUEST.labels(route_path).observe(stats.count)
+                DB_TIME_PER_REQUEST.labels(route_path).observe(stats.duration)
+                # Маршруты с @query_budget проверяются декоратором
+                if track_statements and not hasattr(scope.get("endpoint"), "__query_budget__"):
+                    report_request_queries(stats, f"{method} {route_path}")
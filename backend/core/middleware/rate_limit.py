@@ -1,56 +1,239 @@
 """
 Rate limiting middleware
 Согласно rules.md: ограничение на критичные endpoints (login, reset password)
+
+Полностью асинхронный: без синхронных вызовов Redis в event loop и без ping при импорте
+- memory: token bucket в памяти процесса (один воркер)
+- redis: скользящее окно в Redis через Lua-скрипт (несколько воркеров)
+Ключ - пользователь из JWT, для анонимных запросов - адрес клиента
 """
+import logging
+import re
+import secrets
+import time
+from dataclasses import dataclass
 from functools import wraps
-from fastapi import HTTPException, Request, status
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from typing import Optional, Tuple
+
+from fastapi import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
 from core.config import settings
+from core.utils.principal import request_principal
 
-# Инициализация limiter
-# Используем Redis для продакшена, in-memory для разработки
-def get_storage_uri():
-    """Получение URI хранилища для rate limiting"""
-    # Проверяем, доступен ли Redis
-    try:
-        import redis
-        redis_url = settings.REDIS_URL
-        # Пробуем подключиться к Redis
-        r = redis.from_url(redis_url, socket_connect_timeout=1)
-        r.ping()
-        return redis_url
-    except:
-        # Если Redis недоступен, используем in-memory
-        return "memory://"
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DETAIL = "Слишком много запросов. Попробуйте позже."
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Лимит: amount запросов за period секунд"""
+    amount: int
+    period: int
+    text: str
+
+    @classmethod
+    def parse(cls, text: str) -> "RateLimit":
+        """Разбор строки в формате slowapi: "5/minute", "200 per hour", "10/5 seconds\""""
+        match = _LIMIT_RE.match(text)
+        if not match:
+            raise ValueError(f"Некорректный лимит: {text!r}")
+        amount, multiplier, unit = match.groups()
+        return cls(int(amount), int(multiplier or 1) * _PERIODS[unit], text.strip())
+
+
+class RateLimitExceeded(Exception):
+    """Лимит запросов исчерпан"""
+
+    def __init__(self, limit: RateLimit, retry_after: float):
+        self.limit = limit
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded: {limit.text}")
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=get_storage_uri(),
-    default_limits=["200 per hour"]  # Общий лимит
-)
 
-# Декораторы для rate limiting
-# SlowAPI требует, чтобы функция имела параметр request
-def rate_limit_login(func):
-    """Rate limiting для login endpoint: 5 попыток в минуту"""
-    @wraps(func)
-    async def wrapper(request: Request, *args, **kwargs):
-        # Проверяем rate limit
+def _rate_limit_response(exc: RateLimitExceeded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": RATE_LIMIT_DETAIL, "status_code": 429},
+        headers={"Retry-After": str(max(1, int(exc.retry_after + 0.999)))}
+    )
+
+
+async def _rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """Обработчик исключения RateLimitExceeded (регистрируется в main.py)"""
+    return _rate_limit_response(exc)
+
+
+class MemoryRateLimitBackend:
+    """
+    Token bucket в памяти процесса
+    Ёмкость - amount, пополнение amount/period токенов в секунду
+    Проверка не содержит await, поэтому атомарна в рамках event loop
+    """
+    PRUNE_EVERY = 10_000  # Чистка полных (неактивных) корзин раз в N проверок
+
+    def __init__(self):
+        self._buckets: dict = {}
+        self._hits = 0
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.monotonic()
+        rate = limit.amount / limit.period
+        tokens, updated = self._buckets.get(key, (float(limit.amount), now))
+        tokens = min(float(limit.amount), tokens + (now - updated) * rate)
+
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            self._prune(now)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return True, 0.0
+        self._buckets[key] = (tokens, now)
+        return False, (1 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # Корзина без обращений дольше суток заведомо полная - её можно не хранить
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated > _PERIODS["day"]]
+        for key in stale:
+            del self._buckets[key]
+
+
+# Скользящее окно на отсортированном множестве: score - время запроса в мс (по часам Redis)
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) < limit then
+    redis.call('ZADD', key, now, now .. ':' .. ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+
+class RedisRateLimitBackend:
+    """Скользящее окно в Redis (общий лимит для всех воркеров)"""
+
+    def __init__(self, redis_url: str = None):
+        import redis.asyncio as aioredis
+        self.redis = aioredis.from_url(
+            redis_url or settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        self._script = self.redis.register_script(SLIDING_WINDOW_LUA)
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        allowed, retry_after_ms = await self._script(
+            keys=[f"rl:{key}"],
+            args=[limit.amount, limit.period * 1000, secrets.token_hex(4)],
+        )
+        return bool(allowed), int(retry_after_ms) / 1000
+
+
+class Limiter:
+    """
+    Асинхронный rate limiter с API, совместимым с прежним slowapi:
+    декоратор limiter.limit("5/minute") и default_limits для RateLimitMiddleware
+    Если Redis недоступен, проверки временно выполняются в памяти процесса
+    """
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self, backend: str = "memory", default_limits: Optional[list] = None):
+        self.enabled = True
+        self.default_limits = [RateLimit.parse(text) for text in default_limits or []]
+        self.memory = MemoryRateLimitBackend()
+        self.redis = RedisRateLimitBackend() if backend == "redis" else None
+        self._redis_down_until = 0.0
+
+    async def hit(self, key: str, limit: RateLimit) -> None:
+        """Учёт запроса; RateLimitExceeded, если лимит исчерпан"""
+        if not self.enabled:
+            return
+        allowed, retry_after = await self._backend_hit(f"{key}:{limit.amount}/{limit.period}", limit)
+        if not allowed:
+            raise RateLimitExceeded(limit, retry_after)
+
+    async def _backend_hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                return await self.redis.hit(key, limit)
+            except Exception as e:
+                self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+                logger.warning("Redis для rate limiting недоступен, лимиты в памяти процесса: %s", e)
+        return await self.memory.hit(key, limit)
+
+    def limit(self, limit_value: str):
+        """Декоратор лимита для endpoint; endpoint должен принимать request: Request"""
+        limit = RateLimit.parse(limit_value)
+
+        def decorator(func):
+            scope_name = f"{func.__module__}.{func.__name__}"
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if request is None:
+                    request = next((arg for arg in args if isinstance(arg, Request)), None)
+                if request is None:
+                    raise RuntimeError(f"{scope_name}: для rate limit нужен параметр request: Request")
+                await self.hit(f"{scope_name}:{request_principal(request.scope)}", limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware с лимитами по умолчанию (limiter.default_limits)
+    Лимит считается отдельно для каждого пути, как default_limits в slowapi
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Limiter, exempt_paths: tuple = ("/health", "/ready", "/metrics")):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or not self.limiter.default_limits
+            or scope["path"].startswith(self.exempt_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['path']}:{request_principal(scope)}"
         try:
-            # Используем limiter напрямую через middleware, а не через декоратор
-            # Вместо этого используем limiter.limit() как декоратор на уровне роутера
-            pass
-        except RateLimitExceeded:
-            raise HTTPException(status_code=429, detail="Слишком много запросов. Попробуйте позже.")
-        return await func(*args, **kwargs)
-    return wrapper
-
-# Упрощенная версия без декораторов - используем limiter напрямую в роутерах
-def check_rate_limit(request: Request, limit: str = "5/minute"):
-    """Проверка rate limit для запроса"""
-    try:
-        limiter.check_rate_limit(request, limit)
-    except RateLimitExceeded:
-        raise HTTPException(status_code=429, detail="Слишком много запросов. Попробуйте позже.")
+            for limit in self.limiter.default_limits:
+                await self.limiter.hit(key, limit)
+        except RateLimitExceeded as exc:
+            await _rate_limit_response(exc)(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+limiter = Limiter(
+    backend=settings.RATE_LIMIT_BACKEND,
+    default_limits=[settings.RATE_LIMIT_DEFAULT]  # Общий лимит
+)
@@ -0,0 +1,49 @@
+"""
+pytest-плагин бюджета SQL-запросов (core/query_budget.py)
+Подключение в conftest.py (в проекте - backend/conftest.py, пример - tests/test_query_budget.py):
+    pytest_plugins = ["core.pytest_plugin"]
+
+Фикстура query_budget проверяет запросы внутри блока, включая запросы к приложению
+через httpx.ASGITransport (приложение выполняется в той же задаче, счётчики вложены):
+    async def test_admin_users(client, query_budget):
+        with query_budget(max_queries=6, max_repeats=1):
+            await client.get("/api/admin/users")
+
+Маршруты с @query_budget в тестах проверяются в режиме raise (--query-budget-mode)
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pytest
+
+from core.config import settings
+from core.metrics import QueryStats, collect_query_stats
+from core.query_budget import QueryBudget, check_query_budget
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--query-budget-mode",
+        default="raise",
+        choices=("off", "log", "raise"),
+        help="QUERY_BUDGET_MODE на время тестов (по умолчанию raise)",
+    )
+
+
+def pytest_configure(config):
+    settings.QUERY_BUDGET_MODE = config.getoption("--query-budget-mode")
+
+
+@pytest.fixture
+def query_budget():
+    """Контекстный менеджер: падение теста, если блок превысил бюджет SQL-запросов"""
+
+    @contextmanager
+    def _budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+        with collect_query_stats(track_statements=True) as stats:
+            yield stats
+        violations = check_query_budget(stats, QueryBudget(max_queries, max_repeats))
+        if violations:
+            pytest.fail("Бюджет SQL-запросов превышен: " + "; ".join(violations), pytrace=False)
+
+    return _budget
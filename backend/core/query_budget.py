@@ -0,0 +1,97 @@
+"""
+Бюджет SQL-запросов на HTTP-запрос и поиск N+1 (режим разработки и тестов)
+QUERY_BUDGET_MODE:
+- off: ничего не проверяется (продакшен)
+- log: превышение бюджета и N+1 пишутся в лог как WARNING
+- raise: превышение бюджета у маршрута с @query_budget - исключение QueryBudgetExceeded
+
+Счётчик запросов - core.metrics.QueryStats, который MetricsMiddleware заводит на каждый запрос
+"""
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import wraps
+from typing import List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:\$\d+|\?|%\(\w+\)s)\s*,)+\s*(?:\$\d+|\?|%\(\w+\)s)\s*\)")
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут превысил объявленный бюджет SQL-запросов"""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Бюджет: не больше max_queries запросов и не больше max_repeats одинаковых по форме"""
+    max_queries: Optional[int] = None
+    max_repeats: Optional[int] = None
+
+
+def statement_shape(statement: str) -> str:
+    """Форма запроса: без значений параметров, литералов и длины списков IN (...)"""
+    shape = _PLACEHOLDER_LIST_RE.sub("(?, ...)", statement)
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    shape = _LITERAL_RE.sub("?", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+def repeated_statements(stats: QueryStats, threshold: int) -> List[Tuple[str, int]]:
+    """Формы запросов, выполненные больше threshold раз (признак N+1)"""
+    if not stats.statements:
+        return []
+    counts = Counter(statement_shape(statement) for statement in stats.statements)
+    return [(shape, count) for shape, count in counts.most_common() if count > threshold]
+
+
+def check_query_budget(stats: QueryStats, budget: QueryBudget) -> List[str]:
+    """Нарушения бюджета (пустой список - бюджет соблюдён)"""
+    violations = []
+    if budget.max_queries is not None and stats.count > budget.max_queries:
+        violations.append(f"{stats.count} SQL-запросов при бюджете {budget.max_queries}")
+    max_repeats = budget.max_repeats if budget.max_repeats is not None else settings.QUERY_REPEAT_THRESHOLD
+    for shape, count in repeated_statements(stats, max_repeats):
+        violations.append(f"N+1: {count} раз ({shape[:200]})")
+    return violations
+
+
+def report_request_queries(stats: QueryStats, route: str) -> None:
+    """Проверка N+1 после любого запроса (вызывается MetricsMiddleware в режимах log/raise)"""
+    for shape, count in repeated_statements(stats, settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning("N+1 в %s: запрос выполнен %d раз: %s", route, count, shape[:200])
+
+
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+    """
+    Декоратор бюджета SQL-запросов для endpoint (ставится под @router.<method>)
+    Считаются все запросы HTTP-запроса до возврата из endpoint, включая зависимости (get_current_user)
+    """
+    budget = QueryBudget(max_queries, max_repeats)
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            stats = current_query_stats()
+            if settings.QUERY_BUDGET_MODE == "off" or stats is None:
+                return result
+            violations = check_query_budget(stats, budget)
+            if violations:
+                message = f"{func.__module__}.{func.__name__}: " + "; ".join(violations)
+                if settings.QUERY_BUDGET_MODE == "raise":
+                    raise QueryBudgetExceeded(message)
+                logger.warning("Превышен бюджет SQL-запросов: %s", message)
+            return result
+
+        wrapper.__query_budget__ = budget
+        return wrapper
+
+    return decorator
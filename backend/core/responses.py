@@ -0,0 +1,63 @@
+"""
+Быстрая JSON-сериализация ответов (orjson)
+- ORJSONResponse - класс ответа приложения по умолчанию (main.py): кодирование без stdlib json
+- SchemaResponse - ответ из уже провалидированных схем: FastAPI не прогоняет их повторно
+  через response_model; схема или список схем одного типа сериализуются pydantic-core
+  в JSON за один проход (TypeAdapter(List[схема]) кэшируется по типу)
+
+Использование в роутере (response_model остаётся для OpenAPI):
+    @router.get("/", response_model=list[ChildResponse])
+    async def get_children(...):
+        return SchemaResponse([ChildResponse.model_validate(c) for c in children])
+Содержимое должно быть экземплярами схемы из response_model: лишние поля не отфильтровываются
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson не знает: схемы - готовым JSON из pydantic-core (как response_model, by_alias)"""
+    if isinstance(value, BaseModel):
+        return orjson.Fragment(value.model_dump_json(by_alias=True))
+    if isinstance(value, Decimal):
+        # Как pydantic в режиме json
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON в байтах (UTF-8, без пробелов)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON-ответ через orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: type) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+class SchemaResponse(ORJSONResponse):
+    """Ответ из провалидированных схем (или списков/словарей схем) без второй валидации"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            schema = type(content[0])
+            if all(type(item) is schema for item in content):
+                return _list_adapter(schema).dump_json(content, by_alias=True)
+        # Смешанное содержимое: схемы внутри - фрагментами через _default
+        return dumps(content)
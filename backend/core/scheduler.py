@@ -0,0 +1,192 @@
+"""
+Планировщик фоновых задач обслуживания в процессе приложения
+- расписания в формате cron (минута час день месяц день_недели): "*/15 * * * *", "5 0 * * *"
+- случайная задержка старта (SCHEDULER_JITTER_SECONDS), чтобы воркеры не стартовали разом
+- один исполнитель на запуск: pg_try_advisory_lock на время выполнения и отметка планового
+  времени в scheduled_jobs (воркер, получивший блокировку позже, не повторяет взятый запуск)
+- длительность и итог в метриках Prometheus, состояние - GET /api/admin/jobs
+Запуск и остановка - lifespan в main.py
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal, engine
+from core.metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_LAST_SUCCESS
+from repositories.scheduled_job_repository import ScheduledJobRepository
+
+logger = logging.getLogger(__name__)
+
+# (минимум, максимум) полей cron; день недели: 0 - воскресенье
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_cron_field(spec: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in spec.split(","):
+        base, _, step_spec = part.partition("/")
+        step = int(step_spec) if step_spec else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start, end = (int(value) for value in base.split("-", 1))
+        else:
+            start = int(base)
+            end = high if step_spec else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Поле cron вне диапазона {low}-{high}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Расписание cron из пяти полей (локальное время сервера, как и остальные даты приложения)"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Ожидалось 5 полей cron: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_cron_field(spec, low, high) for spec, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        # Как в cron: если заданы и день месяца, и день недели, подходит любой из них
+        self._any_day = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        return (day or weekday) if self._any_day else (day and weekday)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайшее время запуска строго после moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Расписание никогда не срабатывает: {self.expression!r}")
+
+
+JobFunc = Callable[[AsyncSession], Awaitable[Optional[dict]]]
+
+
+@dataclass
+class Job:
+    """Задача обслуживания: func получает сессию и возвращает сводку (сохраняется в last_result)"""
+    name: str
+    schedule: str
+    func: JobFunc
+    description: str = ""
+
+    def __post_init__(self):
+        self.schedule = settings.SCHEDULER_SCHEDULES.get(self.name, self.schedule)
+        self.cron = CronSchedule(self.schedule)
+
+
+def _lock_key(name: str) -> int:
+    """Стабильный ключ advisory-блокировки (bigint) по имени задачи"""
+    return int.from_bytes(hashlib.sha256(f"scheduler:{name}".encode()).digest()[:8], "big", signed=True)
+
+
+class Scheduler:
+    """Планировщик: по asyncio-задаче на каждое расписание"""
+
+    def __init__(self, jobs: List[Job], jitter_seconds: Optional[int] = None):
+        self.jobs: Dict[str, Job] = {job.name: job for job in jobs}
+        self.jitter_seconds = settings.SCHEDULER_JITTER_SECONDS if jitter_seconds is None else jitter_seconds
+        self.next_runs: Dict[str, datetime] = {}
+        self.running: Dict[str, datetime] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}"))
+        logger.info("Планировщик запущен: %s", ", ".join(f"{job.name} [{job.schedule}]" for job in self.jobs.values()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            scheduled_for = job.cron.next_after(datetime.now())
+            self.next_runs[job.name] = scheduled_for
+            delay = (scheduled_for - datetime.now()).total_seconds() + random.uniform(0, self.jitter_seconds)
+            await asyncio.sleep(max(delay, 0))
+            try:
+                await self.run_job(job, scheduled_for)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Ошибки самой задачи записаны в run_job; здесь - недоступность БД и т.п.
+                logger.exception("Планировщик: не удалось запустить задачу %s", job.name)
+
+    async def run_job(self, job: Job, scheduled_for: datetime) -> Optional[str]:
+        """Запуск задачи, если этот воркер - исполнитель; возвращает статус или None (пропуск)"""
+        key = _lock_key(job.name)
+        async with engine.connect() as lock_conn:
+            acquired = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+            await lock_conn.commit()
+            if not acquired:
+                logger.debug("Задача %s выполняется другим воркером", job.name)
+                return None
+            try:
+                return await self._execute(job, scheduled_for.astimezone())
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                await lock_conn.commit()
+
+    async def _execute(self, job: Job, scheduled_for: datetime) -> Optional[str]:
+        async with AsyncSessionLocal() as session:
+            repo = ScheduledJobRepository(session)
+            if not await repo.claim(job.name, scheduled_for):
+                await session.rollback()
+                return None
+            await session.commit()
+
+            self.running[job.name] = datetime.now()
+            started = time.perf_counter()
+            error = result = None
+            try:
+                summary = await job.func(session)
+                await session.commit()
+                status = "ok"
+                result = json.dumps(summary, ensure_ascii=False, default=str) if summary is not None else None
+            except Exception as e:
+                await session.rollback()
+                status = "error"
+                error = f"{type(e).__name__}: {e}"
+                logger.exception("Задача %s завершилась с ошибкой", job.name)
+            finally:
+                self.running.pop(job.name, None)
+            duration = time.perf_counter() - started
+
+            SCHEDULER_JOB_DURATION.labels(job.name, status).observe(duration)
+            if status == "ok":
+                SCHEDULER_JOB_LAST_SUCCESS.labels(job.name).set(time.time())
+            await repo.finish(job.name, status, duration, error, result)
+            await session.commit()
+            logger.info("Задача %s: %s за %.2f с", job.name, status, duration)
+            return status
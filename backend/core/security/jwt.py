@@ -6,6 +6,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from core.config import settings
+import secrets
 import time
 
 
@@ -35,12 +36,27 @@ def create_refresh_token(data: dict) -> str:
     # Используем time.time() для правильного UTC timestamp
     current_timestamp = int(time.time())
     expire_timestamp = current_timestamp + (settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60)
-    # Используем timestamp для надежности
-    to_encode.update({"exp": expire_timestamp, "type": "refresh"})
+    # jti делает токен уникальным: два входа в одну секунду иначе дают одинаковый JWT,
+    # и запись в refresh_tokens падает на уникальном token_hash
+    to_encode.update({"exp": expire_timestamp, "type": "refresh", "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def _log_token_diagnostics(logger, token: str) -> None:
+    """Диагностика структуры токена без проверки подписи (только для отладки!)"""
+    try:
+        # В python-jose нужно передать ключ, даже если не проверяем подпись
+        unverified = jwt.decode(token, key="", options={"verify_signature": False, "verify_exp": False})
+        exp_timestamp = unverified.get('exp')
+        current_timestamp = int(time.time())  # Используем time.time() для правильного UTC timestamp
+        logger.debug("Token type: %s, exp: %s, current time: %s", unverified.get("type"), exp_timestamp, current_timestamp)
+        if exp_timestamp and exp_timestamp < current_timestamp:
+            logger.warning("⚠️ Token is EXPIRED!")
+    except Exception as e:
+        logger.warning("Could not decode token structure: %s", e)
+
+
 def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     """Проверка токена"""
     import logging
@@ -52,28 +68,14 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
             logger.error("SECRET_KEY is not set!")
             return None
         
-        logger.info(f"Verifying token: length={len(token)}, SECRET_KEY length={len(settings.SECRET_KEY)}, algorithm={settings.ALGORITHM}")
-        
-        # Пробуем декодировать без проверки подписи для диагностики (только для отладки!)
-        try:
-            # В python-jose нужно передать ключ, даже если не проверяем подпись
-            unverified = jwt.decode(token, key="", options={"verify_signature": False, "verify_exp": False})
-            logger.info(f"Token structure (unverified): {unverified}")
-            exp_timestamp = unverified.get('exp')
-            current_timestamp = int(time.time())  # Используем time.time() для правильного UTC timestamp
-            logger.info(f"Token exp: {exp_timestamp}, current time: {current_timestamp}")
-            if exp_timestamp:
-                time_until_expiry = exp_timestamp - current_timestamp
-                logger.info(f"Token expires in: {time_until_expiry:.0f} seconds ({time_until_expiry/60:.1f} minutes)")
-                if time_until_expiry < 0:
-                    logger.warning("⚠️ Token is EXPIRED!")
-        except Exception as e:
-            logger.warning(f"Could not decode token structure: {e}")
+        # Диагностика структуры токена (второе декодирование) - только при включённом DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            _log_token_diagnostics(logger, token)
         
         # Декодируем с проверкой подписи
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            logger.info(f"✅ Token decoded successfully with signature verification. Payload: {payload}")
+            logger.debug("Token decoded successfully with signature verification")
         except Exception as e:
             logger.error(f"❌ Error decoding token: {type(e).__name__}: {e}")
             raise
@@ -88,7 +90,7 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
             logger.warning(f"Token type mismatch: expected {token_type}, got {token_type_in_payload}")
             return None
         
-        logger.info(f"Token type verified: {token_type}")
+        logger.debug("Token type verified: %s", token_type)
         return payload
     except jwt.ExpiredSignatureError as e:
         logger.warning(f"Token expired: {e}")
@@ -105,3 +107,21 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         logger.error(f"Unexpected error verifying token: {type(e).__name__}: {e}", exc_info=True)
         return None
 
+
+
+def get_token_claims(token: str) -> Optional[dict]:
+    """
+    Тихая проверка access token (без диагностического логирования verify_token)
+    Используется middleware для ключей на уровне пользователя; None - токен невалиден или без sub
+    """
+    if not settings.SECRET_KEY:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") not in (None, "access"):
+        return None
+    if payload.get("sub") is None:
+        return None
+    return payload
@@ -0,0 +1,82 @@
+"""
+Страницы SPA (index.html и другие страницы верхнего уровня) из памяти
+Файлы читаются один раз при старте: ETag и сжатые варианты считаются заранее,
+запрос к SPA-маршруту не делает stat/open. В DEBUG изменённый файл перечитывается
+(по mtime) - правки HTML видны без перезапуска
+"""
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from core.static_files import cached_response
+
+logger = logging.getLogger(__name__)
+
+SHELL_CACHE_CONTROL = "no-cache"  # Всегда ревалидация по ETag: страница ссылается на ассеты текущей сборки
+
+
+@dataclass
+class CachedPage:
+    """Страница в памяти: тело, сжатые варианты и ETag"""
+    body: bytes
+    etag: str
+    mtime_ns: int
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _load_page(path: Path) -> CachedPage:
+    body = path.read_bytes()
+    page = CachedPage(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        mtime_ns=path.stat().st_mtime_ns,
+    )
+    # .br - только готовый из сборки (frontend/build_assets.py); gzip - на месте, если такого нет
+    brotli_path = path.with_name(path.name + ".br")
+    if brotli_path.is_file():
+        page.variants["br"] = brotli_path.read_bytes()
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        page.variants["gzip"] = compressed
+    return page
+
+
+class SPAShell:
+    """Кэш страниц SPA: name -> CachedPage"""
+
+    def __init__(self, directory: Path, pages: Iterable[str], reload: bool = False):
+        self.directory = directory
+        self.reload = reload
+        self.pages: Dict[str, CachedPage] = {}
+        for name in pages:
+            path = directory / name
+            if path.is_file():
+                self.pages[name] = _load_page(path)
+        logger.info("Страницы SPA загружены в память: %s", ", ".join(self.pages) or "нет")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.pages
+
+    def _get(self, name: str) -> Optional[CachedPage]:
+        page = self.pages.get(name)
+        if page is not None and self.reload:
+            path = self.directory / name
+            try:
+                if path.stat().st_mtime_ns != page.mtime_ns:
+                    page = self.pages[name] = _load_page(path)
+            except FileNotFoundError:
+                pass
+        return page
+
+    def response(self, name: str, headers: Headers) -> Optional[Response]:
+        """Ответ со страницей (304 при совпадении ETag) или None, если страницы нет"""
+        page = self._get(name)
+        if page is None:
+            return None
+        return cached_response(page.body, page.etag, page.variants, headers, "text/html", SHELL_CACHE_CONTROL)
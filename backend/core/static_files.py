@@ -0,0 +1,115 @@
+"""
+Раздача статики фронтенда
+- предварительно сжатые варианты (.br, .gz из frontend/build_assets.py) по Accept-Encoding
+- файлы с хэшем в имени (api.3f9c1a2b7e.js) кэшируются навсегда: Cache-Control immutable;
+  остальные - с ревалидацией по ETag (no-cache)
+- ответы из памяти (страницы SPA, юридические документы): ETag, 304 и сжатые варианты
+"""
+import gzip
+import mimetypes
+import re
+import stat
+from typing import Dict, Mapping
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него только gzip
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Хэш содержимого перед расширением, как в build_assets.py: name.<10 hex>.js
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+# Порядок предпочтения: brotli меньше gzip
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def parse_accept_encoding(header: str) -> set:
+    """Кодировки из Accept-Encoding: "gzip, br;q=0.9" -> {"gzip", "br"}"""
+    return {token.split(";", 1)[0].strip().lower() for token in header.split(",") if token.strip()}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Совпадение If-None-Match с ETag (слабое сравнение, как требует RFC 9110 для GET)"""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Сжатые варианты тела для ответов из памяти (только те, что меньше исходного)"""
+    variants = {}
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants["gzip"] = compressed
+    return variants
+
+
+def cached_response(
+    body: bytes,
+    etag: str,
+    variants: Mapping[str, bytes],
+    headers: Headers,
+    media_type: str,
+    cache_control: str,
+) -> Response:
+    """Ответ с телом из памяти: 304 при совпадении ETag, иначе подходящий по Accept-Encoding вариант"""
+    response_headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=response_headers)
+
+    accepted = parse_accept_encoding(headers.get("accept-encoding", ""))
+    for encoding, _ in ENCODINGS:
+        if encoding in variants and encoding in accepted:
+            body = variants[encoding]
+            response_headers["Content-Encoding"] = encoding
+            break
+    return Response(content=body, media_type=media_type, headers=response_headers)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, отдающий готовые .br/.gz рядом с файлом и ставящий заголовки кэширования"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Vary"] = "Accept-Encoding"
+            response.headers["Cache-Control"] = (
+                IMMUTABLE_CACHE_CONTROL if FINGERPRINT_RE.search(path) else REVALIDATE_CACHE_CONTROL
+            )
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope):
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accepted = parse_accept_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["Content-Encoding"] = encoding
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            response.headers["Content-Type"] = media_type
+            return response
+        return None
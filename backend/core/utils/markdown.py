@@ -0,0 +1,54 @@
+"""
+Markdown -> HTML для юридических документов (content/legal)
+Поддерживается то, что используется в документах: заголовки (#..######), абзацы,
+маркированные списки (- пункт, в том числе с отступом сразу после строки абзаца) и **жирный**.
+Весь текст экранируется: HTML в исходнике не пропускается
+"""
+import html
+import re
+from typing import List
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+LIST_ITEM_RE = re.compile(r"^\s*[-*]\s+(.*)$")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _inline(text: str) -> str:
+    return BOLD_RE.sub(r"<strong>\1</strong>", html.escape(text.strip(), quote=False))
+
+
+def render_markdown(text: str) -> str:
+    """HTML для Markdown-текста (подмножество, см. описание модуля)"""
+    blocks: List[str] = []
+    paragraph: List[str] = []
+    items: List[str] = []
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            blocks.append("<p>" + "<br>\n".join(_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    def flush_list() -> None:
+        if items:
+            blocks.append("<ul>\n" + "\n".join(f"<li>{_inline(item)}</li>" for item in items) + "\n</ul>")
+            items.clear()
+
+    for line in text.splitlines():
+        heading = HEADING_RE.match(line)
+        item = LIST_ITEM_RE.match(line)
+        if not line.strip() or heading:
+            flush_paragraph()
+            flush_list()
+            if heading:
+                level = len(heading.group(1))
+                blocks.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif item:
+            # Абзац перед списком закрывается: "3.1. ... для:\n   - пункт"
+            flush_paragraph()
+            items.append(item.group(1))
+        else:
+            flush_list()
+            paragraph.append(line)
+    flush_paragraph()
+    flush_list()
+    return "\n".join(blocks)
@@ -0,0 +1,33 @@
+"""
+Адреса и пути аватаров в контентно-адресуемом хранилище
+Файл: UPLOAD_DIR/avatars/<sha256[:2]>/<sha256>/<size>.webp
+URL:  /media/avatars/<sha256>/<size>.webp - содержимое по адресу не меняется (кэшируется навсегда)
+"""
+import re
+from pathlib import Path
+from typing import Dict
+
+from core.config import settings
+
+MEDIA_URL_PREFIX = "/media/avatars"
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def avatar_dir(digest: str) -> Path:
+    """Каталог вариантов аватара с хэшем digest"""
+    return Path(settings.UPLOAD_DIR) / "avatars" / digest[:2] / digest
+
+
+def avatar_path(digest: str, size: int) -> Path:
+    """Файл варианта аватара"""
+    return avatar_dir(digest) / f"{size}.webp"
+
+
+def avatar_url(digest: str, size: int) -> str:
+    """Неизменяемый URL варианта аватара"""
+    return f"{MEDIA_URL_PREFIX}/{digest}/{size}.webp"
+
+
+def avatar_urls(digest: str) -> Dict[str, str]:
+    """URL всех вариантов: {"64": ..., "128": ..., "256": ...}"""
+    return {str(size): avatar_url(digest, size) for size in settings.AVATAR_SIZES}
@@ -0,0 +1,42 @@
+"""
+Курсорная (keyset) пагинация
+Курсор кодирует пару (created_at, id) последней отданной строки
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from core.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Кодирование курсора из (created_at, id) в непрозрачную строку"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Декодирование курсора; None - первая страница"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Некорректный курсор пагинации")
+
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    """
+    Курсор следующей страницы
+    Репозиторий запрашивает limit + 1 строк: лишняя строка означает, что есть продолжение
+    """
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
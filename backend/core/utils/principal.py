@@ -0,0 +1,29 @@
+"""
+Идентификация инициатора запроса для ключей middleware (rate limiting, Idempotency-Key)
+"""
+import hashlib
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from core.security.jwt import get_token_claims
+
+
+def request_principal(scope: Scope) -> str:
+    """
+    Пользователь из JWT (u<id>, сотрудник - s<id>: id из разных таблиц;
+    ребёнок - u<id родителя>c<child_id>: у токена ребёнка sub - родитель);
+    невалидный токен - его хеш; без токена - адрес клиента
+    """
+    authorization = Headers(scope=scope).get("authorization", "")
+    if authorization.startswith("Bearer "):
+        claims = get_token_claims(authorization[7:].strip())
+        if claims:
+            if claims.get("is_staff"):
+                return f"s{claims['sub']}"
+            if claims.get("child_id") is not None:
+                return f"u{claims['sub']}c{claims['child_id']}"
+            return f"u{claims['sub']}"
+        return "t" + hashlib.sha256(authorization.encode()).hexdigest()[:16]
+    client = scope.get("client")
+    return f"ip{client[0]}" if client else "anon"
@@ -0,0 +1,4 @@
+"""
+Нагрузочный бенчмарк основных сценариев API
+Запуск: python -m loadtest --help (из директории backend)
+"""
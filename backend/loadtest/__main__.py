@@ -0,0 +1,84 @@
+"""
+CLI нагрузочного бенчмарка
+
+Использование (из директории backend, нужна PostgreSQL из DATABASE_URL с применёнными миграциями):
+    python -m loadtest --families 50 --concurrency 20 --duration 30 --save loadtest/baselines/main.json
+    python -m loadtest --mix write_heavy --compare loadtest/baselines/main.json
+    python -m loadtest --base-url http://localhost:8000   # против запущенного сервера (uvicorn --workers N)
+    python -m loadtest --drop                             # удалить данные бенчмарка
+
+Без --base-url приложение работает в том же процессе (httpx.ASGITransport, rate limit отключён);
+с --base-url лимиты входа сервера остаются в силе - запускайте его с RATE_LIMIT_DEFAULT и лимитами под нагрузку
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from loadtest.flows import FLOWS, MIXES
+from loadtest.runner import RunConfig, format_report, load_report, run_load, save_report
+from loadtest.seed import drop_families, reset_stars, seed_families
+
+
+def parse_weights(value: str) -> dict:
+    """"login=5,dashboard=40" -> {"login": 5, "dashboard": 40}"""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f"неизвестный сценарий: {name}")
+        weights[name] = int(weight)
+    return weights
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Нагрузочный бенчмарк API")
+    parser.add_argument("--families", type=int, default=50, help="число засеянных семей")
+    parser.add_argument("--tasks-per-child", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=20, help="число виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=30.0, help="длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=5.0, help="прогрев без замеров, с")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default", help="набор весов сценариев")
+    parser.add_argument("--weights", type=parse_weights, help="свои веса: login=5,dashboard=40")
+    parser.add_argument("--base-url", help="URL запущенного сервера (по умолчанию - in-process)")
+    parser.add_argument("--save", type=Path, help="сохранить отчёт как JSON-базлайн")
+    parser.add_argument("--compare", type=Path, help="сравнить с JSON-базлайном")
+    parser.add_argument("--drop", action="store_true", help="удалить данные бенчмарка и выйти")
+    return parser
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.drop:
+        print(f"Удалено семей: {await drop_families()}")
+        return 0
+
+    config = RunConfig(
+        families=args.families,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        warmup=args.warmup,
+        seed=args.seed,
+        mix=args.mix if not args.weights else "custom",
+        weights=args.weights or MIXES[args.mix],
+        base_url=args.base_url,
+    )
+    families = await seed_families(args.families, args.tasks_per_child)
+    if not families:
+        print("Нет семей для прогона", file=sys.stderr)
+        return 1
+    await reset_stars(families)
+
+    report = await run_load(config, families)
+    baseline = load_report(args.compare) if args.compare else None
+    print(format_report(report, baseline))
+
+    if args.save:
+        save_report(report, args.save)
+        print(f"Базлайн сохранён: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
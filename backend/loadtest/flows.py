@@ -0,0 +1,150 @@
+"""
+Сценарии нагрузки: один сценарий - одна пользовательская операция (иногда несколько HTTP-запросов)
+Задержка сценария - время всех его запросов; ошибка - любой ответ не из ожидаемых статусов
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from loadtest.seed import BENCH_PASSWORD, BENCH_PIN, Family
+
+CSRF_TOKEN = "loadtest"
+
+
+class FlowError(Exception):
+    """Неожиданный ответ в сценарии"""
+
+    def __init__(self, response: httpx.Response):
+        self.status_code = response.status_code
+        super().__init__(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+
+
+@dataclass
+class VirtualUser:
+    """Состояние виртуального пользователя: семья, токены, refresh cookie"""
+    family: Family
+    client: httpx.AsyncClient
+    rng: random.Random
+    access_token: Optional[str] = None
+    child_token: Optional[str] = None
+    refresh_cookie: Optional[str] = None
+    extra: Dict = field(default_factory=dict)
+
+    def auth(self, token: Optional[str] = None) -> dict:
+        return {"Authorization": f"Bearer {token or self.access_token}", "X-CSRF-Token": CSRF_TOKEN}
+
+
+def _check(response: httpx.Response, *expected: int) -> httpx.Response:
+    if response.status_code not in (expected or (200,)):
+        raise FlowError(response)
+    return response
+
+
+async def login(user: VirtualUser) -> None:
+    """Вход родителя по телефону и паролю (+ refresh cookie)"""
+    response = _check(await user.client.post(
+        "/api/auth/login", json={"phone": user.family.phone, "password": BENCH_PASSWORD}
+    ))
+    user.access_token = response.json()["access_token"]
+    user.refresh_cookie = response.cookies.get("refresh_token") or user.refresh_cookie
+
+
+async def refresh(user: VirtualUser) -> None:
+    """Ротация refresh token"""
+    if not user.refresh_cookie:
+        await login(user)
+    response = _check(await user.client.post(
+        "/api/auth/refresh", headers={"Cookie": f"refresh_token={user.refresh_cookie}"}
+    ))
+    user.access_token = response.json()["access_token"]
+    user.refresh_cookie = response.cookies.get("refresh_token") or user.refresh_cookie
+
+
+async def child_pin_login(user: VirtualUser) -> None:
+    """Вход ребёнка по PIN"""
+    response = _check(await user.client.post(
+        "/api/auth/child-pin",
+        json={"child_id": user.family.child_id, "pin": BENCH_PIN},
+        headers={"X-CSRF-Token": CSRF_TOKEN},
+    ))
+    user.child_token = response.json()["access_token"]
+
+
+async def task_toggle(user: VirtualUser) -> None:
+    """Отметка задачи выполненной / снятие отметки"""
+    task_id = user.rng.choice(user.family.task_ids)
+    completed = not user.extra.get(task_id, False)
+    _check(await user.client.put(
+        f"/api/tasks/{task_id}", json={"completed": completed}, headers=user.auth(user.child_token)
+    ))
+    user.extra[task_id] = completed
+
+
+async def star_award(user: VirtualUser) -> None:
+    """Начисление звёзд"""
+    _check(await user.client.post(
+        "/api/stars/add",
+        json={"description": "Нагрузочный тест", "stars": user.rng.randint(1, 3)},
+        headers=user.auth(),
+    ))
+
+
+async def star_exchange(user: VirtualUser) -> None:
+    """Обмен звёзд на валюту копилки (с Idempotency-Key, как мобильный клиент)"""
+    # Ключ не из ГПСЧ: при повторном прогоне с тем же seed вернулись бы сохранённые ответы
+    headers = {**user.auth(), "Idempotency-Key": uuid.uuid4().hex}
+    _check(await user.client.post("/api/stars/exchange", json={"stars": 15}, headers=headers))
+
+
+async def dashboard(user: VirtualUser) -> None:
+    """Главный экран: дети, звёзды, задачи, копилка"""
+    headers = user.auth()
+    for path in ("/api/children/", "/api/stars/", "/api/tasks/", "/api/piggy/"):
+        _check(await user.client.get(path, headers=headers))
+
+
+FlowFn = Callable[[VirtualUser], Awaitable[None]]
+
+FLOWS: Dict[str, FlowFn] = {
+    "login": login,
+    "refresh": refresh,
+    "child_pin_login": child_pin_login,
+    "task_toggle": task_toggle,
+    "star_award": star_award,
+    "star_exchange": star_exchange,
+    "dashboard": dashboard,
+}
+
+# Смеси: вес сценария - доля среди выполняемых операций
+MIXES: Dict[str, Dict[str, int]] = {
+    # Обычный день: в основном чтение главного экрана и отметки задач
+    "default": {
+        "login": 5,
+        "refresh": 5,
+        "child_pin_login": 5,
+        "task_toggle": 25,
+        "star_award": 15,
+        "star_exchange": 5,
+        "dashboard": 40,
+    },
+    # Утренний пик входов
+    "auth_heavy": {
+        "login": 35,
+        "refresh": 25,
+        "child_pin_login": 25,
+        "dashboard": 15,
+    },
+    # Вечер: дети закрывают задачи и получают звёзды
+    "write_heavy": {
+        "task_toggle": 40,
+        "star_award": 35,
+        "star_exchange": 15,
+        "dashboard": 10,
+    },
+    "read_only": {
+        "dashboard": 100,
+    },
+}
@@ -0,0 +1,223 @@
+"""
+Исполнитель нагрузки: N виртуальных пользователей, взвешенная смесь сценариев,
+перцентили задержки и пропускная способность по сценариям, JSON-базлайны
+"""
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.flows import CSRF_TOKEN, FLOWS, FlowError, VirtualUser
+from loadtest.seed import Family
+
+
+@dataclass
+class RunConfig:
+    """Параметры прогона (сохраняются в базлайн для воспроизводимости)"""
+    families: int = 50
+    concurrency: int = 20
+    duration: float = 30.0
+    warmup: float = 5.0
+    seed: int = 42
+    mix: str = "default"
+    weights: Dict[str, int] = field(default_factory=dict)
+    base_url: Optional[str] = None
+
+
+@dataclass
+class FlowStats:
+    """Итог по сценарию"""
+    count: int
+    errors: int
+    throughput: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    error_codes: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль методом nearest-rank (значения отсортированы)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Сбор задержек; до окончания прогрева замеры отбрасываются"""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, flow: str, elapsed: float, error: Optional[str] = None) -> None:
+        if not self.recording:
+            return
+        if error is None:
+            self.latencies[flow].append(elapsed)
+        else:
+            self.errors[flow][error] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, FlowStats]:
+        result = {}
+        for flow in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[flow])
+            errors = sum(self.errors[flow].values())
+            result[flow] = FlowStats(
+                count=len(values),
+                errors=errors,
+                throughput=round(len(values) / elapsed, 2) if elapsed else 0.0,
+                mean_ms=round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+                p50_ms=round(percentile(values, 50) * 1000, 2),
+                p95_ms=round(percentile(values, 95) * 1000, 2),
+                p99_ms=round(percentile(values, 99) * 1000, 2),
+                max_ms=round(values[-1] * 1000, 2) if values else 0.0,
+                error_codes=dict(self.errors[flow]),
+            )
+        return result
+
+
+def _make_client(base_url: Optional[str]) -> httpx.AsyncClient:
+    """Клиент к внешнему серверу или к приложению в том же процессе (ASGITransport)"""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    cookies = {"csrf_token": CSRF_TOKEN}
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=30.0)
+
+    from main import app
+    from core.middleware.rate_limit import limiter
+
+    # Лимиты входа (5/minute) рассчитаны на людей, а не на бенчмарк
+    limiter.enabled = False
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://localhost", cookies=cookies, timeout=30.0
+    )
+
+
+async def _prepare(user: VirtualUser) -> None:
+    """Вход родителя и ребёнка до начала замеров"""
+    await FLOWS["login"](user)
+    await FLOWS["child_pin_login"](user)
+
+
+async def _worker(
+    user: VirtualUser, flows: List[str], weights: List[int], recorder: Recorder, deadline: float
+) -> None:
+    while time.perf_counter() < deadline:
+        flow = user.rng.choices(flows, weights)[0]
+        started = time.perf_counter()
+        try:
+            await FLOWS[flow](user)
+        except FlowError as exc:
+            recorder.record(flow, 0.0, str(exc.status_code))
+        except httpx.HTTPError as exc:
+            recorder.record(flow, 0.0, type(exc).__name__)
+        else:
+            recorder.record(flow, time.perf_counter() - started)
+
+
+async def run_load(config: RunConfig, families: List[Family]) -> Dict:
+    """Прогон нагрузки; возвращает отчёт (тот же формат, что и у базлайна)"""
+    flows = [flow for flow, weight in config.weights.items() if weight > 0]
+    weights = [config.weights[flow] for flow in flows]
+    recorder = Recorder()
+
+    async with _make_client(config.base_url) as client:
+        # Каждый виртуальный пользователь - своя семья и свой ГПСЧ: порядок операций
+        # воспроизводим при одинаковом seed
+        users = [
+            VirtualUser(family=families[index % len(families)], client=client, rng=random.Random(config.seed + index))
+            for index in range(config.concurrency)
+        ]
+        await asyncio.gather(*(_prepare(user) for user in users))
+
+        started = time.perf_counter()
+        deadline = started + config.warmup + config.duration
+        workers = [
+            asyncio.create_task(_worker(user, flows, weights, recorder, deadline)) for user in users
+        ]
+        await asyncio.sleep(config.warmup)
+        recorder.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - measured_from
+
+    results = recorder.summary(elapsed)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "elapsed_s": round(elapsed, 2),
+            "config": asdict(config),
+        },
+        "total": {
+            "count": sum(stats.count for stats in results.values()),
+            "errors": sum(stats.errors for stats in results.values()),
+            "throughput": round(sum(stats.throughput for stats in results.values()), 2),
+        },
+        "flows": {flow: asdict(stats) for flow, stats in results.items()},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_report(report: Dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_report(path: Path) -> Dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def format_report(report: Dict, baseline: Optional[Dict] = None) -> str:
+    """Таблица по сценариям; с базлайном - изменение p95 и пропускной способности в процентах"""
+    header = f"{'flow':<16}{'count':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline:
+        header += f"{'Δp95':>9}{'Δrps':>9}"
+    lines = [header, "-" * len(header)]
+    base_flows = (baseline or {}).get("flows", {})
+
+    for flow, stats in report["flows"].items():
+        line = (
+            f"{flow:<16}{stats['count']:>8}{stats['errors']:>6}{stats['throughput']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+        )
+        if baseline:
+            base = base_flows.get(flow)
+            line += _delta(stats["p95_ms"], base and base["p95_ms"]) + _delta(
+                stats["throughput"], base and base["throughput"]
+            )
+        lines.append(line)
+
+    total = report["total"]
+    lines.append("-" * len(header))
+    lines.append(f"{'total':<16}{total['count']:>8}{total['errors']:>6}{total['throughput']:>9.1f}")
+    return "\n".join(lines)
+
+
+def _delta(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return f"{'n/a':>9}"
+    return f"{(current - previous) / previous * 100:>+8.1f}%"
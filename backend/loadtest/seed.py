@@ -0,0 +1,155 @@
+"""
+Засев семей для бенчмарка: родитель + ребёнок + согласие + доступ по PIN + задачи + звёзды
+Данные помечены доменом email BENCH_EMAIL_DOMAIN; повторный запуск дозаполняет недостающие семьи
+"""
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import delete, select, update
+
+from core.database import AsyncSessionLocal
+from core.security.password import hash_password
+from models.child import Child
+from models.child_access import ChildAccess
+from models.parent_consent import ParentConsent
+from models.piggy import Piggy
+from models.star import Star
+from models.task import Task, TaskStatus, TaskType
+from models.user import User, UserRole
+
+BENCH_EMAIL_DOMAIN = "loadtest.local"
+BENCH_PASSWORD = "LoadTest-123"
+BENCH_PIN = "1234"
+# Запас звёзд, чтобы обмен не упирался в баланс за время прогона
+BENCH_STARS = 10 ** 7
+
+
+@dataclass
+class Family:
+    """Учётные данные одной семьи для виртуального пользователя"""
+    user_id: int
+    phone: str
+    child_id: int
+    task_ids: List[int]
+
+
+def bench_phone(index: int) -> str:
+    return f"+7990{index:07d}"
+
+
+def bench_email(index: int) -> str:
+    return f"family{index}@{BENCH_EMAIL_DOMAIN}"
+
+
+async def seed_families(count: int, tasks_per_child: int = 10) -> List[Family]:
+    """Создание недостающих семей 0..count-1 и загрузка всех"""
+    # bcrypt дорогой: один хеш на все семьи
+    password_hash = hash_password(BENCH_PASSWORD)
+    pin_hash = hash_password(BENCH_PIN)
+
+    async with AsyncSessionLocal() as session:
+        existing = await session.execute(
+            select(User.email).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))
+        )
+        existing_emails = set(existing.scalars().all())
+
+        for index in range(count):
+            if bench_email(index) in existing_emails:
+                continue
+            user = User(
+                email=bench_email(index),
+                phone=bench_phone(index),
+                password_hash=password_hash,
+                role=UserRole.PARENT,
+                name=f"Семья {index}",
+            )
+            session.add(user)
+            await session.flush()
+
+            child = Child(user_id=user.id, name=f"Ребёнок {index}")
+            session.add(child)
+            await session.flush()
+
+            session.add_all([
+                ParentConsent(user_id=user.id, child_id=child.id, consent_given=True),
+                ChildAccess(child_id=child.id, pin_hash=pin_hash, is_active=True),
+                Star(child_id=child.id, today=BENCH_STARS, total=BENCH_STARS),
+                Piggy(child_id=child.id),
+            ])
+            session.add_all([
+                Task(
+                    child_id=child.id,
+                    text=f"Задача {position}",
+                    task_type=TaskType.CHECKLIST if position % 2 == 0 else TaskType.KANBAN,
+                    status=None if position % 2 == 0 else TaskStatus.TODO,
+                    stars=1,
+                    position=position,
+                )
+                for position in range(tasks_per_child)
+            ])
+        await session.commit()
+
+        return await load_families(session, count)
+
+
+async def load_families(session, count: int) -> List[Family]:
+    """Семьи бенчмарка с ID ребёнка и задач"""
+    rows = await session.execute(
+        select(User.id, User.phone, Child.id)
+        .join(Child, Child.user_id == User.id)
+        .where(User.email.in_([bench_email(index) for index in range(count)]))
+        .order_by(User.id)
+    )
+    families = [Family(user_id, phone, child_id, []) for user_id, phone, child_id in rows.all()]
+    by_child = {family.child_id: family for family in families}
+    tasks = await session.execute(
+        select(Task.child_id, Task.id).where(Task.child_id.in_(by_child)).order_by(Task.id)
+    )
+    for child_id, task_id in tasks.all():
+        by_child[child_id].task_ids.append(task_id)
+    return families
+
+
+async def reset_stars(families: List[Family]) -> None:
+    """Восстановление запаса звёзд перед прогоном (обмен их расходует)"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Star)
+            .where(Star.child_id.in_([family.child_id for family in families]))
+            .values(today=BENCH_STARS)
+        )
+        await session.commit()
+
+
+async def drop_families() -> int:
+    """Удаление всех данных бенчмарка (по домену email)"""
+    from models.piggy import PiggyGoal, PiggyHistory, PiggySnapshot
+    from models.refresh_token import RefreshToken
+    from models.settings import Settings
+    from models.star import StarHistory, StarStreak
+
+    async with AsyncSessionLocal() as session:
+        user_ids = select(User.id).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}")).scalar_subquery()
+        child_ids = select(Child.id).where(Child.user_id.in_(user_ids)).scalar_subquery()
+        star_ids = select(Star.id).where(Star.child_id.in_(child_ids)).scalar_subquery()
+        piggy_ids = select(Piggy.id).where(Piggy.child_id.in_(child_ids)).scalar_subquery()
+        count = len((await session.execute(select(User.id).where(User.id.in_(user_ids)))).all())
+        for statement in (
+            delete(StarHistory).where(StarHistory.star_id.in_(star_ids)),
+            delete(StarStreak).where(StarStreak.star_id.in_(star_ids)),
+            delete(PiggySnapshot).where(PiggySnapshot.piggy_id.in_(piggy_ids)),
+            delete(PiggyHistory).where(PiggyHistory.piggy_id.in_(piggy_ids)),
+            delete(PiggyGoal).where(PiggyGoal.piggy_id.in_(piggy_ids)),
+            delete(Settings).where(Settings.child_id.in_(child_ids)),
+            delete(Piggy).where(Piggy.child_id.in_(child_ids)),
+            delete(Star).where(Star.child_id.in_(child_ids)),
+            delete(Task).where(Task.child_id.in_(child_ids)),
+            delete(ChildAccess).where(ChildAccess.child_id.in_(child_ids)),
+            delete(ParentConsent).where(ParentConsent.child_id.in_(child_ids)),
+            delete(Child).where(Child.id.in_(child_ids)),
+            delete(RefreshToken).where(RefreshToken.user_id.in_(user_ids)),
+            delete(User).where(User.id.in_(user_ids)),
+        ):
+            await session.execute(statement)
+        await session.commit()
+        return count
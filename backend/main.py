@@ -3,11 +3,13 @@
 Согласно rules.md: async-first, security, production-ready
 """
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
+from core.static_files import PrecompressedStaticFiles
+from core.spa import SPAShell
 from pathlib import Path
 from sqlalchemy.exc import OperationalError, DisconnectionError
 from sqlalchemy import select
@@ -17,14 +19,48 @@ import asyncpg
 from core.config import settings
 from core.database import get_db
 from core.exceptions import setup_exception_handlers
-from routers import auth, users, children, tasks, stars, piggy, settings as settings_router, weekly_stats, diary, wishlist, legal, subscription, support, admin, parent, staff
+from core.responses import ORJSONResponse
+from routers import auth, users, children, tasks, stars, piggy, settings as settings_router, weekly_stats, diary, wishlist, legal, subscription, support, admin, parent, staff, media
 
 # Настройка логирования (согласно rules.md: JSON логи)
 from core.logging_config import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Фоновые задачи обслуживания (core/scheduler.py), доставка уведомлений и пул обработки медиа живут вместе с процессом приложения"""
+    # Юридические документы читаются и рендерятся при старте: ошибка в файле не доживает до запроса
+    from services.legal_service import get_legal_library
+    get_legal_library()
+    scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        from core.scheduler import Scheduler
+        from services.maintenance_service import maintenance_jobs
+        scheduler = Scheduler(maintenance_jobs())
+        scheduler.start()
+    app.state.scheduler = scheduler
+    dispatcher = None
+    if settings.NOTIFICATION_DELIVERY_ENABLED and settings.NOTIFICATION_WORKERS > 0:
+        from services.notification_delivery import NotificationDispatcher
+        dispatcher = NotificationDispatcher()
+        dispatcher.start()
+    app.state.notification_dispatcher = dispatcher
+    try:
+        yield
+    finally:
+        if dispatcher:
+            await dispatcher.stop()
+        if scheduler:
+            await scheduler.stop()
+        from services.media_service import shutdown_executor
+        shutdown_executor()
+
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="Дневник успеха API",
     description="Backend API для приложения Дневник успеха",
     version="1.0.0",
@@ -38,7 +74,7 @@ app.add_middleware(
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "X-CSRF-Token", "X-Requested-With"],
+    allow_headers=["Content-Type", "Authorization", "X-CSRF-Token", "X-Requested-With", "Idempotency-Key"],
 )
 
 # Trusted Host Middleware (защита от Host header attacks)
@@ -73,16 +109,23 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 # Настройка rate limiting (согласно rules.md)
-from core.middleware.rate_limit import limiter, RateLimitExceeded, _rate_limit_exceeded_handler
-from slowapi.middleware import SlowAPIMiddleware
+from core.middleware.rate_limit import limiter, RateLimitExceeded, RateLimitMiddleware, _rate_limit_exceeded_handler
 app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Idempotency-Key для мутирующих запросов (добавляется до CSRF, чтобы выполняться после проверки токена)
+from core.middleware.idempotency import IdempotencyMiddleware
+app.add_middleware(IdempotencyMiddleware)
+
 # Настройка CSRF защиты (согласно rules.md)
 from core.middleware.csrf_middleware import CSRFMiddleware
 app.add_middleware(CSRFMiddleware)
 
+# Метрики запросов (добавляется последним - внешний слой, учитывает время всех middleware)
+from core.middleware.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # Обработка всех необработанных исключений
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -148,6 +191,7 @@ app.include_router(support.router, prefix="/api/support", tags=["support"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(parent.router, prefix="/api/parent", tags=["parent"])
 app.include_router(staff.router, prefix="/api/staff", tags=["staff"])
+app.include_router(media.router, prefix="/media", tags=["media"])
 
 
 @app.get("/health")
@@ -172,42 +216,75 @@ async def ready_check(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=503, detail="Database not ready")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Метрики в формате Prometheus
+    Внутренний endpoint: доступен только из METRICS_ALLOWED_NETWORKS
+    """
+    import ipaddress
+    from fastapi.responses import Response
+    from core.metrics import render_metrics
+
+    client_host = request.client.host if request.client else None
+    try:
+        client_ip = ipaddress.ip_address(client_host)
+        allowed = any(client_ip in ipaddress.ip_network(net) for net in settings.METRICS_ALLOWED_NETWORKS)
+    except (TypeError, ValueError):
+        allowed = False
+    if not settings.METRICS_ENABLED or not allowed:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
 # Обслуживание статических файлов
+# Сборка frontend/build_assets.py (хэшированные имена, .br/.gz) отдаётся, если она есть; иначе - исходники
 frontend_path = Path(__file__).parent.parent / "frontend"
+if (frontend_path / "dist" / "index.html").exists():
+    frontend_path = frontend_path / "dist"
 static_path = frontend_path / "static"
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=str(static_path)), name="static")
 
 # Обслуживание статических файлов из src (JS, CSS)
 src_path = frontend_path / "src"
 if src_path.exists():
-    app.mount("/src", StaticFiles(directory=str(src_path)), name="src")
+    app.mount("/src", PrecompressedStaticFiles(directory=str(src_path)), name="src")
+
+# Страницы SPA - из памяти (core/spa.py): загружаются при старте, в DEBUG перечитываются при изменении
+SPA_PAGES = ("index.html", "admin.html", "staff.html", "staff-dashboard.html", "register.html")
+# Маршруты, которые отдают не index.html (как во frontend/spa_server.py)
+SPA_PAGE_ROUTES = {
+    **{name: name for name in SPA_PAGES},
+    "staff": "staff.html",
+    "staff/login": "staff.html",
+    "staff/dashboard": "staff-dashboard.html",
+}
+# API, служебные пути и статика не попадают в SPA fallback
+SPA_EXCLUDED_PREFIXES = ("api/", "health", "ready", "static/", "src/", "media/")
+spa_shell = SPAShell(frontend_path, SPA_PAGES, reload=settings.DEBUG)
+
 
-# Обслуживание index.html для SPA маршрутов
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Корневой endpoint - возвращает index.html для SPA"""
-    index_file = frontend_path / "index.html"
-    if index_file.exists():
-        return FileResponse(str(index_file))
+    response = spa_shell.response("index.html", request.headers)
+    if response is not None:
+        return response
     return {"message": "Дневник успеха API", "version": "1.0.0"}
 
 # Catch-all для SPA маршрутов (должен быть последним)
 @app.get("/{path:path}")
 async def serve_spa(path: str, request: Request):
     """Catch-all для SPA маршрутов - возвращает index.html для всех не-API запросов"""
-    # Пропускаем API запросы
-    if path.startswith("api/") or path.startswith("health") or path.startswith("ready"):
-        raise HTTPException(status_code=404, detail="Not Found")
-    
-    # Пропускаем статические файлы
-    if path.startswith("static/") or path.startswith("src/"):
+    if path.startswith(SPA_EXCLUDED_PREFIXES):
         raise HTTPException(status_code=404, detail="Not Found")
     
-    # Возвращаем index.html для всех остальных маршрутов
-    index_file = frontend_path / "index.html"
-    if index_file.exists():
-        return FileResponse(str(index_file))
+    response = spa_shell.response(SPA_PAGE_ROUTES.get(path, "index.html"), request.headers)
+    if response is not None:
+        return response
     
     raise HTTPException(status_code=404, detail="Not Found")
 
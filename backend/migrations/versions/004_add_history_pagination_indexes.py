@@ -0,0 +1,35 @@
+"""Add composite indexes for star/piggy history pagination
+
+Revision ID: 004_history_pagination_indexes
+Revises: e07352965a3e
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_history_pagination_indexes'
+down_revision = 'e07352965a3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset-пагинация: WHERE star_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_star_history_star_id_created_at_id',
+        'star_history',
+        ['star_id', 'created_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_piggy_history_piggy_id_created_at_id',
+        'piggy_history',
+        ['piggy_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_piggy_history_piggy_id_created_at_id', table_name='piggy_history')
+    op.drop_index('ix_star_history_star_id_created_at_id', table_name='star_history')
@@ -0,0 +1,49 @@
+"""Add diary full-text search vector and pagination index
+
+Revision ID: 005_diary_search_and_pagination
+Revises: 004_history_pagination_indexes
+Create Date: 2026-01-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_diary_search_and_pagination'
+down_revision = '004_history_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Генерируемый поисковый вектор (русская морфология), пересчитывается при INSERT/UPDATE
+    op.add_column(
+        'diary_entries',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian', coalesce(title, '') || ' ' || content)", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_diary_entries_search_vector',
+        'diary_entries',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+    # Keyset-пагинация: WHERE child_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index(
+        'ix_diary_entries_child_id_created_at_id',
+        'diary_entries',
+        ['child_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_diary_entries_child_id_created_at_id', table_name='diary_entries')
+    op.drop_index('ix_diary_entries_search_vector', table_name='diary_entries')
+    op.drop_column('diary_entries', 'search_vector')
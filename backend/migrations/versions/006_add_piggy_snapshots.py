@@ -0,0 +1,43 @@
+"""Add piggy_snapshots table (ledger balance checkpoints)
+
+Revision ID: 006_piggy_snapshots
+Revises: 005_diary_search_and_pagination
+Create Date: 2026-01-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_piggy_snapshots'
+down_revision = '005_diary_search_and_pagination'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Контрольные точки баланса копилки: баланс журнала до last_history_id включительно
+    op.create_table(
+        'piggy_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('piggy_id', sa.Integer(), nullable=False),
+        sa.Column('balance', sa.Numeric(10, 2), nullable=False),
+        sa.Column('last_history_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('entries_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['piggy_id'], ['piggies.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_piggy_snapshots_id'), 'piggy_snapshots', ['id'], unique=False)
+    op.create_index(
+        'ix_piggy_snapshots_piggy_id_last_history_id',
+        'piggy_snapshots',
+        ['piggy_id', 'last_history_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_piggy_snapshots_piggy_id_last_history_id', table_name='piggy_snapshots')
+    op.drop_index(op.f('ix_piggy_snapshots_id'), table_name='piggy_snapshots')
+    op.drop_table('piggy_snapshots')
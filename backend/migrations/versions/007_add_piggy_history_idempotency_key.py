@@ -0,0 +1,32 @@
+"""Add idempotency_key to piggy_history
+
+Revision ID: 007_piggy_history_idem_key
+Revises: 006_piggy_snapshots
+Create Date: 2026-01-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_piggy_history_idem_key'
+down_revision = '006_piggy_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('piggy_history', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    # Частичный уникальный индекс: ретрай с тем же ключом не создаст второе начисление
+    op.create_index(
+        'uq_piggy_history_piggy_id_idempotency_key',
+        'piggy_history',
+        ['piggy_id', 'idempotency_key'],
+        unique=True,
+        postgresql_where=sa.text('idempotency_key IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_piggy_history_piggy_id_idempotency_key', table_name='piggy_history')
+    op.drop_column('piggy_history', 'idempotency_key')
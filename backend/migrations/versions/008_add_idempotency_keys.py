@@ -0,0 +1,36 @@
+"""Add idempotency_keys table
+
+Revision ID: 008_idempotency_keys
+Revises: 007_piggy_history_idem_key
+Create Date: 2026-01-21
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_idempotency_keys'
+down_revision = '007_piggy_history_idem_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Сохранённые ответы для заголовка Idempotency-Key (TTL через expires_at)
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('response_body', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_idempotency_keys_expires_at'), 'idempotency_keys', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idempotency_keys_expires_at'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,70 @@
+"""Add composite, partial and covering indexes for hot queries
+
+Revision ID: 009_hot_query_indexes
+Revises: 008_idempotency_keys
+Create Date: 2026-01-23
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_hot_query_indexes'
+down_revision = '008_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+# star_history, piggy_history, diary_entries: индексы (fk, created_at, id) уже созданы в 004/005
+
+# Одноколоночные индексы по FK (были index=True в моделях): составные индексы начинаются с той же
+# колонки и обслуживают те же запросы, а планировщик выбирал меньший одноколоночный и сортировал
+REDUNDANT_FK_INDEXES = (
+    ('ix_tasks_child_id', 'tasks', 'child_id'),
+    ('ix_piggy_history_piggy_id', 'piggy_history', 'piggy_id'),
+    ('ix_diary_entries_child_id', 'diary_entries', 'child_id'),
+)
+
+
+def upgrade() -> None:
+    # Список задач: WHERE child_id = ? [AND task_type = ?] ORDER BY position, id
+    op.create_index(
+        'ix_tasks_child_id_task_type_position_id',
+        'tasks',
+        ['child_id', 'task_type', 'position', 'id'],
+        unique=False
+    )
+    # Уведомления пользователя: WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+    op.create_index(
+        'ix_notifications_user_id_created_at',
+        'notifications',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+    # Админка: WHERE role = ? ORDER BY created_at DESC; id в INCLUDE - count(id) по роли без чтения таблицы
+    op.create_index(
+        'ix_users_role_created_at',
+        'users',
+        ['role', 'created_at'],
+        unique=False,
+        postgresql_include=['id']
+    )
+    # Отзыв всех токенов пользователя: только активные (отозванные копятся до очистки)
+    op.create_index(
+        'ix_refresh_tokens_user_id_active',
+        'refresh_tokens',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('revoked_at IS NULL')
+    )
+    # Таблицы созданы по моделям (create_all), поэтому индекса может не быть
+    for name, _table, _column in REDUNDANT_FK_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+def downgrade() -> None:
+    for name, table, column in REDUNDANT_FK_INDEXES:
+        op.create_index(name, table, [column], unique=False)
+    op.drop_index('ix_refresh_tokens_user_id_active', table_name='refresh_tokens')
+    op.drop_index('ix_users_role_created_at', table_name='users')
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
+    op.drop_index('ix_tasks_child_id_task_type_position_id', table_name='tasks')
@@ -0,0 +1,116 @@
+"""Partition star_history and notifications by month
+
+Revision ID: 010_partition_history_tables
+Revises: 009_hot_query_indexes
+Create Date: 2026-01-26
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_partition_history_tables'
+down_revision = '009_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD_MONTHS = 3
+
+# Индексы и внешние ключи создаются на родительской таблице после загрузки данных
+# (имена совпадают с моделями, партиции получают свои копии автоматически)
+TABLES = {
+    'star_history': {
+        'indexes': (
+            ('ix_star_history_id', ['id']),
+            ('ix_star_history_star_id_created_at_id', ['star_id', 'created_at', 'id']),
+        ),
+        # Одноколоночный индекс по FK перекрыт составным: на партициях планировщик выбирал его
+        # и сортировал страницу, поэтому при переносе он не создаётся
+        'redundant_indexes': ('ix_star_history_star_id',),
+        'foreign_keys': (
+            ('star_history_star_id_fkey', 'star_id', 'stars'),
+        ),
+    },
+    'notifications': {
+        'indexes': (
+            ('ix_notifications_id', ['id']),
+            ('ix_notifications_subscription_id', ['subscription_id']),
+            ('ix_notifications_user_id_created_at', ['user_id', 'created_at']),
+        ),
+        'redundant_indexes': ('ix_notifications_user_id',),
+        'foreign_keys': (
+            ('notifications_user_id_fkey', 'user_id', 'users'),
+            ('notifications_subscription_id_fkey', 'subscription_id', 'subscriptions'),
+        ),
+    },
+}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months(first: date, last: date):
+    month = first
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _swap(table: str, partitioned: bool) -> None:
+    """Перенос таблицы в новую (секционированную или обычную) с тем же именем, данными и индексами"""
+    spec = TABLES[table]
+    old = f'{table}_old'
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    for constraint in (f'{table}_pkey', *(name for name, _, _ in spec['foreign_keys'])):
+        op.execute(f'ALTER TABLE {old} DROP CONSTRAINT IF EXISTS {constraint}')
+    for name in (*(name for name, _ in spec['indexes']), *spec['redundant_indexes']):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    if partitioned:
+        op.execute(f'UPDATE {old} SET created_at = now() WHERE created_at IS NULL')
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)'
+        )
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL')
+        bind = op.get_bind()
+        oldest = bind.execute(sa.text(f"SELECT min(created_at)::date FROM {old}")).scalar()
+        current = date.today().replace(day=1)
+        first = oldest.replace(day=1) if oldest else current
+        for month in _months(first, _add_months(current, PARTITIONS_AHEAD_MONTHS)):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        # Ключ секционирования обязан входить в первичный ключ
+        primary_key = 'id, created_at'
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL')
+        primary_key = 'id'
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    # Последовательность id переходит к новой таблице, иначе удалится вместе со старой
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {old}')
+
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})')
+    for name, column, referred in spec['foreign_keys']:
+        op.create_foreign_key(name, table, referred, [column], ['id'])
+    for name, columns in spec['indexes']:
+        op.create_index(name, table, columns, unique=False)
+
+
+def upgrade() -> None:
+    # Месячные партиции по created_at: старые отсоединяются и выгружаются архивом
+    # (services/archive_service.py), новые создаются заранее на PARTITIONS_AHEAD_MONTHS
+    for table in TABLES:
+        _swap(table, partitioned=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        _swap(table, partitioned=False)
@@ -0,0 +1,38 @@
+"""Add scheduled_jobs table
+
+Revision ID: 011_scheduled_jobs
+Revises: 010_partition_history_tables
+Create Date: 2026-01-28
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_scheduled_jobs'
+down_revision = '010_partition_history_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Состояние задач планировщика в процессе приложения (общее для всех воркеров)
+    op.create_table(
+        'scheduled_jobs',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('last_scheduled_for', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_status', sa.String(length=20), nullable=True),
+        sa.Column('last_duration', sa.Float(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('last_result', sa.Text(), nullable=True),
+        sa.Column('runs_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failures_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduled_jobs')
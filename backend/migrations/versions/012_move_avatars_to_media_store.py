@@ -0,0 +1,162 @@
+"""Move child avatars from Base64 column to media store
+
+Revision ID: 012_avatar_media_store
+Revises: 011_scheduled_jobs
+Create Date: 2026-02-02
+
+"""
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_avatar_media_store'
+down_revision = '011_scheduled_jobs'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 200
+
+# Замороженная копия обработки из services/media_service.py на момент миграции: результат
+# миграции не зависит от последующих изменений сервиса и настроек приложения.
+# Каталог - переменная окружения UPLOAD_DIR (как у приложения), нужен Pillow с поддержкой WebP
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_MAX_PIXELS = 40_000_000
+ALLOWED_FORMATS = frozenset({'JPEG', 'PNG', 'WEBP', 'GIF'})
+WEBP_QUALITY = 85
+
+# Аватары, которые не удалось перенести (внешние URL, повреждённые данные): исходное значение
+# сохраняется здесь, а не теряется вместе с колонкой children.avatar
+LEGACY_TABLE = 'children_avatar_legacy'
+
+# Ссылка на хранилище, оставленная downgrade этой миграции
+MEDIA_URL_RE = re.compile(r'^/media/avatars/([0-9a-f]{64})/\d+\.webp$')
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def _decode_data_url(value: str):
+    """Байты изображения из data:image/...;base64,... или None"""
+    header, _, payload = value.partition(',')
+    if not header.startswith('data:image/') or not header.endswith(';base64'):
+        return None
+    try:
+        return base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _store_avatar(data: bytes, upload_dir: Path) -> str:
+    """Квадратные превью WebP в UPLOAD_DIR/avatars/<sha256[:2]>/<sha256>/<size>.webp; возвращает sha256"""
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()
+    target = upload_dir / 'avatars' / digest[:2] / digest
+    if all((target / f'{size}.webp').exists() for size in AVATAR_SIZES):
+        return digest
+
+    Image.MAX_IMAGE_PIXELS = AVATAR_MAX_PIXELS
+    staging = target.with_name(f'.{target.name}.{uuid.uuid4().hex}')
+    staging.mkdir(parents=True)
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise ValueError(f'Формат {image.format} не поддерживается')
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            for size in AVATAR_SIZES:
+                thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+                thumbnail.save(staging / f'{size}.webp', 'WEBP', quality=WEBP_QUALITY)
+        try:
+            staging.rename(target)
+        except OSError:
+            if not target.exists():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return digest
+
+
+def upgrade() -> None:
+    upload_dir = Path(os.getenv('UPLOAD_DIR', '/var/uploads'))
+
+    op.add_column('children', sa.Column('avatar_hash', sa.String(length=64), nullable=True))
+    op.create_table(
+        LEGACY_TABLE,
+        sa.Column('child_id', sa.Integer(), sa.ForeignKey('children.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('avatar', sa.Text(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=False),
+    )
+
+    # Base64-аватары переносятся в UPLOAD_DIR пачками по id (в памяти не больше BATCH_SIZE изображений);
+    # внешние URL и повреждённые данные остаются в children_avatar_legacy
+    connection = op.get_bind()
+    last_id = 0
+    moved = 0
+    kept = []
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, avatar FROM children WHERE id > :last_id AND avatar IS NOT NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        for child_id, avatar in rows:
+            last_id = child_id
+            stored = MEDIA_URL_RE.match(avatar)
+            data = None if stored else _decode_data_url(avatar)
+            reason = None
+            if stored:
+                digest = stored.group(1)
+            elif data is None:
+                reason = 'not a base64 data URL'
+            else:
+                try:
+                    digest = _store_avatar(data, upload_dir)
+                except Exception as e:
+                    reason = f'{type(e).__name__}: {e}'
+            if reason is not None:
+                connection.execute(
+                    sa.text(f"INSERT INTO {LEGACY_TABLE} (child_id, avatar, reason) VALUES (:id, :avatar, :reason)"),
+                    {'id': child_id, 'avatar': avatar, 'reason': reason}
+                )
+                kept.append(child_id)
+                continue
+            connection.execute(
+                sa.text("UPDATE children SET avatar_hash = :digest WHERE id = :id"),
+                {'digest': digest, 'id': child_id}
+            )
+            moved += 1
+    logger.info('Аватары перенесены: %s, оставлены в %s: %s', moved, LEGACY_TABLE, len(kept))
+    if kept:
+        logger.warning('Аватары детей не перенесены (исходные значения в %s): %s', LEGACY_TABLE, kept)
+
+    op.drop_column('children', 'avatar')
+
+
+def downgrade() -> None:
+    # Обратно - ссылка на превью в хранилище вместо Base64 (файлы остаются в UPLOAD_DIR),
+    # непереносимые значения - из children_avatar_legacy как были
+    op.add_column('children', sa.Column('avatar', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE children SET avatar = '/media/avatars/' || avatar_hash || '/256.webp' "
+        "WHERE avatar_hash IS NOT NULL"
+    )
+    op.execute(
+        f"UPDATE children c SET avatar = l.avatar FROM {LEGACY_TABLE} l WHERE l.child_id = c.id"
+    )
+    op.drop_table(LEGACY_TABLE)
+    op.drop_column('children', 'avatar_hash')
@@ -0,0 +1,27 @@
+"""Add legal document reference to parent_consents
+
+Revision ID: 013_consent_document_reference
+Revises: 012_avatar_media_store
+Create Date: 2026-02-03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_consent_document_reference'
+down_revision = '012_avatar_media_store'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Версия и sha256 политики конфиденциальности (content/legal/privacy), с которой согласился родитель.
+    # Существующие согласия остаются без ссылки: версия, показанная тогда, не сохранялась
+    op.add_column('parent_consents', sa.Column('document_version', sa.String(length=20), nullable=True))
+    op.add_column('parent_consents', sa.Column('document_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('parent_consents', 'document_hash')
+    op.drop_column('parent_consents', 'document_version')
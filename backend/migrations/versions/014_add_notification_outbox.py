@@ -0,0 +1,43 @@
+"""Add delivery columns to notifications (outbox)
+
+Revision ID: 014_notification_outbox
+Revises: 013_consent_document_reference
+Create Date: 2026-02-05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_notification_outbox'
+down_revision = '013_consent_document_reference'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Колонки и индекс на секционированной таблице создаются во всех партициях (миграция 010)
+    op.add_column('notifications', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column(
+        'notifications',
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column('notifications', sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notifications', sa.Column('last_error', sa.Text(), nullable=True))
+    # Раньше уведомления помечались SENT сразу в запросе: время отправки - время изменения
+    op.execute("UPDATE notifications SET sent_at = COALESCE(updated_at, created_at) WHERE status = 'SENT'")
+    # Очередь доставки: WHERE status = 'PENDING' AND next_attempt_at <= now() ORDER BY next_attempt_at
+    op.create_index(
+        'ix_notifications_status_next_attempt_at',
+        'notifications',
+        ['status', 'next_attempt_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_status_next_attempt_at', table_name='notifications')
+    op.drop_column('notifications', 'last_error')
+    op.drop_column('notifications', 'sent_at')
+    op.drop_column('notifications', 'next_attempt_at')
+    op.drop_column('notifications', 'attempts')
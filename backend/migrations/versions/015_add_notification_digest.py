@@ -0,0 +1,28 @@
+"""Add notification digest type and per-family digest frequency
+
+Revision ID: 015_notification_digest
+Revises: 014_notification_outbox
+Create Date: 2026-02-06
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_notification_digest'
+down_revision = '014_notification_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Значение enum хранится по имени члена (NotificationType.DIGEST); ADD VALUE - вне транзакции
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'DIGEST'")
+    # Частота сводки активности детей: hourly | daily | off; NULL - значение по умолчанию из настроек
+    op.add_column('family_rules', sa.Column('digest_frequency', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    # Значение enum не удаляется (Postgres не поддерживает DROP VALUE); сводки остаются в таблице
+    op.drop_column('family_rules', 'digest_frequency')
@@ -9,7 +9,7 @@ from models.user import User, UserRole, Base
 from models.child import Child
 from models.task import Task
 from models.star import Star, StarHistory, StarStreak
-from models.piggy import Piggy, PiggyGoal, PiggyHistory
+from models.piggy import Piggy, PiggyGoal, PiggyHistory, PiggySnapshot
 from models.diary import DiaryEntry
 from models.wishlist import WishlistItem
 from models.settings import Settings
@@ -21,6 +21,8 @@ from models.refresh_token import RefreshToken
 from models.child_access import ChildAccess
 from models.family_rules import FamilyRules
 from models.staff_user import StaffUser, StaffRole
+from models.idempotency_key import IdempotencyKey
+from models.scheduled_job import ScheduledJob
 
 __all__ = [
     "Base",
@@ -34,6 +36,7 @@ __all__ = [
     "Piggy",
     "PiggyGoal",
     "PiggyHistory",
+    "PiggySnapshot",
     "DiaryEntry",
     "WishlistItem",
     "Settings",
@@ -48,4 +51,6 @@ __all__ = [
     "FamilyRules",
     "StaffUser",
     "StaffRole",
+    "IdempotencyKey",
+    "ScheduledJob",
 ]
@@ -2,7 +2,7 @@
 Модель ребёнка
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -24,7 +24,7 @@ class Child(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False, default="Ребёнок")
     gender = Column(Enum(Gender, native_enum=False, values_callable=lambda x: [e.value for e in x]), nullable=False, default=Gender.NONE)
-    avatar = Column(Text, nullable=True)  # Base64 или URL
+    avatar_hash = Column(String(64), nullable=True)  # sha256 аватара в хранилище медиа (core/utils/media.py)
     
     # Связи
     user = relationship("User", back_populates="children")
@@ -2,24 +2,42 @@
 Модель дневника
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Index, Column, Integer, ForeignKey, DateTime, String, Text, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from models.user import Base
 
 
+# Конфигурация полнотекстового поиска (русская морфология)
+DIARY_SEARCH_CONFIG = "russian"
+
+
 class DiaryEntry(Base):
     """Запись в дневнике"""
     __tablename__ = "diary_entries"
+    __table_args__ = (
+        # Keyset-пагинация списка: WHERE child_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_diary_entries_child_id_created_at_id", "child_id", "created_at", "id"),
+        Index("ix_diary_entries_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    child_id = Column(Integer, ForeignKey("children.id"), nullable=False, index=True)
+    child_id = Column(Integer, ForeignKey("children.id"), nullable=False)  # Индекс - составной из __table_args__
     title = Column(String, nullable=True)
     content = Column(Text, nullable=False)
     
+    # Поисковый вектор (генерируемая колонка, не загружается вместе со строкой)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{DIARY_SEARCH_CONFIG}', coalesce(title, '') || ' ' || content)",
+            persisted=True
+        )
+    ))
+    
     # Связи
     child = relationship("Child", back_populates="diary_entries")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-
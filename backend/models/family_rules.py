@@ -2,7 +2,7 @@
 Модель правил семьи
 Согласно требованиям: каждый родитель может редактировать правила семьи
 """
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.user import Base
@@ -15,6 +15,8 @@ class FamilyRules(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True, index=True)
     rules = Column(Text, nullable=False, default="[]")  # JSON массив правил
+    # Частота сводки активности детей (DigestFrequency); None - NOTIFICATION_DIGEST_DEFAULT_FREQUENCY
+    digest_frequency = Column(String(10), nullable=True)
     
     # Связи
     user = relationship("User", back_populates="family_rules")
@@ -0,0 +1,24 @@
+"""
+Модель ключей идемпотентности
+Согласно rules.md: SQLAlchemy 2.0 async style
+"""
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from models.user import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Сохранённый результат запроса с заголовком Idempotency-Key
+    status_code IS NULL - запрос ещё выполняется (ключ захвачен)
+    """
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String(200), primary_key=True)  # "<principal>:<Idempotency-Key>"
+    fingerprint = Column(String(64), nullable=False)  # sha256(method, path, query, body)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
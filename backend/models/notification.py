@@ -2,7 +2,7 @@
 Модель уведомлений
 Согласно требованиям: логирование всех действий (подписка, возвраты, жалобы)
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -16,6 +16,14 @@ class NotificationType(str, enum.Enum):
     COMPLAINT = "complaint"
     CONSENT = "consent"
     SYSTEM = "system"
+    DIGEST = "digest"  # Сводка активности детей (services/notification_digest.py)
+
+
+class DigestFrequency(str, enum.Enum):
+    """Как часто родитель получает сводку активности детей"""
+    HOURLY = "hourly"
+    DAILY = "daily"
+    OFF = "off"
 
 
 class NotificationStatus(str, enum.Enum):
@@ -27,20 +35,37 @@ class NotificationStatus(str, enum.Enum):
 
 
 class Notification(Base):
-    """Модель уведомления"""
+    """
+    Модель уведомления
+    Месячные партиции по created_at (миграция 010), created_at входит в первичный ключ
+    Таблица - outbox: запрос пишет строку PENDING, доставляют воркеры services/notification_delivery.py
+    """
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Уведомления пользователя: WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        # Очередь доставки: WHERE status = 'PENDING' AND next_attempt_at <= now() ORDER BY next_attempt_at
+        Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Индекс - составной из __table_args__
     subscription_id = Column(Integer, ForeignKey("subscriptions.id"), nullable=True, index=True)
     type = Column(Enum(NotificationType), nullable=False)
     message = Column(Text, nullable=False)
     status = Column(Enum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
     meta_data = Column(Text, nullable=True)  # JSON для дополнительных данных
     
+    # Доставка (outbox)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
     # Связи
     user = relationship("User", back_populates="notifications")
     subscription = relationship("Subscription", back_populates="notifications")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -19,6 +19,9 @@ class ParentConsent(Base):
     consent_date = Column(DateTime(timezone=True), nullable=True)
     ip_address = Column(String, nullable=True)  # Для аудита
     user_agent = Column(Text, nullable=True)  # Для аудита
+    # Версия политики конфиденциальности, с которой согласился родитель (content/legal/privacy)
+    document_version = Column(String(20), nullable=True)
+    document_hash = Column(String(64), nullable=True)
     
     # Связи
     user = relationship("User", back_populates="parent_consents")
@@ -2,7 +2,7 @@
 Модели для работы с копилкой
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Numeric, Text
+from sqlalchemy import text, Index, Column, Integer, ForeignKey, DateTime, String, Numeric, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.user import Base
@@ -20,6 +20,7 @@ class Piggy(Base):
     child = relationship("Child", back_populates="piggy")
     goal = relationship("PiggyGoal", back_populates="piggy", uselist=False, cascade="all, delete-orphan")
     history = relationship("PiggyHistory", back_populates="piggy", cascade="all, delete-orphan")
+    snapshots = relationship("PiggySnapshot", back_populates="piggy", cascade="all, delete-orphan")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -41,18 +42,61 @@ class PiggyGoal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+# Типы операций, уменьшающих баланс (остальные - пополнения)
+DEBIT_TYPES = ("withdraw",)
+
+
 class PiggyHistory(Base):
-    """История операций с копилкой (виртуальная валюта)"""
+    """
+    История операций с копилкой (виртуальная валюта)
+    Append-only журнал: строки только добавляются, amount всегда положительный,
+    знак определяется типом операции (см. DEBIT_TYPES)
+    """
     __tablename__ = "piggy_history"
+    __table_args__ = (
+        # Keyset-пагинация истории: WHERE piggy_id = ? ORDER BY created_at DESC, id DESC
+        # (обратный проход по индексу, отдельный DESC-индекс не нужен)
+        Index("ix_piggy_history_piggy_id_created_at_id", "piggy_id", "created_at", "id"),
+        # Защита от повторного начисления при ретраях клиента
+        Index(
+            "uq_piggy_history_piggy_id_idempotency_key",
+            "piggy_id", "idempotency_key",
+            unique=True,
+            postgresql_where=text("idempotency_key IS NOT NULL")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    piggy_id = Column(Integer, ForeignKey("piggies.id"), nullable=False, index=True)
+    piggy_id = Column(Integer, ForeignKey("piggies.id"), nullable=False)  # Индекс - составной из __table_args__
     type = Column(String, nullable=False)  # 'add', 'withdraw', 'streak', 'exchange'
     amount = Column(Numeric(10, 2), nullable=False)  # Виртуальная валюта
     description = Column(String, nullable=True)
+    idempotency_key = Column(String(64), nullable=True)  # Idempotency-Key запроса, создавшего запись
     
     # Связи
     piggy = relationship("Piggy", back_populates="history")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class PiggySnapshot(Base):
+    """
+    Контрольная точка баланса копилки
+    balance - баланс по журналу на момент записи last_history_id включительно;
+    текущий баланс = balance последнего снимка + операции с id > last_history_id
+    """
+    __tablename__ = "piggy_snapshots"
+    __table_args__ = (
+        Index("ix_piggy_snapshots_piggy_id_last_history_id", "piggy_id", "last_history_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    piggy_id = Column(Integer, ForeignKey("piggies.id"), nullable=False)
+    balance = Column(Numeric(10, 2), nullable=False)
+    last_history_id = Column(Integer, nullable=False, default=0)
+    entries_count = Column(Integer, nullable=False, default=0)  # Операций с предыдущего снимка
+    
+    # Связи
+    piggy = relationship("Piggy", back_populates="snapshots")
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -2,7 +2,7 @@
 SQLAlchemy модель для refresh tokens
 Согласно rules.md: хранение refresh tokens в БД с device_info, issued_at, revoked_at
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from models.user import Base
@@ -11,6 +11,10 @@ from models.user import Base
 class RefreshToken(Base):
     """Модель refresh token"""
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Отзыв всех токенов пользователя: только активные (отозванные копятся до очистки)
+        Index("ix_refresh_tokens_user_id_active", "user_id", postgresql_where=text("revoked_at IS NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -0,0 +1,28 @@
+"""
+Модель состояния фоновых задач обслуживания
+Согласно rules.md: SQLAlchemy 2.0 async style
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Float, Text
+from sqlalchemy.sql import func
+from models.user import Base
+
+
+class ScheduledJob(Base):
+    """
+    Последний запуск задачи планировщика (core/scheduler.py), общий для всех воркеров
+    last_scheduled_for - плановое время запуска: второй воркер не повторяет уже взятый запуск
+    """
+    __tablename__ = "scheduled_jobs"
+    
+    name = Column(String(100), primary_key=True)
+    last_scheduled_for = Column(DateTime(timezone=True), nullable=True)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_status = Column(String(20), nullable=True)  # running | ok | error
+    last_duration = Column(Float, nullable=True)  # Секунды
+    last_error = Column(Text, nullable=True)
+    last_result = Column(Text, nullable=True)  # JSON-сводка задачи
+    runs_count = Column(Integer, default=0, nullable=False)
+    failures_count = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
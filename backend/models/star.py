@@ -2,7 +2,7 @@
 Модели для работы со звёздами
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Text
+from sqlalchemy import Index, Column, Integer, ForeignKey, DateTime, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.user import Base
@@ -27,18 +27,28 @@ class Star(Base):
 
 
 class StarHistory(Base):
-    """История получения звёзд"""
+    """
+    История получения звёзд
+    Месячные партиции по created_at (миграция 010): старые выгружаются архивом,
+    поэтому created_at входит в первичный ключ
+    """
     __tablename__ = "star_history"
+    __table_args__ = (
+        # Keyset-пагинация истории: WHERE star_id = ? ORDER BY created_at DESC, id DESC
+        # (обратный проход по индексу, отдельный DESC-индекс не нужен)
+        Index("ix_star_history_star_id_created_at_id", "star_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    star_id = Column(Integer, ForeignKey("stars.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    star_id = Column(Integer, ForeignKey("stars.id"), nullable=False)  # Индекс - составной из __table_args__
     description = Column(String, nullable=False)
     stars = Column(Integer, nullable=False)
     
     # Связи
     star = relationship("Star", back_populates="history")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
 
 class StarStreak(Base):
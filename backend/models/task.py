@@ -2,7 +2,7 @@
 Модель задачи
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -25,9 +25,13 @@ class TaskStatus(str, enum.Enum):
 class Task(Base):
     """Модель задачи"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Список задач: WHERE child_id = ? [AND task_type = ?] ORDER BY position, id
+        Index("ix_tasks_child_id_task_type_position_id", "child_id", "task_type", "position", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    child_id = Column(Integer, ForeignKey("children.id"), nullable=False, index=True)
+    child_id = Column(Integer, ForeignKey("children.id"), nullable=False)  # Индекс - составной из __table_args__
     text = Column(String, nullable=False)
     task_type = Column(Enum(TaskType), nullable=False)
     status = Column(Enum(TaskStatus), nullable=True)  # Для канбана
@@ -2,7 +2,7 @@
 SQLAlchemy модель пользователя
 Согласно rules.md: SQLAlchemy 2.0 async style
 """
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
@@ -22,6 +22,10 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """Модель пользователя"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Админка: WHERE role = ? ORDER BY created_at DESC; id в INCLUDE - count(id) по роли index-only
+        Index("ix_users_role_created_at", "role", "created_at", postgresql_include=["id"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)  # Имя пользователя (родителя)
@@ -0,0 +1,103 @@
+"""
+Репозиторий архивации растущих таблиц: месячные партиции, выгрузка через COPY, удаление журнала
+Согласно rules.md: доступ к базе данных в repositories
+"""
+import asyncio
+import gzip
+from datetime import date, datetime
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def add_months(month: date, count: int) -> date:
+    """Первое число месяца через count месяцев"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Имя месячной партиции (как в миграции 010): star_history_p202601"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> date:
+    """Месяц партиции по имени; ValueError для чужих имён"""
+    suffix = name[len(table) + 2:]
+    if not name.startswith(f"{table}_p") or len(suffix) != 6 or not suffix.isdigit():
+        raise ValueError(f"Не месячная партиция {table}: {name}")
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+# Строки журнала копилки, покрытые последним снимком баланса: удаление не меняет баланс по журналу
+PRUNE_PIGGY_HISTORY_SQL = """
+DELETE FROM piggy_history
+WHERE id IN (
+    SELECT h.id
+    FROM piggy_history h
+    WHERE h.created_at < $1
+      AND h.id <= (SELECT max(s.last_history_id) FROM piggy_snapshots s WHERE s.piggy_id = h.piggy_id)
+    ORDER BY h.id
+    LIMIT $2
+)
+RETURNING *
+"""
+
+
+class ArchiveRepository:
+    """Репозиторий архивации (DDL партиций и COPY через драйвер asyncpg)"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_partitions(self, table: str) -> List[str]:
+        """Имена партиций секционированной таблицы"""
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+            ),
+            {"table": table}
+        )
+        return list(result.scalars().all())
+
+    async def create_partition(self, table: str, month: date) -> str:
+        """Создание месячной партиции, если её ещё нет"""
+        name = partition_name(table, month)
+        await self.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        return name
+
+    async def detach_and_drop_partition(self, table: str, partition: str) -> None:
+        """Отсоединение и удаление партиции (короткая блокировка родительской таблицы)"""
+        await self.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+        await self.session.execute(text(f"DROP TABLE {partition}"))
+
+    async def export_table(self, table: str, path: Path) -> int:
+        """Выгрузка таблицы в CSV (gzip); возвращает число строк"""
+        return await self._export(f"SELECT * FROM {table}", path)
+
+    async def prune_piggy_history(self, before: datetime, limit: int, path: Path) -> int:
+        """Удаление пачки покрытых снимком строк журнала копилки с выгрузкой удалённого"""
+        return await self._export(PRUNE_PIGGY_HISTORY_SQL, path, before, limit)
+
+    async def _export(self, query: str, path: Path, *args) -> int:
+        """COPY (query) TO STDOUT в файл: запись файла вне event loop"""
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wb") as archive:
+            async def write(chunk: bytes) -> None:
+                await asyncio.to_thread(archive.write, chunk)
+
+            status = await raw.driver_connection.copy_from_query(
+                query, *args, output=write, format="csv", header=True
+            )
+        rows = int(status.split()[-1])
+        if rows == 0:
+            path.unlink()
+        return rows
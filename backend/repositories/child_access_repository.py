@@ -4,7 +4,7 @@
 """
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func
 from models.child_access import ChildAccess
 from datetime import datetime, timedelta
 import secrets
@@ -81,6 +81,20 @@ class ChildAccessRepository:
         await self.session.delete(access)
         await self.session.flush()
     
+    async def expire_qr_tokens(self) -> int:
+        """
+        Удаление QR-токенов с истёкшим общим сроком действия одним UPDATE
+        (вход по ним уже невозможен; освобождает уникальный индекс qr_token)
+        """
+        result = await self.session.execute(
+            update(ChildAccess)
+            .where(ChildAccess.qr_token.isnot(None))
+            .where(ChildAccess.qr_token_expires_at < func.now())
+            .values(qr_token=None, qr_token_valid_from=None, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     def generate_qr_token(self) -> str:
         """Генерация уникального QR-токена"""
         return secrets.token_urlsafe(32)
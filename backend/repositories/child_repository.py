@@ -5,9 +5,13 @@
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.engine import Row
 from models.child import Child
 from models.user import User
 
+# Проекция для списков админки
+CHILD_LIST_COLUMNS = (Child.id, Child.user_id, Child.name, Child.gender, Child.created_at)
+
 
 class ChildRepository:
     """Репозиторий для работы с детьми"""
@@ -29,6 +33,13 @@ class ChildRepository:
         )
         return list(result.scalars().all())
     
+    async def get_page(self, skip: int, limit: int) -> List[Row]:
+        """Страница детей всех пользователей, новые первыми"""
+        result = await self.session.execute(
+            select(*CHILD_LIST_COLUMNS).order_by(Child.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.all())
+    
     async def create(self, child_data: dict) -> Child:
         """Создание нового ребёнка"""
         from models.child import Gender
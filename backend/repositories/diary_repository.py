@@ -0,0 +1,98 @@
+"""
+Репозиторий для работы с дневником
+Согласно rules.md: доступ к базе данных в repositories
+"""
+from typing import Optional, List, Tuple
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.engine import Row
+from models.diary import DiaryEntry, DIARY_SEARCH_CONFIG
+
+# Длина превью записи в списках (символов)
+DIARY_PREVIEW_LENGTH = 200
+
+
+class DiaryRepository:
+    """Репозиторий для работы с дневником"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def get_by_id(self, entry_id: int) -> Optional[DiaryEntry]:
+        """Получение записи по ID"""
+        result = await self.session.execute(
+            select(DiaryEntry).where(DiaryEntry.id == entry_id)
+        )
+        return result.scalar_one_or_none()
+    
+    def _summary_query(self, child_id: int, after: Optional[Tuple[datetime, int]]):
+        """
+        Проекция для списков: заголовок и превью вместо полного content
+        Keyset по created_at DESC, id DESC
+        """
+        query = select(
+            DiaryEntry.id,
+            DiaryEntry.child_id,
+            DiaryEntry.title,
+            func.substr(DiaryEntry.content, 1, DIARY_PREVIEW_LENGTH).label("preview"),
+            DiaryEntry.created_at,
+            DiaryEntry.updated_at,
+        ).where(DiaryEntry.child_id == child_id)
+        if after:
+            query = query.where(tuple_(DiaryEntry.created_at, DiaryEntry.id) < tuple_(*after))
+        return query
+    
+    async def get_summary_page(
+        self,
+        child_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """Страница записей дневника (до limit + 1 строк для определения продолжения)"""
+        result = await self.session.execute(
+            self._summary_query(child_id, after)
+            .order_by(DiaryEntry.created_at.desc(), DiaryEntry.id.desc())
+            .limit(limit + 1)
+        )
+        return list(result.all())
+    
+    async def search_summary_page(
+        self,
+        child_id: int,
+        query_text: str,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """
+        Полнотекстовый поиск по title/content (GIN-индекс по search_vector)
+        Результаты в хронологическом порядке, как и основной список
+        """
+        result = await self.session.execute(
+            self._summary_query(child_id, after)
+            .where(DiaryEntry.search_vector.match(query_text, postgresql_regconfig=DIARY_SEARCH_CONFIG))
+            .order_by(DiaryEntry.created_at.desc(), DiaryEntry.id.desc())
+            .limit(limit + 1)
+        )
+        return list(result.all())
+    
+    async def create(self, entry_data: dict) -> DiaryEntry:
+        """Создание записи"""
+        entry = DiaryEntry(**entry_data)
+        self.session.add(entry)
+        await self.session.flush()
+        await self.session.refresh(entry)
+        return entry
+    
+    async def update(self, entry: DiaryEntry, entry_data: dict) -> DiaryEntry:
+        """Обновление записи"""
+        for key, value in entry_data.items():
+            setattr(entry, key, value)
+        await self.session.flush()
+        await self.session.refresh(entry)
+        return entry
+    
+    async def delete(self, entry: DiaryEntry) -> None:
+        """Удаление записи"""
+        await self.session.delete(entry)
+        await self.session.flush()
@@ -1,7 +1,7 @@
 """
 Репозиторий для работы с правилами семьи
 """
-from typing import Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models.family_rules import FamilyRules
@@ -38,6 +38,23 @@ class FamilyRulesRepository:
         await self.session.refresh(rules)
         return rules
     
+    async def set_digest_frequency(self, rules: FamilyRules, frequency: str) -> FamilyRules:
+        """Изменение частоты сводки активности"""
+        rules.digest_frequency = frequency
+        await self.session.flush()
+        await self.session.refresh(rules)
+        return rules
+    
+    async def get_digest_frequencies(self, user_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Частоты сводок для родителей одним запросом (нет строки - родителя нет в словаре)"""
+        if not user_ids:
+            return {}
+        result = await self.session.execute(
+            select(FamilyRules.user_id, FamilyRules.digest_frequency)
+            .where(FamilyRules.user_id.in_(user_ids))
+        )
+        return {user_id: frequency for user_id, frequency in result.all()}
+    
     def parse_rules(self, rules: FamilyRules) -> list[str]:
         """Парсинг правил из JSON"""
         try:
@@ -0,0 +1,85 @@
+"""
+Репозиторий для работы с ключами идемпотентности
+Согласно rules.md: доступ к базе данных в repositories
+"""
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.dialects.postgresql import insert
+from models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+    """Репозиторий для работы с ключами идемпотентности"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def claim(self, key: str, fingerprint: str, lock_seconds: int) -> bool:
+        """
+        Захват ключа одним запросом: вставка новой строки или перезахват истёкшей
+        True - ключ захвачен этим запросом, False - ключ уже занят
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=lock_seconds)
+        stmt = insert(IdempotencyKey).values(
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "content_type": None,
+                "response_body": None,
+                "created_at": func.now(),
+                "expires_at": expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now()
+        ).returning(IdempotencyKey.key)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+    
+    async def get(self, key: str) -> Optional[IdempotencyKey]:
+        """Получение записи по ключу (только не истёкшие)"""
+        result = await self.session.execute(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.expires_at >= func.now())
+        )
+        return result.scalar_one_or_none()
+    
+    async def complete(
+        self,
+        key: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes,
+        ttl_seconds: int
+    ) -> None:
+        """Сохранение ответа для последующих повторов"""
+        await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                content_type=content_type,
+                response_body=body,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+            )
+        )
+    
+    async def release(self, key: str) -> None:
+        """Освобождение ключа (запрос завершился ошибкой, повтор должен выполниться заново)"""
+        await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == key)
+        )
+    
+    async def purge_expired(self) -> int:
+        """Удаление истёкших ключей одним запросом"""
+        result = await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now())
+        )
+        return result.rowcount or 0
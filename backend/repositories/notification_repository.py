@@ -2,10 +2,19 @@
 Репозиторий для работы с уведомлениями
 Согласно rules.md: доступ к базе данных в repositories
 """
-from typing import Optional, List
+from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import Row
 from models.notification import Notification, NotificationType, NotificationStatus
+from models.user import User
+
+# Проекция для списков: без meta_data (произвольный JSON) и служебных колонок
+NOTIFICATION_LIST_COLUMNS = (
+    Notification.id, Notification.user_id, Notification.type, Notification.status,
+    Notification.message, Notification.created_at,
+)
 
 
 class NotificationRepository:
@@ -22,15 +31,108 @@ class NotificationRepository:
         await self.session.refresh(notification)
         return notification
     
-    async def get_by_user_id(self, user_id: int, limit: int = 50) -> List[Notification]:
+    async def enqueue(self, notification_data: dict) -> int:
+        """
+        Постановка уведомления в очередь доставки (outbox): один INSERT ... RETURNING id
+        Строка видна воркерам только после коммита транзакции запроса
+        """
+        result = await self.session.execute(
+            insert(Notification)
+            .values(status=NotificationStatus.PENDING, **notification_data)
+            .returning(Notification.id)
+        )
+        return result.scalar_one()
+    
+    async def claim_due(self, limit: int, lease_seconds: int) -> List[Row]:
+        """
+        Аренда пачки уведомлений, которые пора доставлять (одним UPDATE ... RETURNING)
+        attempts + 1, next_attempt_at = now() + lease: после коммита строки не видны другим воркерам,
+        пока идёт доставка, а без записи итога (падение воркера) снова станут доступны по истечении аренды.
+        Строки, заблокированные другим воркером в момент аренды, пропускаются (SKIP LOCKED).
+        UPDATE на уровне таблицы (Core): ORM-UPDATE ... FROM не отдаёт в RETURNING колонки других таблиц,
+        поэтому email получателей - отдельным запросом get_recipient_emails
+        """
+        table = Notification.__table__
+        due = (
+            select(table.c.id, table.c.created_at)
+            .where(
+                table.c.status == NotificationStatus.PENDING,
+                table.c.next_attempt_at <= func.now(),
+            )
+            .order_by(table.c.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .subquery()
+        )
+        result = await self.session.execute(
+            update(table)
+            .where(table.c.id == due.c.id, table.c.created_at == due.c.created_at)
+            .values(
+                attempts=table.c.attempts + 1,
+                next_attempt_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(
+                table.c.id, table.c.created_at, table.c.user_id, table.c.type,
+                table.c.message, table.c.meta_data, table.c.attempts,
+            )
+        )
+        return list(result.all())
+    
+    async def get_recipient_emails(self, user_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Email получателей арендованной пачки (один запрос на пачку)"""
+        if not user_ids:
+            return {}
+        result = await self.session.execute(
+            select(User.id, User.email).where(User.id.in_(set(user_ids)))
+        )
+        return {user_id: email for user_id, email in result.all()}
+    
+    async def finish_attempt(self, notification_id: int, created_at: datetime, attempts: int, **values) -> bool:
+        """
+        Итог попытки доставки (status, sent_at, next_attempt_at, last_error); True - итог записан
+        Только для той же аренды: строку, снова взятую после истечения аренды, не перезаписываем
+        """
+        result = await self.session.execute(
+            update(Notification)
+            .where(
+                Notification.id == notification_id,
+                Notification.created_at == created_at,
+                Notification.status == NotificationStatus.PENDING,
+                Notification.attempts == attempts,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+    
+    async def get_backlog(self) -> Tuple[int, Optional[datetime]]:
+        """Число недоставленных уведомлений и время создания самого старого"""
+        result = await self.session.execute(
+            select(func.count(), func.min(Notification.created_at))
+            .where(Notification.status == NotificationStatus.PENDING)
+        )
+        count, oldest = result.one()
+        return count, oldest
+    
+    async def get_by_user_id(self, user_id: int, limit: int = 50) -> List[Row]:
         """Получение уведомлений пользователя"""
         result = await self.session.execute(
-            select(Notification)
+            select(*NOTIFICATION_LIST_COLUMNS)
             .where(Notification.user_id == user_id)
             .order_by(Notification.created_at.desc())
             .limit(limit)
         )
-        return list(result.scalars().all())
+        return list(result.all())
+    
+    async def get_page(self, skip: int, limit: int, type: Optional[NotificationType] = None) -> List[Row]:
+        """Страница уведомлений всех пользователей, новые первыми"""
+        query = select(*NOTIFICATION_LIST_COLUMNS)
+        if type:
+            query = query.where(Notification.type == type)
+        result = await self.session.execute(
+            query.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.all())
     
     async def get_by_id(self, notification_id: int) -> Optional[Notification]:
         """Получение уведомления по ID"""
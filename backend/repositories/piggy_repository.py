@@ -2,10 +2,12 @@
 Репозиторий для работы с копилкой
 Согласно rules.md: доступ к базе данных в repositories
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models.piggy import Piggy, PiggyGoal, PiggyHistory
+from sqlalchemy import select, update, tuple_, func, case
+from sqlalchemy.orm.attributes import set_committed_value
+from models.piggy import Piggy, PiggyGoal, PiggyHistory, PiggySnapshot, DEBIT_TYPES
 from decimal import Decimal
 
 
@@ -52,25 +54,134 @@ class PiggyRepository:
         await self.session.refresh(goal)
         return goal
     
-    async def add_history(self, piggy_id: int, type: str, amount: Decimal, description: Optional[str] = None) -> PiggyHistory:
-        """Добавление записи в историю"""
+    async def append_entry(self, piggy: Piggy, type: str, amount: Decimal, description: Optional[str] = None) -> PiggyHistory:
+        """
+        Запись операции в журнал с обновлением кэшированного баланса piggies.amount
+        Единственная точка изменения баланса копилки (кроме обмена звёзд EXCHANGE_STARS_SQL)
+        UPDATE ... SET amount = amount ± delta выполняется в БД и блокирует строку копилки до коммита:
+        конкурентные операции не теряют обновлений, а записи журнала одной копилки коммитятся
+        в порядке id (на этом держатся снимки баланса, см. lock_balance)
+        """
+        delta = -amount if type in DEBIT_TYPES else amount
+        result = await self.session.execute(
+            update(Piggy)
+            .where(Piggy.id == piggy.id)
+            .values(amount=Piggy.amount + delta)
+            .returning(Piggy.amount)
+            .execution_options(synchronize_session=False)
+        )
+        # Новый баланс без пометки объекта изменённым: flush не перезапишет значение из БД
+        set_committed_value(piggy, "amount", result.scalar_one())
+        return await self._add_history(piggy.id, type, amount, description)
+    
+    async def _add_history(self, piggy_id: int, type: str, amount: Decimal, description: Optional[str] = None) -> PiggyHistory:
+        """Добавление записи в историю (только после блокировки строки копилки - append_entry)"""
         history = PiggyHistory(piggy_id=piggy_id, type=type, amount=amount, description=description)
         self.session.add(history)
         await self.session.flush()
         await self.session.refresh(history)
         return history
     
-    async def get_history(self, piggy_id: int, limit: int = 50) -> List[PiggyHistory]:
-        """Получение истории копилки"""
+    async def lock_balance(self, piggy_id: int) -> Decimal:
+        """
+        Блокировка строки копилки (SELECT ... FOR UPDATE) до конца транзакции; возвращает piggies.amount
+        Каждая операция журнала блокирует ту же строку, поэтому после блокировки незакоммиченных
+        записей журнала этой копилки нет: снимок и сверка видят журнал целиком
+        """
         result = await self.session.execute(
-            select(PiggyHistory)
-            .where(PiggyHistory.piggy_id == piggy_id)
-            .order_by(PiggyHistory.created_at.desc())
-            .limit(limit)
+            select(Piggy.amount).where(Piggy.id == piggy_id).with_for_update()
+        )
+        return result.scalar_one()
+    
+    async def get_history_page(
+        self,
+        piggy_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[PiggyHistory]:
+        """
+        Страница истории копилки (keyset по created_at DESC, id DESC)
+        Возвращает до limit + 1 строк, чтобы роутер мог определить наличие следующей страницы
+        """
+        query = select(PiggyHistory).where(PiggyHistory.piggy_id == piggy_id)
+        if after:
+            query = query.where(tuple_(PiggyHistory.created_at, PiggyHistory.id) < tuple_(*after))
+        result = await self.session.execute(
+            query
+            .order_by(PiggyHistory.created_at.desc(), PiggyHistory.id.desc())
+            .limit(limit + 1)
         )
         return list(result.scalars().all())
-
-
-
-
-
+    
+    async def get_last_snapshot(self, piggy_id: int) -> Optional[PiggySnapshot]:
+        """Последняя контрольная точка баланса"""
+        result = await self.session.execute(
+            select(PiggySnapshot)
+            .where(PiggySnapshot.piggy_id == piggy_id)
+            .order_by(PiggySnapshot.last_history_id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_ledger_delta(self, piggy_id: int, after_history_id: int = 0) -> Tuple[Decimal, int, int]:
+        """
+        Сумма операций журнала после указанной записи
+        Возвращает (сумма со знаком, количество операций, id последней операции)
+        """
+        signed_amount = case(
+            (PiggyHistory.type.in_(DEBIT_TYPES), -PiggyHistory.amount),
+            else_=PiggyHistory.amount
+        )
+        result = await self.session.execute(
+            select(
+                func.coalesce(func.sum(signed_amount), 0),
+                func.count(PiggyHistory.id),
+                func.coalesce(func.max(PiggyHistory.id), after_history_id),
+            )
+            .where(PiggyHistory.piggy_id == piggy_id)
+            .where(PiggyHistory.id > after_history_id)
+        )
+        delta, count, last_id = result.one()
+        return Decimal(delta), count, last_id
+    
+    async def get_ledger_balance(self, piggy_id: int) -> Tuple[Decimal, Optional[PiggySnapshot], int, int]:
+        """
+        Баланс по журналу: последний снимок + операции после него
+        Возвращает (баланс, снимок, операций после снимка, id последней операции)
+        """
+        snapshot = await self.get_last_snapshot(piggy_id)
+        base = snapshot.balance if snapshot else Decimal("0")
+        after_id = snapshot.last_history_id if snapshot else 0
+        delta, count, last_id = await self.get_ledger_delta(piggy_id, after_id)
+        return base + delta, snapshot, count, last_id
+    
+    async def create_snapshot(self, piggy_id: int, balance: Decimal, last_history_id: int, entries_count: int) -> PiggySnapshot:
+        """Создание контрольной точки баланса"""
+        snapshot = PiggySnapshot(
+            piggy_id=piggy_id,
+            balance=balance,
+            last_history_id=last_history_id,
+            entries_count=entries_count
+        )
+        self.session.add(snapshot)
+        await self.session.flush()
+        return snapshot
+    
+    async def get_ids_batch(self, after_id: int = 0, batch_size: int = 500) -> List[Tuple[int, int]]:
+        """Пачка (piggy_id, child_id) по возрастанию id для фоновых задач"""
+        result = await self.session.execute(
+            select(Piggy.id, Piggy.child_id)
+            .where(Piggy.id > after_id)
+            .order_by(Piggy.id)
+            .limit(batch_size)
+        )
+        return [(row[0], row[1]) for row in result.all()]
+    
+    async def set_balance(self, piggy_id: int, amount: Decimal) -> None:
+        """Перезапись кэша баланса (сверка с журналом; строка уже заблокирована lock_balance)"""
+        await self.session.execute(
+            update(Piggy)
+            .where(Piggy.id == piggy_id)
+            .values(amount=amount)
+            .execution_options(synchronize_session=False)
+        )
@@ -4,7 +4,7 @@
 """
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, delete, and_, or_
 from models.refresh_token import RefreshToken
 from core.security.password import hash_password, verify_password
 import hashlib
@@ -87,25 +87,23 @@ class RefreshTokenRepository:
         return count
     
     async def cleanup_expired_tokens(self, days: int = 90) -> int:
-        """Очистка старых отозванных токенов (старше N дней)"""
+        """
+        Очистка токенов, отозванных или истёкших больше N дней назад
+        Один DELETE без загрузки строк в сессию
+        """
         from datetime import datetime, timedelta
+        from core.config import settings
         
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         result = await self.session.execute(
-            select(RefreshToken).where(
-                and_(
-                    RefreshToken.revoked_at.isnot(None),
-                    RefreshToken.revoked_at < cutoff_date
+            delete(RefreshToken)
+            .where(
+                or_(
+                    RefreshToken.revoked_at < cutoff_date,
+                    RefreshToken.issued_at < cutoff_date - timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
                 )
             )
+            .execution_options(synchronize_session=False)
         )
-        
-        tokens = result.scalars().all()
-        count = len(tokens)
-        
-        for token in tokens:
-            await self.session.delete(token)
-        
-        await self.session.flush()
-        return count
+        return result.rowcount
@@ -0,0 +1,72 @@
+"""
+Репозиторий состояния фоновых задач
+Согласно rules.md: доступ к базе данных в repositories
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from models.scheduled_job import ScheduledJob
+
+
+class ScheduledJobRepository:
+    """Репозиторий состояния фоновых задач"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def get_all(self) -> List[ScheduledJob]:
+        """Состояние всех задач, когда-либо запускавшихся"""
+        result = await self.session.execute(select(ScheduledJob).order_by(ScheduledJob.name))
+        return list(result.scalars().all())
+    
+    async def claim(self, name: str, scheduled_for: datetime) -> bool:
+        """
+        Отметка запуска одним запросом: только если этот плановый запуск ещё никем не взят
+        True - запуск за этим воркером, False - другой воркер уже выполнил или выполняет его
+        """
+        stmt = insert(ScheduledJob).values(
+            name=name,
+            last_scheduled_for=scheduled_for,
+            last_started_at=func.now(),
+            last_status="running",
+            runs_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScheduledJob.name],
+            set_={
+                "last_scheduled_for": scheduled_for,
+                "last_started_at": func.now(),
+                "last_status": "running",
+                "runs_count": ScheduledJob.runs_count + 1,
+            },
+            where=(
+                ScheduledJob.last_scheduled_for.is_(None)
+                | (ScheduledJob.last_scheduled_for < scheduled_for)
+            )
+        ).returning(ScheduledJob.name)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+    
+    async def finish(
+        self,
+        name: str,
+        status: str,
+        duration: float,
+        error: Optional[str] = None,
+        result: Optional[str] = None
+    ) -> None:
+        """Итог запуска"""
+        values = {
+            "last_finished_at": func.now(),
+            "last_status": status,
+            "last_duration": duration,
+            "last_error": error,
+            "last_result": result,
+        }
+        if status == "error":
+            values["failures_count"] = ScheduledJob.failures_count + 1
+        await self.session.execute(
+            update(ScheduledJob).where(ScheduledJob.name == name).values(**values)
+        )
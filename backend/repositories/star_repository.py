@@ -2,10 +2,67 @@
 Репозиторий для работы со звёздами
 Согласно rules.md: доступ к базе данных в repositories
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, tuple_, text
 from models.star import Star, StarHistory, StarStreak
+from models.settings import Settings
+
+
+# Обмен звёзд одним выражением: условное списание звёзд, пополнение копилки
+# (upsert по child_id) и запись в журнал копилки. Если запись с тем же
+# idempotency_key уже есть, ничего не меняется и возвращается исходная операция.
+# Списание защищено условием today >= :stars: конкурентные запросы
+# сериализуются блокировкой строки stars и не уводят баланс в минус.
+EXCHANGE_STARS_SQL = text("""
+WITH cfg AS (
+    SELECT
+        COALESCE(MAX(s.stars_to_money), :default_rate) AS rate,
+        COALESCE(MAX(s.money_per_stars), :default_money) AS money
+    FROM settings s
+    WHERE s.child_id = :child_id
+),
+replay AS (
+    SELECT h.id, h.amount
+    FROM piggy_history h
+    JOIN piggies p ON p.id = h.piggy_id
+    WHERE p.child_id = :child_id AND h.idempotency_key = :idempotency_key
+),
+debit AS (
+    UPDATE stars st
+    SET today = st.today - (:stars / cfg.rate) * cfg.rate, updated_at = now()
+    FROM cfg
+    WHERE st.child_id = :child_id
+      AND :stars >= cfg.rate
+      AND st.today >= :stars
+      AND NOT EXISTS (SELECT 1 FROM replay)
+    RETURNING
+        st.today AS remaining,
+        (:stars / cfg.rate) * cfg.rate AS stars_used,
+        (:stars / cfg.rate) * cfg.money AS credit
+),
+credit AS (
+    INSERT INTO piggies (child_id, amount)
+    SELECT :child_id, debit.credit FROM debit
+    ON CONFLICT (child_id) DO UPDATE
+    SET amount = piggies.amount + EXCLUDED.amount, updated_at = now()
+    RETURNING id
+),
+ledger AS (
+    INSERT INTO piggy_history (piggy_id, type, amount, description, idempotency_key)
+    SELECT credit.id, 'exchange', debit.credit,
+           'Обмен ' || debit.stars_used || ' ⭐ на виртуальную валюту', :idempotency_key
+    FROM credit, debit
+    RETURNING id
+)
+SELECT debit.stars_used, debit.credit, debit.remaining, FALSE AS replayed
+FROM debit, ledger
+UNION ALL
+SELECT (:stars / cfg.rate) * cfg.rate, replay.amount,
+       (SELECT st.today FROM stars st WHERE st.child_id = :child_id), TRUE
+FROM replay, cfg
+""")
 
 
 class StarRepository:
@@ -46,6 +103,17 @@ class StarRepository:
         )
         return result.scalar_one_or_none()
     
+    async def expire_streaks(self, last_active_before: str) -> int:
+        """Обнуление серий без активности с даты last_active_before (YYYY-MM-DD) одним UPDATE"""
+        result = await self.session.execute(
+            update(StarStreak)
+            .where(StarStreak.current > 0)
+            .where(StarStreak.last_date < last_active_before)
+            .values(current=0, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     async def get_or_create_streak(self, star_id: int) -> StarStreak:
         """Получение или создание серии дней"""
         streak = await self.get_streak(star_id)
@@ -56,17 +124,47 @@ class StarRepository:
             await self.session.refresh(streak)
         return streak
     
-    async def get_history(self, star_id: int, limit: int = 50) -> List[StarHistory]:
-        """Получение истории звёзд"""
+    async def get_history_page(
+        self,
+        star_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[StarHistory]:
+        """
+        Страница истории звёзд (keyset по created_at DESC, id DESC)
+        Возвращает до limit + 1 строк, чтобы роутер мог определить наличие следующей страницы
+        """
+        query = select(StarHistory).where(StarHistory.star_id == star_id)
+        if after:
+            query = query.where(tuple_(StarHistory.created_at, StarHistory.id) < tuple_(*after))
         result = await self.session.execute(
-            select(StarHistory)
-            .where(StarHistory.star_id == star_id)
-            .order_by(StarHistory.created_at.desc())
-            .limit(limit)
+            query
+            .order_by(StarHistory.created_at.desc(), StarHistory.id.desc())
+            .limit(limit + 1)
         )
         return list(result.scalars().all())
-
-
-
-
-
+    
+    async def exchange_to_piggy(self, child_id: int, stars: int, idempotency_key: Optional[str] = None) -> Optional[dict]:
+        """
+        Атомарный обмен звёзд на виртуальную валюту за один запрос к БД
+        Возвращает None, если обмен не выполнен (недостаточно звёзд или меньше минимума)
+        """
+        result = await self.session.execute(
+            EXCHANGE_STARS_SQL,
+            {
+                "child_id": child_id,
+                "stars": stars,
+                "idempotency_key": idempotency_key,
+                "default_rate": Settings.stars_to_money.default.arg,
+                "default_money": Settings.money_per_stars.default.arg,
+            }
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return {
+            "stars_used": row.stars_used,
+            "virtual_currency": row.credit,
+            "remaining_stars": row.remaining,
+            "replayed": row.replayed
+        }
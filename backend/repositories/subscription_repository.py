@@ -2,12 +2,19 @@
 Репозиторий для работы с подписками
 Согласно rules.md: доступ к базе данных в repositories
 """
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.engine import Row
 from models.subscription import Subscription
 from models.parent_consent import ParentConsent
 
+# Проекция для списков админки
+SUBSCRIPTION_LIST_COLUMNS = (
+    Subscription.id, Subscription.user_id, Subscription.start_date, Subscription.end_date,
+    Subscription.is_active, Subscription.refund_requested, Subscription.refund_reason, Subscription.created_at,
+)
+
 
 class SubscriptionRepository:
     """Репозиторий для работы с подписками"""
@@ -22,6 +29,16 @@ class SubscriptionRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_page(self, skip: int, limit: int, active_only: bool = False) -> List[Row]:
+        """Страница подписок, новые первыми"""
+        query = select(*SUBSCRIPTION_LIST_COLUMNS)
+        if active_only:
+            query = query.where(Subscription.is_active == True)
+        result = await self.session.execute(
+            query.order_by(Subscription.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.all())
+    
     async def create(self, subscription_data: dict) -> Subscription:
         """Создание подписки"""
         subscription = Subscription(**subscription_data)
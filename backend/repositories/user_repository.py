@@ -2,11 +2,21 @@
 Репозиторий для работы с пользователями
 Согласно rules.md: доступ к базе данных в repositories
 """
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from models.user import User
+from models.child import Child
+from models.subscription import Subscription
+
+# Проекции для списков: строки вместо ORM-объектов, без password_hash
+USER_LIST_COLUMNS = (
+    User.id, User.name, User.phone, User.email, User.role, User.parent_id, User.created_at, User.updated_at,
+)
+# Идентификация владельца записи в списках админки
+USER_CONTACT_COLUMNS = (User.id, User.name, User.phone, User.email)
 
 
 class UserRepository:
@@ -36,6 +46,48 @@ class UserRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_contacts_by_ids(self, user_ids: Iterable[int]) -> Dict[int, Row]:
+        """Имя и контакты пользователей по списку ID одним запросом (вместо get_by_id в цикле)"""
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        result = await self.session.execute(
+            select(*USER_CONTACT_COLUMNS).where(User.id.in_(ids))
+        )
+        return {row.id: row for row in result.all()}
+    
+    async def get_page(self, skip: int, limit: int, role: Optional[str] = None) -> List[Row]:
+        """Страница пользователей, новые первыми (индекс ix_users_role_created_at при фильтре по роли)"""
+        query = select(*USER_LIST_COLUMNS)
+        if role:
+            query = query.where(User.role == role)
+        result = await self.session.execute(
+            query.order_by(User.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.all())
+    
+    async def get_related_counts(self, user_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """Число детей и подписок для списка пользователей: {user_id: (children, subscriptions)}"""
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        children = await self.session.execute(
+            select(Child.user_id, func.count(Child.id))
+            .where(Child.user_id.in_(ids))
+            .group_by(Child.user_id)
+        )
+        subscriptions = await self.session.execute(
+            select(Subscription.user_id, func.count(Subscription.id))
+            .where(Subscription.user_id.in_(ids))
+            .group_by(Subscription.user_id)
+        )
+        children_counts = dict(children.all())
+        subscription_counts = dict(subscriptions.all())
+        return {
+            user_id: (children_counts.get(user_id, 0), subscription_counts.get(user_id, 0))
+            for user_id in ids
+        }
+    
     async def create(self, user_data: dict) -> User:
         """
         Создание нового пользователя
@@ -0,0 +1,58 @@
+"""
+Репозиторий для работы со статистикой по дням
+Согласно rules.md: доступ к базе данных в repositories
+"""
+from datetime import date
+from typing import Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+
+# Итоги дня по журналу звёзд: обновление существующих строк и вставка недостающих одним выражением.
+# tasks_completed существующих строк не трогаем (клиент пишет его в течение дня через /api/stats/update),
+# для новых строк - число выполненных задач чек-листа на момент свёртки
+ROLLUP_DAY_SQL = text("""
+WITH earned AS (
+    SELECT s.child_id, sum(h.stars) AS stars
+    FROM star_history h
+    JOIN stars s ON s.id = h.star_id
+    WHERE h.created_at >= CAST(:day AS date) AND h.created_at < CAST(:day AS date) + 1
+    GROUP BY s.child_id
+),
+completed AS (
+    SELECT t.child_id, count(*) AS tasks
+    FROM tasks t
+    JOIN earned e ON e.child_id = t.child_id
+    WHERE t.completed AND t.task_type = 'CHECKLIST'
+    GROUP BY t.child_id
+),
+updated AS (
+    UPDATE weekly_stats w
+    SET stars = e.stars, updated_at = now()
+    FROM earned e
+    WHERE w.child_id = e.child_id AND w.date = :day_str
+    RETURNING w.child_id
+),
+inserted AS (
+    INSERT INTO weekly_stats (child_id, date, stars, tasks_completed)
+    SELECT e.child_id, :day_str, e.stars, COALESCE(c.tasks, 0)
+    FROM earned e
+    LEFT JOIN completed c ON c.child_id = e.child_id
+    WHERE NOT EXISTS (SELECT 1 FROM weekly_stats w WHERE w.child_id = e.child_id AND w.date = :day_str)
+    RETURNING child_id
+)
+SELECT (SELECT count(*) FROM updated) AS updated, (SELECT count(*) FROM inserted) AS inserted
+""")
+
+
+class WeeklyStatsRepository:
+    """Репозиторий для работы со статистикой по дням"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def rollup_day(self, day: date) -> Tuple[int, int]:
+        """Свёртка звёзд за день в weekly_stats; возвращает (обновлено, добавлено)"""
+        result = await self.session.execute(ROLLUP_DAY_SQL, {"day": day, "day_str": day.isoformat()})
+        row = result.one()
+        return row.updated, row.inserted
@@ -2,20 +2,23 @@
 Роутер для админ-панели
 Согласно требованиям: полное управление сайтом
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func
 from typing import List, Optional
 from schemas.admin import (
     AdminUserResponse, AdminChildResponse, AdminSubscriptionResponse,
-    AdminNotificationResponse, AdminStatsResponse, AdminUserUpdate, AdminChildUpdate
+    AdminNotificationResponse, AdminStatsResponse, AdminUserUpdate, AdminChildUpdate, AdminJobResponse
 )
 from repositories.user_repository import UserRepository
 from repositories.child_repository import ChildRepository
 from repositories.subscription_repository import SubscriptionRepository
 from repositories.notification_repository import NotificationRepository
+from repositories.scheduled_job_repository import ScheduledJobRepository
 from core.database import get_db
 from core.dependencies import get_current_user, check_admin_access
+from core.query_budget import query_budget
+from core.responses import SchemaResponse
 from models.user import User, UserRole
 from models.subscription import Subscription
 from models.notification import Notification, NotificationType
@@ -27,6 +30,7 @@ router = APIRouter()
 
 
 @router.get("/stats", response_model=AdminStatsResponse)
+@query_budget(max_queries=16)
 async def get_admin_stats(
     db: AsyncSession = Depends(get_db),
     current_admin: dict = Depends(check_admin_access)
@@ -93,12 +97,7 @@ async def get_admin_stats(
     
     # Последние пользователи (10)
     try:
-        recent_users_result = await db.execute(
-            select(User)
-            .order_by(desc(User.created_at))
-            .limit(10)
-        )
-        recent_users = list(recent_users_result.scalars().all())
+        recent_users = await user_repo.get_page(0, 10)
         import logging
         logger = logging.getLogger(__name__)
         logger.info(f"Загружено пользователей для статистики: {len(recent_users)}")
@@ -110,23 +109,13 @@ async def get_admin_stats(
     
     # Последние подписки (10)
     try:
-        recent_subscriptions_result = await db.execute(
-            select(Subscription)
-            .order_by(desc(Subscription.created_at))
-            .limit(10)
-        )
-        recent_subscriptions = recent_subscriptions_result.scalars().all()
+        recent_subscriptions = await SubscriptionRepository(db).get_page(0, 10)
     except Exception:
         recent_subscriptions = []
     
     # Последние уведомления (20)
     try:
-        recent_notifications_result = await db.execute(
-            select(Notification)
-            .order_by(desc(Notification.created_at))
-            .limit(20)
-        )
-        recent_notifications = recent_notifications_result.scalars().all()
+        recent_notifications = await NotificationRepository(db).get_page(0, 20)
     except Exception:
         recent_notifications = []
     
@@ -135,26 +124,16 @@ async def get_admin_stats(
     logger = logging.getLogger(__name__)
     user_responses = []
     logger.info(f"Начинаем обработку {len(recent_users)} пользователей для статистики")
+    # Дети и подписки - двумя GROUP BY на всех пользователей сразу
+    try:
+        related_counts = await user_repo.get_related_counts(user.id for user in recent_users)
+    except Exception as count_error:
+        # Продолжаем с нулевыми значениями
+        logger.warning(f"Ошибка подсчета детей и подписок: {count_error}")
+        related_counts = {}
     for user in recent_users:
         try:
-            # Подсчитываем детей и подписки через запросы, чтобы избежать проблем с lazy loading
-            children_count = 0
-            subscriptions_count = 0
-            try:
-                # Используем уже импортированные модели
-                children_result = await db.execute(
-                    select(func.count(Child.id)).where(Child.user_id == user.id)
-                )
-                children_count = children_result.scalar() or 0
-                
-                subscriptions_result = await db.execute(
-                    select(func.count(Subscription.id)).where(Subscription.user_id == user.id)
-                )
-                subscriptions_count = subscriptions_result.scalar() or 0
-            except Exception as count_error:
-                # Продолжаем с нулевыми значениями
-                logger.warning(f"Ошибка подсчета для пользователя {user.id}: {count_error}")
-                pass
+            children_count, subscriptions_count = related_counts.get(user.id, (0, 0))
             
             # Преобразуем role в строку для схемы
             role_str = user.role
@@ -185,10 +164,19 @@ async def get_admin_stats(
     
     logger.info(f"Всего обработано пользователей: {len(user_responses)} из {len(recent_users)}")
     
+    # Владельцы подписок и уведомлений - одним запросом
+    try:
+        owners = await user_repo.get_contacts_by_ids(
+            [sub.user_id for sub in recent_subscriptions] + [notif.user_id for notif in recent_notifications]
+        )
+    except Exception as e:
+        logger.error(f"Ошибка загрузки владельцев подписок и уведомлений: {e}")
+        owners = {}
+    
     subscription_responses = []
     for sub in recent_subscriptions:
         try:
-            user = await user_repo.get_by_id(sub.user_id)
+            user = owners.get(sub.user_id)
             # Используем имя, телефон или email для идентификации пользователя
             user_identifier = "Unknown"
             if user:
@@ -214,7 +202,7 @@ async def get_admin_stats(
     notification_responses = []
     for notif in recent_notifications:
         try:
-            user = await user_repo.get_by_id(notif.user_id)
+            user = owners.get(notif.user_id)
             # Используем имя, телефон или email для идентификации пользователя
             user_identifier = "Unknown"
             if user:
@@ -235,7 +223,7 @@ async def get_admin_stats(
             logger.error(f"Ошибка обработки уведомления {notif.id}: {e}")
             continue
     
-    return AdminStatsResponse(
+    return SchemaResponse(AdminStatsResponse(
         total_users=total_users,
         total_parents=total_parents,
         total_children=total_children,
@@ -246,10 +234,11 @@ async def get_admin_stats(
         recent_users=user_responses,
         recent_subscriptions=subscription_responses,
         recent_notifications=notification_responses
-    )
+    ))
 
 
 @router.get("/users", response_model=List[AdminUserResponse])
+@query_budget(max_queries=6)
 async def get_all_users(
     db: AsyncSession = Depends(get_db),
     current_admin: dict = Depends(check_admin_access),
@@ -262,37 +251,20 @@ async def get_all_users(
     logger = logging.getLogger(__name__)
     
     try:
-        query = select(User)
-        
-        if role:
-            query = query.where(User.role == role)
+        users = await UserRepository(db).get_page(skip, limit, role.value if role else None)
         
-        query = query.order_by(desc(User.created_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        users = result.scalars().all()
+        # Дети и подписки считаются двумя GROUP BY на всю страницу (не по запросу на пользователя)
+        try:
+            related_counts = await UserRepository(db).get_related_counts(user.id for user in users)
+        except Exception as count_error:
+            logger.warning(f"Ошибка подсчета детей и подписок: {count_error}")
+            # Продолжаем с нулевыми значениями
+            related_counts = {}
         
         user_responses = []
         for user in users:
             try:
-                # Подсчитываем детей и подписки через запросы, чтобы избежать проблем с lazy loading
-                children_count = 0
-                subscriptions_count = 0
-                try:
-                    from models.child import Child
-                    from models.subscription import Subscription
-                    children_result = await db.execute(
-                        select(func.count(Child.id)).where(Child.user_id == user.id)
-                    )
-                    children_count = children_result.scalar() or 0
-                    
-                    subscriptions_result = await db.execute(
-                        select(func.count(Subscription.id)).where(Subscription.user_id == user.id)
-                    )
-                    subscriptions_count = subscriptions_result.scalar() or 0
-                except Exception as count_error:
-                    logger.warning(f"Ошибка подсчета для пользователя {user.id}: {count_error}")
-                    # Продолжаем с нулевыми значениями
+                children_count, subscriptions_count = related_counts.get(user.id, (0, 0))
                 
                 # Преобразуем роль в строку для схемы
                 role_str = user.role
@@ -319,7 +291,7 @@ async def get_all_users(
                 logger.error(f"Ошибка обработки пользователя {user.id}: {e}", exc_info=True)
                 continue
         
-        return user_responses
+        return SchemaResponse(user_responses)
     except Exception as e:
         logger.error(f"Ошибка получения пользователей из БД: {e}", exc_info=True)
         # Возвращаем пустой список вместо ошибки 500
@@ -327,6 +299,7 @@ async def get_all_users(
 
 
 @router.get("/children", response_model=List[AdminChildResponse])
+@query_budget(max_queries=7)
 async def get_all_children(
     db: AsyncSession = Depends(get_db),
     current_admin: dict = Depends(check_admin_access),
@@ -338,31 +311,31 @@ async def get_all_children(
     logger = logging.getLogger(__name__)
     
     try:
-        result = await db.execute(
-            select(Child)
-            .order_by(desc(Child.created_at))
-            .offset(skip)
-            .limit(limit)
-        )
-        children = result.scalars().all()
+        children = await ChildRepository(db).get_page(skip, limit)
+        
+        # Родители, задачи и звёзды - по одному запросу на всю страницу
+        child_ids = [child.id for child in children]
+        parents = await UserRepository(db).get_contacts_by_ids(child.user_id for child in children)
+        tasks_counts = {}
+        stars_totals = {}
+        if child_ids:
+            tasks_result = await db.execute(
+                select(Task.child_id, func.count(Task.id))
+                .where(Task.child_id.in_(child_ids))
+                .group_by(Task.child_id)
+            )
+            tasks_counts = dict(tasks_result.all())
+            stars_result = await db.execute(
+                select(Star.child_id, Star.total).where(Star.child_id.in_(child_ids))
+            )
+            stars_totals = dict(stars_result.all())
         
         child_responses = []
         for child in children:
             try:
-                user = await UserRepository(db).get_by_id(child.user_id)
-                
-                # Подсчитываем задачи
-                tasks_result = await db.execute(
-                    select(func.count(Task.id)).where(Task.child_id == child.id)
-                )
-                tasks_count = tasks_result.scalar() or 0
-                
-                # Получаем звёзды
-                stars_result = await db.execute(
-                    select(Star).where(Star.child_id == child.id)
-                )
-                star = stars_result.scalar_one_or_none()
-                stars_total = star.total if star else 0
+                user = parents.get(child.user_id)
+                tasks_count = tasks_counts.get(child.id, 0)
+                stars_total = stars_totals.get(child.id) or 0
                 
                 # Используем имя, телефон или email для идентификации родителя
                 parent_identifier = "Unknown"
@@ -384,7 +357,7 @@ async def get_all_children(
                 # Продолжаем обработку других детей
                 continue
         
-        return child_responses
+        return SchemaResponse(child_responses)
     except Exception as e:
         logger.error(f"Ошибка получения детей из БД: {e}", exc_info=True)
         # Возвращаем пустой список вместо ошибки 500
@@ -392,6 +365,7 @@ async def get_all_children(
 
 
 @router.get("/subscriptions", response_model=List[AdminSubscriptionResponse])
+@query_budget(max_queries=4)
 async def get_all_subscriptions(
     db: AsyncSession = Depends(get_db),
     current_admin: dict = Depends(check_admin_access),
@@ -404,21 +378,13 @@ async def get_all_subscriptions(
     logger = logging.getLogger(__name__)
     
     try:
-        query = select(Subscription)
-        
-        if active_only:
-            query = query.where(Subscription.is_active == True)
-        
-        query = query.order_by(desc(Subscription.created_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        subscriptions = result.scalars().all()
+        subscriptions = await SubscriptionRepository(db).get_page(skip, limit, active_only)
         
-        user_repo = UserRepository(db)
+        owners = await UserRepository(db).get_contacts_by_ids(sub.user_id for sub in subscriptions)
         subscription_responses = []
         for sub in subscriptions:
             try:
-                user = await user_repo.get_by_id(sub.user_id)
+                user = owners.get(sub.user_id)
                 # Используем имя, телефон или email для идентификации пользователя
                 user_identifier = "Unknown"
                 if user:
@@ -440,7 +406,7 @@ async def get_all_subscriptions(
                 # Продолжаем обработку других подписок
                 continue
         
-        return subscription_responses
+        return SchemaResponse(subscription_responses)
     except Exception as e:
         logger.error(f"Ошибка получения подписок из БД: {e}", exc_info=True)
         # Возвращаем пустой список вместо ошибки 500
@@ -448,6 +414,7 @@ async def get_all_subscriptions(
 
 
 @router.get("/notifications", response_model=List[AdminNotificationResponse])
+@query_budget(max_queries=4)
 async def get_all_notifications(
     db: AsyncSession = Depends(get_db),
     current_admin: dict = Depends(check_admin_access),
@@ -460,21 +427,13 @@ async def get_all_notifications(
     logger = logging.getLogger(__name__)
     
     try:
-        query = select(Notification)
+        notifications = await NotificationRepository(db).get_page(skip, limit, type)
         
-        if type:
-            query = query.where(Notification.type == type)
-        
-        query = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        notifications = result.scalars().all()
-        
-        user_repo = UserRepository(db)
+        owners = await UserRepository(db).get_contacts_by_ids(notif.user_id for notif in notifications)
         notification_responses = []
         for notif in notifications:
             try:
-                user = await user_repo.get_by_id(notif.user_id)
+                user = owners.get(notif.user_id)
                 # Используем имя, телефон или email для идентификации пользователя
                 user_identifier = "Unknown"
                 if user:
@@ -498,13 +457,53 @@ async def get_all_notifications(
                 logger.error(f"Ошибка обработки уведомления {notif.id}: {e}")
                 continue
         
-        return notification_responses
+        return SchemaResponse(notification_responses)
     except Exception as e:
         logger.error(f"Ошибка получения уведомлений из БД: {e}", exc_info=True)
         # Возвращаем пустой список вместо ошибки 500
         return []
 
 
+@router.get("/jobs", response_model=List[AdminJobResponse])
+@query_budget(max_queries=3)
+async def get_scheduled_jobs(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_admin: dict = Depends(check_admin_access)
+):
+    """
+    Состояние фоновых задач обслуживания (core/scheduler.py)
+    last_* - общие для всех воркеров (scheduled_jobs), next_run_at и running_here - по этому воркеру
+    """
+    from datetime import datetime
+    from services.maintenance_service import maintenance_jobs
+    
+    scheduler = getattr(request.app.state, "scheduler", None)
+    states = {state.name: state for state in await ScheduledJobRepository(db).get_all()}
+    
+    responses = []
+    for job in maintenance_jobs():
+        state = states.get(job.name)
+        next_run = scheduler.next_runs.get(job.name) if scheduler else None
+        responses.append(AdminJobResponse(
+            name=job.name,
+            description=job.description,
+            schedule=job.schedule,
+            next_run_at=(next_run or job.cron.next_after(datetime.now())).astimezone(),
+            running_here=bool(scheduler and job.name in scheduler.running),
+            last_scheduled_for=state.last_scheduled_for if state else None,
+            last_started_at=state.last_started_at if state else None,
+            last_finished_at=state.last_finished_at if state else None,
+            last_status=state.last_status if state else None,
+            last_duration=state.last_duration if state else None,
+            last_error=state.last_error if state else None,
+            last_result=state.last_result if state else None,
+            runs_count=state.runs_count if state else 0,
+            failures_count=state.failures_count if state else 0,
+        ))
+    return responses
+
+
 @router.put("/users/{user_id}")
 async def update_user(
     user_id: int,
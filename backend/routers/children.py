@@ -2,14 +2,16 @@
 Роутер для работы с детьми
 Согласно rules.md: thin controllers (только вызовы сервисов)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.child import ChildCreate, ChildUpdate, ChildResponse
 from schemas.auth import ChildAccessResponse
 from repositories.child_repository import ChildRepository
 from repositories.child_access_repository import ChildAccessRepository
+from services.media_service import MediaService
 from core.database import get_db
 from core.dependencies import get_current_user
+from core.responses import SchemaResponse
 from core.security.password import hash_password
 from datetime import datetime, timedelta
 import qrcode
@@ -27,7 +29,7 @@ async def get_children(
     """Получение списка детей пользователя"""
     repo = ChildRepository(db)
     children = await repo.get_by_user_id(current_user["id"])
-    return [ChildResponse.model_validate(c) for c in children]
+    return SchemaResponse([ChildResponse.model_validate(c) for c in children])
 
 
 @router.post("/", response_model=ChildResponse)
@@ -110,6 +112,39 @@ async def update_child(
     return ChildResponse.model_validate(child)
 
 
+@router.put("/{child_id}/avatar", response_model=ChildResponse)
+async def upload_child_avatar(
+    child_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Загрузка аватара: тело запроса - файл изображения (JPEG, PNG, WebP, GIF), не multipart
+    Читается потоком, не больше MAX_UPLOAD_SIZE
+    """
+    content_length = request.headers.get("content-length")
+    service = MediaService(db)
+    child = await service.set_child_avatar(
+        child_id,
+        current_user["id"],
+        request.stream(),
+        int(content_length) if content_length and content_length.isdigit() else None,
+    )
+    return ChildResponse.model_validate(child)
+
+
+@router.delete("/{child_id}/avatar", response_model=ChildResponse)
+async def delete_child_avatar(
+    child_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Удаление аватара ребёнка"""
+    child = await MediaService(db).remove_child_avatar(child_id, current_user["id"])
+    return ChildResponse.model_validate(child)
+
+
 @router.delete("/{child_id}")
 async def delete_child(
     child_id: int,
@@ -291,6 +326,13 @@ async def get_child_access(
             detail="Доступ для ребёнка не настроен"
         )
     
+    # Токен истёк и удалён задачей qr_token_expiry: QR из него не пустит ребёнка
+    if access.qr_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Срок действия QR-кода истёк, создайте новый доступ (generate-access)"
+        )
+    
     # Генерируем QR-код заново (если нужно)
     qr_data = {
         "token": access.qr_token,
@@ -2,31 +2,81 @@
 Роутер для работы с дневником
 Согласно rules.md: thin controllers (только вызовы сервисов)
 """
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from schemas.diary import DiaryEntryCreate, DiaryEntryUpdate, DiaryEntryResponse
-from models.diary import DiaryEntry
+from schemas.diary import (
+    DiaryEntryCreate, DiaryEntryUpdate, DiaryEntryResponse,
+    DiaryEntrySummary, DiaryEntryPage
+)
+from repositories.diary_repository import DiaryRepository
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
 from core.exceptions import NotFoundError, ForbiddenError
+from core.responses import SchemaResponse
+from core.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, next_cursor
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[DiaryEntryResponse])
+def _page(rows: list, limit: int) -> DiaryEntryPage:
+    """Сборка страницы из строк проекции (limit + 1 строк)"""
+    return DiaryEntryPage(
+        items=[DiaryEntrySummary.model_validate(r) for r in rows[:limit]],
+        next_cursor=next_cursor(rows, limit)
+    )
+
+
+async def _get_own_entry(repo: DiaryRepository, entry_id: int, child_id: int):
+    """Получение записи с проверкой принадлежности ребёнку"""
+    entry = await repo.get_by_id(entry_id)
+    
+    if not entry:
+        raise NotFoundError("Запись не найдена")
+    
+    if entry.child_id != child_id:
+        raise ForbiddenError("Нет доступа к этой записи")
+    
+    return entry
+
+
+@router.get("/", response_model=DiaryEntryPage)
 async def get_diary_entries(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_child: dict = Depends(get_current_child)
 ):
-    """Получение всех записей дневника"""
-    result = await db.execute(
-        select(DiaryEntry)
-        .where(DiaryEntry.child_id == current_child.id)
-        .order_by(DiaryEntry.created_at.desc())
-    )
-    entries = list(result.scalars().all())
-    return [DiaryEntryResponse.model_validate(e) for e in entries]
+    """Список записей дневника: заголовок и превью, курсорная пагинация"""
+    repo = DiaryRepository(db)
+    rows = await repo.get_summary_page(current_child.id, limit, decode_cursor(cursor))
+    return SchemaResponse(_page(rows, limit))
+
+
+@router.get("/search", response_model=DiaryEntryPage)
+async def search_diary_entries(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_child: dict = Depends(get_current_child)
+):
+    """Полнотекстовый поиск по заголовкам и тексту записей (русская морфология)"""
+    repo = DiaryRepository(db)
+    rows = await repo.search_summary_page(current_child.id, q, limit, decode_cursor(cursor))
+    return SchemaResponse(_page(rows, limit))
+
+
+@router.get("/{entry_id}", response_model=DiaryEntryResponse)
+async def get_diary_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_child: dict = Depends(get_current_child)
+):
+    """Получение записи дневника целиком"""
+    repo = DiaryRepository(db)
+    entry = await _get_own_entry(repo, entry_id, current_child.id)
+    return DiaryEntryResponse.model_validate(entry)
 
 
 @router.post("/", response_model=DiaryEntryResponse)
@@ -37,13 +87,11 @@ async def create_diary_entry(
     _: bool = Depends(check_parent_consent)
 ):
     """Создание записи в дневнике"""
-    entry = DiaryEntry(
-        child_id=current_child.id,
+    repo = DiaryRepository(db)
+    entry = await repo.create({
+        "child_id": current_child.id,
         **entry_data.model_dump()
-    )
-    db.add(entry)
-    await db.flush()
-    await db.refresh(entry)
+    })
     return DiaryEntryResponse.model_validate(entry)
 
 
@@ -56,23 +104,9 @@ async def update_diary_entry(
     _: bool = Depends(check_parent_consent)
 ):
     """Обновление записи в дневнике"""
-    result = await db.execute(
-        select(DiaryEntry).where(DiaryEntry.id == entry_id)
-    )
-    entry = result.scalar_one_or_none()
-    
-    if not entry:
-        raise NotFoundError("Запись не найдена")
-    
-    if entry.child_id != current_child.id:
-        raise ForbiddenError("Нет доступа к этой записи")
-    
-    update_data = entry_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(entry, key, value)
-    
-    await db.flush()
-    await db.refresh(entry)
+    repo = DiaryRepository(db)
+    entry = await _get_own_entry(repo, entry_id, current_child.id)
+    entry = await repo.update(entry, entry_data.model_dump(exclude_unset=True))
     return DiaryEntryResponse.model_validate(entry)
 
 
@@ -84,18 +118,7 @@ async def delete_diary_entry(
     _: bool = Depends(check_parent_consent)
 ):
     """Удаление записи из дневника"""
-    result = await db.execute(
-        select(DiaryEntry).where(DiaryEntry.id == entry_id)
-    )
-    entry = result.scalar_one_or_none()
-    
-    if not entry:
-        raise NotFoundError("Запись не найдена")
-    
-    if entry.child_id != current_child.id:
-        raise ForbiddenError("Нет доступа к этой записи")
-    
-    await db.delete(entry)
-    await db.flush()
+    repo = DiaryRepository(db)
+    entry = await _get_own_entry(repo, entry_id, current_child.id)
+    await repo.delete(entry)
     return {"message": "Запись удалена"}
-
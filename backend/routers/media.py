@@ -0,0 +1,29 @@
+"""
+Роутер медиафайлов (аватары детей)
+Согласно rules.md: thin controllers (только вызовы сервисов)
+Адреса содержат хэш содержимого, поэтому ответы кэшируются браузером и CDN без ревалидации
+"""
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+
+from core.config import settings
+from core.utils.media import DIGEST_RE, avatar_path
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/avatars/{digest}/{size}.webp", include_in_schema=False)
+async def get_avatar(digest: str, size: int):
+    """Превью аватара"""
+    if not DIGEST_RE.match(digest) or size not in settings.AVATAR_SIZES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    path = avatar_path(digest, size)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return FileResponse(
+        str(path),
+        media_type="image/webp",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
@@ -7,13 +7,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.child import ChildCreate, ChildUpdate, ChildResponse
 from schemas.settings import SettingsUpdate, SettingsResponse
 from schemas.family_rules import FamilyRulesResponse, FamilyRulesUpdate
+from schemas.notification import NotificationSettingsResponse, NotificationSettingsUpdate
 from schemas.auth import ChildAccessResponse
 from repositories.child_repository import ChildRepository
 from repositories.child_access_repository import ChildAccessRepository
 from repositories.settings_repository import SettingsRepository
 from repositories.family_rules_repository import FamilyRulesRepository
+from core.config import settings as app_settings
 from core.database import get_db
 from core.dependencies import get_current_user
+from core.responses import SchemaResponse
 from core.security.password import hash_password
 from datetime import datetime, timedelta
 import qrcode
@@ -42,7 +45,7 @@ async def get_children(
     """Получение списка детей родителя"""
     repo = ChildRepository(db)
     children = await repo.get_by_user_id(current_user["id"])
-    return [ChildResponse.model_validate(c) for c in children]
+    return SchemaResponse([ChildResponse.model_validate(c) for c in children])
 
 
 @router.post("/children", response_model=ChildResponse)
@@ -270,4 +273,26 @@ async def update_family_rules(
     )
 
 
+@router.get("/notifications", response_model=NotificationSettingsResponse)
+async def get_notification_settings(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(check_parent_role)
+):
+    """Настройки уведомлений семьи: частота сводки активности детей"""
+    rules_repo = FamilyRulesRepository(db)
+    rules = await rules_repo.get_by_user_id(current_user["id"])
+    frequency = (rules.digest_frequency if rules else None) or app_settings.NOTIFICATION_DIGEST_DEFAULT_FREQUENCY
+    return NotificationSettingsResponse(digest_frequency=frequency)
+
 
+@router.put("/notifications", response_model=NotificationSettingsResponse)
+async def update_notification_settings(
+    settings_data: NotificationSettingsUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(check_parent_role)
+):
+    """Изменение частоты сводки активности детей (hourly, daily, off)"""
+    rules_repo = FamilyRulesRepository(db)
+    rules = await rules_repo.get_or_create(current_user["id"])
+    rules = await rules_repo.set_digest_frequency(rules, settings_data.digest_frequency.value)
+    return NotificationSettingsResponse(digest_frequency=rules.digest_frequency)
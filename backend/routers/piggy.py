@@ -2,12 +2,18 @@
 Роутер для работы с копилкой
 Согласно rules.md: thin controllers (только вызовы сервисов)
 """
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas.piggy import PiggyResponse, PiggyGoalUpdate, PiggyAddRequest, PiggyGoalResponse, PiggyHistoryResponse
+from schemas.piggy import (
+    PiggyResponse, PiggyAddResponse, PiggyGoalUpdate, PiggyAddRequest,
+    PiggyGoalResponse, PiggyHistoryResponse, PiggyHistoryPage
+)
 from services.piggy_service import PiggyService
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
+from core.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.responses import SchemaResponse
 
 router = APIRouter()
 
@@ -24,15 +30,29 @@ async def get_piggy(
     from repositories.piggy_repository import PiggyRepository
     piggy_repo = PiggyRepository(db)
     goal = await piggy_repo.get_goal(piggy.id)
-    history = await piggy_repo.get_history(piggy.id)
     
     return PiggyResponse(
         amount=piggy.amount,
-        goal=PiggyGoalResponse.model_validate(goal) if goal else None,
-        history=[PiggyHistoryResponse.model_validate(h) for h in history]
+        goal=PiggyGoalResponse.model_validate(goal) if goal else None
     )
 
 
+@router.get("/history", response_model=PiggyHistoryPage)
+async def get_piggy_history(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_child: dict = Depends(get_current_child)
+):
+    """История копилки с курсорной пагинацией (новые записи первыми)"""
+    service = PiggyService(db)
+    page = await service.get_history(current_child.id, limit, cursor)
+    return SchemaResponse(PiggyHistoryPage(
+        items=[PiggyHistoryResponse.model_validate(h) for h in page["items"]],
+        next_cursor=page["next_cursor"]
+    ))
+
+
 @router.put("/goal", response_model=PiggyResponse)
 async def update_goal(
     goal_data: PiggyGoalUpdate,
@@ -47,16 +67,14 @@ async def update_goal(
     from repositories.piggy_repository import PiggyRepository
     piggy_repo = PiggyRepository(db)
     goal = await piggy_repo.get_goal(piggy.id)
-    history = await piggy_repo.get_history(piggy.id)
     
     return PiggyResponse(
         amount=piggy.amount,
-        goal=PiggyGoalResponse.model_validate(goal) if goal else None,
-        history=[PiggyHistoryResponse.model_validate(h) for h in history]
+        goal=PiggyGoalResponse.model_validate(goal) if goal else None
     )
 
 
-@router.post("/add", response_model=PiggyResponse)
+@router.post("/add", response_model=PiggyAddResponse)
 async def add_virtual_currency(
     request: PiggyAddRequest,
     db: AsyncSession = Depends(get_db),
@@ -65,15 +83,15 @@ async def add_virtual_currency(
 ):
     """Добавление виртуальной валюты в копилку (для конвертации в подарки)"""
     service = PiggyService(db)
-    piggy = await service.add_virtual_currency(current_child.id, request)
+    result = await service.add_virtual_currency(current_child.id, request)
+    piggy = result["piggy"]
     
     from repositories.piggy_repository import PiggyRepository
     piggy_repo = PiggyRepository(db)
     goal = await piggy_repo.get_goal(piggy.id)
-    history = await piggy_repo.get_history(piggy.id)
     
-    return PiggyResponse(
+    return PiggyAddResponse(
         amount=piggy.amount,
         goal=PiggyGoalResponse.model_validate(goal) if goal else None,
-        history=[PiggyHistoryResponse.model_validate(h) for h in history]
+        entry=PiggyHistoryResponse.model_validate(result["entry"])
     )
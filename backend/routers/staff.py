@@ -5,7 +5,7 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func
 from typing import List, Optional
 from schemas.admin import (
     AdminUserResponse, AdminChildResponse, AdminSubscriptionResponse,
@@ -17,9 +17,9 @@ from repositories.subscription_repository import SubscriptionRepository
 from repositories.notification_repository import NotificationRepository
 from core.database import get_db
 from core.dependencies import get_current_staff, check_staff_role
+from core.responses import SchemaResponse
 from models.user import User
 from models.subscription import Subscription
-from models.notification import Notification, NotificationType
 from models.child import Child
 from models.task import Task
 from models.star import Star
@@ -109,17 +109,9 @@ async def get_staff_users(
     Доступ: admin, support
     """
     user_repo = UserRepository(db)
+    users = await user_repo.get_page(skip, limit, role)
     
-    query = select(User)
-    if role:
-        query = query.where(User.role == role)
-    
-    query = query.order_by(desc(User.created_at)).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    users = result.scalars().all()
-    
-    return [
+    return SchemaResponse([
         AdminUserResponse(
             id=user.id,
             name=user.name,
@@ -130,7 +122,7 @@ async def get_staff_users(
             created_at=user.created_at.isoformat() if user.created_at else None
         )
         for user in users
-    ]
+    ])
 
 
 @router.get("/children", response_model=List[AdminChildResponse])
@@ -144,13 +136,9 @@ async def get_staff_children(
     Получение списка детей
     Доступ: admin, support, moderator
     """
-    child_repo = ChildRepository(db)
-    
-    query = select(Child).order_by(desc(Child.created_at)).offset(skip).limit(limit)
-    result = await db.execute(query)
-    children = result.scalars().all()
+    children = await ChildRepository(db).get_page(skip, limit)
     
-    return [
+    return SchemaResponse([
         AdminChildResponse(
             id=child.id,
             name=child.name,
@@ -158,7 +146,7 @@ async def get_staff_children(
             created_at=child.created_at.isoformat() if child.created_at else None
         )
         for child in children
-    ]
+    ])
 
 
 @router.get("/subscriptions", response_model=List[AdminSubscriptionResponse])
@@ -173,17 +161,9 @@ async def get_staff_subscriptions(
     Получение списка подписок
     Доступ: admin, support
     """
-    subscription_repo = SubscriptionRepository(db)
+    subscriptions = await SubscriptionRepository(db).get_page(skip, limit, active_only)
     
-    query = select(Subscription)
-    if active_only:
-        query = query.where(Subscription.is_active == True)
-    
-    query = query.order_by(desc(Subscription.created_at)).offset(skip).limit(limit)
-    result = await db.execute(query)
-    subscriptions = result.scalars().all()
-    
-    return [
+    return SchemaResponse([
         AdminSubscriptionResponse(
             id=sub.id,
             user_id=sub.user_id,
@@ -191,7 +171,7 @@ async def get_staff_subscriptions(
             created_at=sub.created_at.isoformat() if sub.created_at else None
         )
         for sub in subscriptions
-    ]
+    ])
 
 
 @router.get("/notifications", response_model=List[AdminNotificationResponse])
@@ -206,17 +186,9 @@ async def get_staff_notifications(
     Получение списка уведомлений
     Доступ: admin, support, moderator
     """
-    notification_repo = NotificationRepository(db)
-    
-    query = select(Notification)
-    if type:
-        query = query.where(Notification.type == type)
-    
-    query = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit)
-    result = await db.execute(query)
-    notifications = result.scalars().all()
+    notifications = await NotificationRepository(db).get_page(skip, limit, type)
     
-    return [
+    return SchemaResponse([
         AdminNotificationResponse(
             id=notif.id,
             user_id=notif.user_id,
@@ -225,7 +197,7 @@ async def get_staff_notifications(
             created_at=notif.created_at.isoformat() if notif.created_at else None
         )
         for notif in notifications
-    ]
+    ])
 
 
 @router.put("/users/{user_id}")
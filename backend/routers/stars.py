@@ -2,17 +2,25 @@
 Роутер для работы со звёздами
 Согласно rules.md: thin controllers (только вызовы сервисов)
 """
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas.star import StarResponse, StarAddRequest, StarExchangeRequest, StarHistoryResponse, StarStreakResponse
+from schemas.star import (
+    StarResponse, StarAddRequest, StarAddResponse, StarExchangeRequest,
+    StarHistoryResponse, StarHistoryPage, StarStreakResponse
+)
 from services.star_service import StarService
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
+from core.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.query_budget import query_budget
+from core.responses import SchemaResponse
 
 router = APIRouter()
 
 
 @router.get("/", response_model=StarResponse)
+@query_budget(max_queries=8)
 async def get_stars(
     db: AsyncSession = Depends(get_db),
     current_child: dict = Depends(get_current_child)
@@ -21,21 +29,36 @@ async def get_stars(
     service = StarService(db)
     star = await service.get_stars(current_child.id)
     
-    # Получаем историю и streak
+    # Получаем streak (история отдаётся отдельно через /history)
     from repositories.star_repository import StarRepository
     star_repo = StarRepository(db)
-    history = await star_repo.get_history(star.id)
     streak = await star_repo.get_or_create_streak(star.id)
     
     return StarResponse(
         today=star.today,
         total=star.total,
-        history=[StarHistoryResponse.model_validate(h) for h in history],
         streak=StarStreakResponse.model_validate(streak) if streak else None
     )
 
 
-@router.post("/add")
+@router.get("/history", response_model=StarHistoryPage)
+@query_budget(max_queries=6)
+async def get_star_history(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_child: dict = Depends(get_current_child)
+):
+    """История звёзд с курсорной пагинацией (новые записи первыми)"""
+    service = StarService(db)
+    page = await service.get_history(current_child.id, limit, cursor)
+    return SchemaResponse(StarHistoryPage(
+        items=[StarHistoryResponse.model_validate(h) for h in page["items"]],
+        next_cursor=page["next_cursor"]
+    ))
+
+
+@router.post("/add", response_model=StarAddResponse)
 async def add_stars(
     request: StarAddRequest,
     db: AsyncSession = Depends(get_db),
@@ -50,30 +73,33 @@ async def add_stars(
     
     from repositories.star_repository import StarRepository
     star_repo = StarRepository(db)
-    history = await star_repo.get_history(star.id)
     streak = await star_repo.get_or_create_streak(star.id)
     
-    return {
-        "star": StarResponse(
+    return StarAddResponse(
+        star=StarResponse(
             today=star.today,
             total=star.total,
-            history=[StarHistoryResponse.model_validate(h) for h in history],
             streak=StarStreakResponse.model_validate(streak) if streak else None
         ),
-        "rewards": rewards
-    }
+        entry=StarHistoryResponse.model_validate(result["entry"]),
+        rewards=rewards
+    )
 
 
 @router.post("/exchange")
 async def exchange_stars(
     request: StarExchangeRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=64),
     db: AsyncSession = Depends(get_db),
     current_child: dict = Depends(get_current_child),
     _: bool = Depends(check_parent_consent)
 ):
-    """Обмен звёзд на виртуальную валюту (для конвертации в подарки)"""
+    """
+    Обмен звёзд на виртуальную валюту (для конвертации в подарки)
+    Повтор с тем же Idempotency-Key не начисляет валюту повторно
+    """
     service = StarService(db)
-    result = await service.exchange_stars(current_child.id, request)
+    result = await service.exchange_stars(current_child.id, request, idempotency_key)
     return result
 
 
@@ -13,9 +13,11 @@ from schemas.subscription import (
 )
 from repositories.subscription_repository import SubscriptionRepository, ParentConsentRepository
 from services.notification_service import NotificationService
+from services.legal_service import get_legal_library
 from models.notification import NotificationType
 from core.database import get_db
 from core.dependencies import get_current_user, check_parent_consent
+from core.consent_cache import get_consent_cache
 from core.exceptions import NotFoundError, ValidationError
 from datetime import datetime, timedelta
 
@@ -59,6 +61,9 @@ async def create_parent_consent(
     consent_repo = ParentConsentRepository(db)
     existing_consent = await consent_repo.get_by_child_id(consent_data.child_id)
     
+    # Версия политики конфиденциальности, на которую ссылается согласие
+    document = get_legal_library().consent_document(consent_data.document_hash)
+    
     # Получаем IP и User-Agent для аудита
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
@@ -69,7 +74,9 @@ async def create_parent_consent(
         "consent_given": consent_data.consent_given,
         "consent_date": datetime.now() if consent_data.consent_given else None,
         "ip_address": ip_address,
-        "user_agent": user_agent
+        "user_agent": user_agent,
+        "document_version": document.version,
+        "document_hash": document.sha256,
     }
     
     if existing_consent:
@@ -85,6 +92,10 @@ async def create_parent_consent(
         message=f"Согласие родителей {'предоставлено' if consent_data.consent_given else 'отозвано'} для ребёнка {child.name}"
     )
     
+    # Write-through после коммита: кэш не может опередить БД (check_parent_consent)
+    await db.commit()
+    await get_consent_cache().set(child.id, consent.consent_given)
+    
     return ParentConsentResponse.model_validate(consent)
 
 
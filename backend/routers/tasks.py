@@ -8,6 +8,7 @@ from schemas.task import TaskCreate, TaskUpdate, TaskListResponse, TaskResponse
 from services.task_service import TaskService
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
+from core.responses import SchemaResponse
 
 router = APIRouter()
 
@@ -21,14 +22,14 @@ async def get_tasks(
     service = TaskService(db)
     tasks = await service.get_tasks(current_child.id)
     
-    return TaskListResponse(
+    return SchemaResponse(TaskListResponse(
         checklist=[TaskResponse.model_validate(t) for t in tasks["checklist"]],
         kanban={
             "todo": [TaskResponse.model_validate(t) for t in tasks["kanban"]["todo"]],
             "doing": [TaskResponse.model_validate(t) for t in tasks["kanban"]["doing"]],
             "done": [TaskResponse.model_validate(t) for t in tasks["kanban"]["done"]]
         }
-    )
+    ))
 
 
 @router.post("/", response_model=TaskResponse)
@@ -54,7 +55,7 @@ async def update_task(
 ):
     """Обновление задачи"""
     service = TaskService(db)
-    task = await service.update_task(task_id, current_child.id, task_data)
+    task = await service.update_task(task_id, current_child, task_data)
     return TaskResponse.model_validate(task)
 
 
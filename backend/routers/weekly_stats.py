@@ -9,6 +9,7 @@ from schemas.weekly_stats import WeeklyStatsResponse, WeeklyStatResponse
 from models.weekly_stats import WeeklyStat
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
+from core.responses import SchemaResponse
 from datetime import datetime, timedelta
 
 router = APIRouter()
@@ -37,10 +38,10 @@ async def get_weekly_stats(
     days = [s for s in all_stats if s.date >= week_start.strftime("%Y-%m-%d")]
     last_week = [s for s in all_stats if last_week_start.strftime("%Y-%m-%d") <= s.date < week_start.strftime("%Y-%m-%d")]
     
-    return WeeklyStatsResponse(
+    return SchemaResponse(WeeklyStatsResponse(
         days=[WeeklyStatResponse.model_validate(s) for s in days],
         last_week=[WeeklyStatResponse.model_validate(s) for s in last_week]
-    )
+    ))
 
 
 @router.post("/update")
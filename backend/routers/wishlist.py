@@ -10,6 +10,8 @@ from models.wishlist import WishlistItem
 from core.database import get_db
 from core.dependencies import get_current_child, check_parent_consent
 from core.exceptions import NotFoundError, ForbiddenError
+from core.responses import SchemaResponse
+from services.notification_digest import GOAL_REACHED, record_activity
 
 router = APIRouter()
 
@@ -26,7 +28,7 @@ async def get_wishlist(
         .order_by(WishlistItem.position, WishlistItem.id)
     )
     items = list(result.scalars().all())
-    return [WishlistItemResponse.model_validate(i) for i in items]
+    return SchemaResponse([WishlistItemResponse.model_validate(i) for i in items])
 
 
 @router.post("/", response_model=WishlistItemResponse)
@@ -67,12 +69,17 @@ async def update_wishlist_item(
     if item.child_id != current_child.id:
         raise ForbiddenError("Нет доступа к этому элементу")
     
+    was_achieved = item.achieved
     update_data = item_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(item, key, value)
     
     await db.flush()
     await db.refresh(item)
+    # Достигнутая цель - в сводку активности для родителя (после коммита изменения)
+    if item.achieved and not was_achieved:
+        await db.commit()
+        await record_activity(current_child, GOAL_REACHED, item.name)
     return WishlistItemResponse.model_validate(item)
 
 
@@ -12,7 +12,7 @@ from schemas.wishlist import WishlistItemCreate, WishlistItemUpdate, WishlistIte
 from schemas.weekly_stats import WeeklyStatResponse, WeeklyStatsResponse
 from schemas.subscription import SubscriptionResponse, SubscriptionCancelRequest, SubscriptionRefundRequest, ParentConsentRequest, ParentConsentResponse
 from schemas.notification import NotificationResponse, ComplaintRequest, NotificationCreate
-from schemas.legal import LegalTextResponse
+from schemas.legal import LegalTextResponse, LegalVersionResponse
 from schemas.admin import AdminUserResponse, AdminChildResponse, AdminSubscriptionResponse, AdminNotificationResponse, AdminStatsResponse, AdminUserUpdate, AdminChildUpdate
 
 __all__ = [
@@ -55,6 +55,7 @@ __all__ = [
     "ComplaintRequest",
     "NotificationCreate",
     "LegalTextResponse",
+    "LegalVersionResponse",
     "AdminUserResponse",
     "AdminChildResponse",
     "AdminSubscriptionResponse",
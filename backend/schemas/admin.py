@@ -85,6 +85,24 @@ class AdminStatsResponse(BaseModel):
     recent_notifications: List[AdminNotificationResponse] = []
 
 
+class AdminJobResponse(BaseModel):
+    """Состояние фоновой задачи планировщика"""
+    name: str
+    description: str
+    schedule: str  # cron: минута час день месяц день_недели
+    next_run_at: Optional[datetime] = None  # Плановый запуск по часам этого воркера
+    running_here: bool = False  # Выполняется этим воркером сейчас
+    last_scheduled_for: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_status: Optional[str] = None  # running | ok | error (по всем воркерам)
+    last_duration: Optional[float] = None  # Секунды
+    last_error: Optional[str] = None
+    last_result: Optional[str] = None  # JSON-сводка
+    runs_count: int = 0
+    failures_count: int = 0
+
+
 class AdminUserUpdate(BaseModel):
     """Схема обновления пользователя"""
     name: Optional[str] = None  # Имя пользователя
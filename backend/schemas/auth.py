@@ -56,7 +56,7 @@ class ChildAccessResponse(BaseModel):
     """Ответ с данными доступа для ребёнка"""
     child_id: int
     qr_code: str  # Base64 изображение QR-кода
-    qr_token: str  # Токен для сканирования
+    qr_token: Optional[str] = None  # Токен для сканирования (None - истёк, нужно сгенерировать новый)
     pin: str  # PIN-код (показывается только один раз)
     pin_set: bool  # Установлен ли PIN
     expires_at: Optional[str] = None  # Срок действия QR-токена
@@ -2,9 +2,11 @@
 Pydantic схемы для детей
 Согласно rules.md: schemas для request/response
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, computed_field
+from typing import Dict, Optional
 from datetime import datetime
+from core.config import settings
+from core.utils.media import avatar_url, avatar_urls
 from models.child import Gender
 
 
@@ -12,11 +14,10 @@ class ChildBase(BaseModel):
     """Базовая схема ребёнка"""
     name: str = Field(..., min_length=1, max_length=100)
     gender: Gender = Gender.NONE
-    avatar: Optional[str] = None
 
 
 class ChildCreate(ChildBase):
-    """Схема создания ребёнка"""
+    """Схема создания ребёнка (аватар загружается отдельно: PUT /api/children/{id}/avatar)"""
     pass
 
 
@@ -24,7 +25,6 @@ class ChildUpdate(BaseModel):
     """Схема обновления ребёнка"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     gender: Optional[Gender] = None
-    avatar: Optional[str] = None
 
 
 class ChildResponse(ChildBase):
@@ -33,7 +33,22 @@ class ChildResponse(ChildBase):
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
+    avatar_hash: Optional[str] = Field(None, exclude=True)
+
+    @computed_field
+    @property
+    def avatar(self) -> Optional[str]:
+        """URL самого крупного превью аватара"""
+        if not self.avatar_hash:
+            return None
+        return avatar_url(self.avatar_hash, max(settings.AVATAR_SIZES))
+
+    @computed_field
+    @property
+    def avatar_urls(self) -> Optional[Dict[str, str]]:
+        """URL превью по размерам (для srcset)"""
+        return avatar_urls(self.avatar_hash) if self.avatar_hash else None
+
     class Config:
         from_attributes = True
 
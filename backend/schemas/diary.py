@@ -3,7 +3,7 @@ Pydantic схемы для дневника
 Согласно rules.md: schemas для request/response
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -35,6 +35,20 @@ class DiaryEntryResponse(DiaryEntryBase):
         from_attributes = True
 
 
+class DiaryEntrySummary(BaseModel):
+    """Краткая схема записи для списков (заголовок и превью без полного текста)"""
+    id: int
+    child_id: int
+    title: Optional[str] = None
+    preview: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
 
 
-
+class DiaryEntryPage(BaseModel):
+    """Страница записей дневника"""
+    items: List[DiaryEntrySummary] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
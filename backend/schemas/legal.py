@@ -7,8 +7,18 @@ from pydantic import BaseModel
 
 class LegalTextResponse(BaseModel):
     """Схема ответа с юридическим текстом"""
+    slug: str
     title: str
-    content: str
+    content: str  # Markdown
+    html: str
     last_updated: str
     version: str
+    sha256: str  # Хэш версии: на него ссылается согласие родителей
 
+
+class LegalVersionResponse(BaseModel):
+    """Схема версии юридического документа"""
+    version: str
+    last_updated: str
+    sha256: str
+    current: bool
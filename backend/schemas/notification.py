@@ -5,7 +5,7 @@ Pydantic схемы для уведомлений
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
-from models.notification import NotificationType, NotificationStatus
+from models.notification import NotificationType, NotificationStatus, DigestFrequency
 
 
 class NotificationResponse(BaseModel):
@@ -39,3 +39,12 @@ class NotificationCreate(BaseModel):
     subscription_id: Optional[int] = None
     meta_data: Optional[str] = None
 
+
+class NotificationSettingsResponse(BaseModel):
+    """Схема настроек уведомлений семьи"""
+    digest_frequency: DigestFrequency
+
+
+class NotificationSettingsUpdate(BaseModel):
+    """Схема обновления настроек уведомлений семьи"""
+    digest_frequency: DigestFrequency = Field(..., description="Сводка активности детей: hourly, daily или off")
@@ -37,15 +37,25 @@ class PiggyHistoryResponse(BaseModel):
 
 
 class PiggyResponse(BaseModel):
-    """Схема ответа с копилкой"""
+    """Схема ответа с копилкой (история - через /history)"""
     amount: Decimal = Field(default=0, ge=0)
     goal: Optional[PiggyGoalResponse] = None
-    history: List[PiggyHistoryResponse] = Field(default_factory=list)
     
     class Config:
         from_attributes = True
 
 
+class PiggyAddResponse(PiggyResponse):
+    """Схема ответа на пополнение копилки: баланс и новая запись истории"""
+    entry: PiggyHistoryResponse
+
+
+class PiggyHistoryPage(BaseModel):
+    """Страница истории копилки"""
+    items: List[PiggyHistoryResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
 class PiggyGoalUpdate(BaseModel):
     """Схема обновления цели"""
     name: Optional[str] = Field(None, min_length=1, max_length=200)
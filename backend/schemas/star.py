@@ -2,7 +2,8 @@
 Pydantic схемы для звёзд
 Согласно rules.md: schemas для request/response
 """
-from pydantic import BaseModel, Field
+import json
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -29,21 +30,43 @@ class StarStreakResponse(BaseModel):
     best: int = Field(default=0, ge=0)
     claimed_rewards: List[int] = Field(default_factory=list)
     
+    @field_validator("claimed_rewards", mode="before")
+    @classmethod
+    def parse_claimed_rewards(cls, value):
+        """В БД claimed_rewards хранится JSON-строкой (или NULL)"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return json.loads(value) if value else []
+        return value
+    
     class Config:
         from_attributes = True
 
 
 class StarResponse(BaseModel):
-    """Схема ответа со звёздами"""
+    """Схема ответа со звёздами (только счётчики, история - через /history)"""
     today: int = Field(default=0, ge=0)
     total: int = Field(default=0, ge=0)
-    history: List[StarHistoryResponse] = Field(default_factory=list)
     streak: Optional[StarStreakResponse] = None
     
     class Config:
         from_attributes = True
 
 
+class StarAddResponse(BaseModel):
+    """Схема ответа на добавление звёзд: счётчики и новая запись истории"""
+    star: StarResponse
+    entry: StarHistoryResponse
+    rewards: List[dict] = Field(default_factory=list)
+
+
+class StarHistoryPage(BaseModel):
+    """Страница истории звёзд"""
+    items: List[StarHistoryResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
 class StarAddRequest(BaseModel):
     """Схема добавления звёзд"""
     description: str = Field(..., min_length=1, max_length=200)
@@ -40,6 +40,9 @@ class ParentConsentRequest(BaseModel):
     """Схема запроса согласия родителей"""
     child_id: int
     consent_given: bool = Field(..., description="Согласие на обработку данных ребёнка")
+    document_hash: Optional[str] = Field(
+        None, pattern=r"^[0-9a-f]{64}$", description="sha256 показанной версии политики конфиденциальности"
+    )
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
 
@@ -51,6 +54,8 @@ class ParentConsentResponse(BaseModel):
     child_id: int
     consent_given: bool
     consent_date: Optional[datetime] = None
+    document_version: Optional[str] = None
+    document_hash: Optional[str] = None
     created_at: datetime
     
     class Config:
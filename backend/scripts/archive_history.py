@@ -0,0 +1,59 @@
+"""
+Архивация растущих таблиц по политике HISTORY_RETENTION_DAYS (services/archive_service.py)
+Использование: python3 backend/scripts/archive_history.py [--archive-dir /var/archive] [--partitions-only]
+  --partitions-only  только создать будущие месячные партиции
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from core.database import AsyncSessionLocal
+from services.archive_service import ArchiveService
+
+
+async def archive(archive_dir: str, partitions_only: bool) -> int:
+    """Прогон политики хранения; возвращает код выхода"""
+    async with AsyncSessionLocal() as session:
+        try:
+            service = ArchiveService(session, archive_dir)
+            if partitions_only:
+                report = {"partitions_created": await service.ensure_partitions()}
+            else:
+                report = await service.run()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Ошибка архивации: {e}")
+            import traceback
+            traceback.print_exc()
+            return 2
+
+    print(f"📅 Создано партиций: {len(report['partitions_created'])}")
+    for name in report["partitions_created"]:
+        print(f"  {name}")
+    for table in ("star_history", "notifications"):
+        for item in report.get(table, ()):
+            print(f"📦 {item['partition']}: {item['rows']} строк → {item['file'] or 'пустая'}")
+    if "piggy_history" in report:
+        print(f"🐷 Журнал копилки: выгружено и удалено {report['piggy_history']} строк")
+    if "refresh_tokens" in report:
+        print(f"🔑 Удалено refresh-токенов: {report['refresh_tokens']}")
+    print("✅ Архивация завершена")
+    return 0
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description="Архивация истории по политике хранения")
+    parser.add_argument("--archive-dir", help="каталог выгрузок (по умолчанию ARCHIVE_DIR)")
+    parser.add_argument("--partitions-only", action="store_true", help="только создать будущие партиции")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(archive(args.archive_dir, args.partitions_only)))
+
+
+if __name__ == "__main__":
+    main()
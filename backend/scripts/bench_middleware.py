@@ -0,0 +1,136 @@
+"""
+Бенчмарк накладных расходов CSRF middleware: BaseHTTPMiddleware (до) против чистого ASGI (после)
+Запросы идут в приложение in-process через httpx.ASGITransport, поэтому измеряется
+стек middleware и обработчик, без сети
+
+Использование:
+    python3 backend/scripts/bench_middleware.py [--requests 5000] [--concurrency 50]
+        [--path /health] [--path /api/stars/] [--user-id 1]
+
+Аутентифицированный GET (по умолчанию /api/stars/) требует БД с ребёнком у пользователя --user-id;
+без БД используйте только --path /health
+"""
+import argparse
+import asyncio
+import logging
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+from fastapi import HTTPException, Request, status
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+
+class LegacyCSRFMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация CSRFMiddleware (BaseHTTPMiddleware + линейный перебор exempt_paths) для сравнения"""
+
+    def __init__(self, app, exempt_paths: list = None):
+        super().__init__(app)
+        from core.middleware.csrf_middleware import DEFAULT_EXEMPT_PATHS
+        self.exempt_paths = exempt_paths or list(DEFAULT_EXEMPT_PATHS)
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(path) for path in self.exempt_paths):
+            return await call_next(request)
+        if request.method in ["GET", "HEAD", "OPTIONS"]:
+            return await call_next(request)
+        csrf_token_cookie = request.cookies.get("csrf_token") or secrets.token_urlsafe(32)
+        if csrf_token_cookie != request.headers.get("X-CSRF-Token"):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="CSRF token mismatch")
+        response = await call_next(request)
+        if "csrf_token" not in request.cookies:
+            response.set_cookie(
+                key="csrf_token", value=csrf_token_cookie, httponly=False,
+                secure=True, samesite="strict", max_age=3600
+            )
+        return response
+
+
+def use_csrf_class(app, csrf_cls) -> None:
+    """Подмена класса CSRF middleware в стеке приложения и пересборка стека"""
+    from core.middleware.csrf_middleware import CSRFMiddleware
+    app.user_middleware = [
+        Middleware(csrf_cls, **m.options) if m.cls in (CSRFMiddleware, LegacyCSRFMiddleware) else m
+        for m in app.user_middleware
+    ]
+    app.middleware_stack = None
+
+
+async def run_path(app, path: str, total: int, concurrency: int, headers: dict) -> dict:
+    """Прогон total GET-запросов с заданной конкурентностью"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost", headers=headers) as client:
+        # Прогрев (и проверка, что путь отвечает)
+        warmup = await client.get(path)
+        queue = iter(range(total))
+        statuses = {}
+
+        async def worker():
+            for _ in queue:
+                response = await client.get(path)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "warmup_status": warmup.status_code,
+        "statuses": statuses,
+        "rps": total / elapsed,
+        "mean_ms": elapsed / total * 1000 * concurrency,
+    }
+
+
+async def main_async(args) -> None:
+    import main
+    from core.middleware.csrf_middleware import CSRFMiddleware
+    from core.middleware.rate_limit import limiter
+    from core.security.jwt import create_access_token
+
+    token = create_access_token({"sub": str(args.user_id)})
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = args.path or ["/health", "/api/stars/"]
+    # Общий лимит (200/час) превратил бы замер в прогон 429-ответов
+    limiter.enabled = False
+
+    results = {}
+    for label, csrf_cls in (("before", LegacyCSRFMiddleware), ("after", CSRFMiddleware)):
+        use_csrf_class(main.app, csrf_cls)
+        for path in paths:
+            results[(label, path)] = await run_path(main.app, path, args.requests, args.concurrency, headers)
+
+    print(f"Запросов на путь: {args.requests}, конкурентность: {args.concurrency}")
+    print("=" * 72)
+    print(f"{'path':<24}{'before rps':>12}{'after rps':>12}{'speedup':>10}   statuses")
+    for path in paths:
+        before = results[("before", path)]
+        after = results[("after", path)]
+        print(
+            f"{path:<24}{before['rps']:>12.0f}{after['rps']:>12.0f}"
+            f"{after['rps'] / before['rps']:>9.2f}x   {after['statuses']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк CSRF middleware (до/после)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--path", action="append", help="путь для GET (можно несколько раз)")
+    parser.add_argument("--user-id", type=int, default=1, help="sub для access token")
+    args = parser.parse_args()
+    # Логи запросов искажают замер
+    logging.disable(logging.WARNING)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Микробенчмарк сериализации списочных ответов: стоимость на строку до и после core/responses.py
+- before: схемы из model_validate -> повторная валидация response_model (serialize_response FastAPI)
+  -> JSONResponse (stdlib json)
+- after: схемы из model_validate -> SchemaResponse (pydantic-core JSON + orjson, без второй валидации)
+Строки - объекты с атрибутами как у ORM-строк/проекций репозиториев; БД не нужна
+
+Использование:
+    python3 backend/scripts/bench_serialization.py [--rows 50] [--repeat 2000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from core.responses import SchemaResponse
+from models.child import Gender
+from models.task import TaskType
+from schemas.admin import AdminUserResponse
+from schemas.child import ChildResponse
+from schemas.diary import DiaryEntrySummary
+from schemas.piggy import PiggyHistoryResponse
+from schemas.star import StarHistoryResponse
+from schemas.task import TaskResponse
+from schemas.wishlist import WishlistItemResponse
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _at(i: int) -> datetime:
+    return NOW - timedelta(minutes=i)
+
+
+# Эндпоинт: (схема, фабрика строки)
+ENDPOINTS: Tuple[Tuple[str, type, Callable[[int], object]], ...] = (
+    ("GET /api/children", ChildResponse, lambda i: SimpleNamespace(
+        id=i, user_id=1, name=f"Ребёнок {i}", gender=Gender.GIRL, avatar_hash="ab" * 32,
+        created_at=_at(i), updated_at=None,
+    )),
+    ("GET /api/diary", DiaryEntrySummary, lambda i: SimpleNamespace(
+        id=i, child_id=1, title=f"Запись {i}", preview="Сегодня было " * 15, created_at=_at(i), updated_at=_at(i),
+    )),
+    ("GET /api/stars/history", StarHistoryResponse, lambda i: SimpleNamespace(
+        id=i, description="Задание выполнено", stars=i % 5, created_at=_at(i),
+    )),
+    ("GET /api/piggy/history", PiggyHistoryResponse, lambda i: SimpleNamespace(
+        id=i, type="add", amount=Decimal("12.50"), description="Обмен звёзд", created_at=_at(i),
+    )),
+    ("GET /api/tasks", TaskResponse, lambda i: SimpleNamespace(
+        id=i, child_id=1, text=f"Задача {i}", task_type=TaskType.CHECKLIST, status=None, stars=1,
+        position=i, completed=bool(i % 2), created_at=_at(i), updated_at=None,
+    )),
+    ("GET /api/wishlist", WishlistItemResponse, lambda i: SimpleNamespace(
+        id=i, child_id=1, name=f"Желание {i}", price=Decimal("990.00"), position=i, achieved=False,
+        created_at=_at(i), updated_at=None,
+    )),
+    ("GET /api/admin/users", AdminUserResponse, lambda i: SimpleNamespace(
+        id=i, name=f"Родитель {i}", phone=f"+7900000{i:04d}", email=None, role="parent", parent_id=None,
+        children_count=2, subscriptions_count=1, created_at=_at(i), updated_at=None,
+    )),
+)
+
+
+async def before(schema: type, rows: List[object], field) -> bytes:
+    items = [schema.model_validate(row) for row in rows]
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+async def after(schema: type, rows: List[object], field) -> bytes:
+    items = [schema.model_validate(row) for row in rows]
+    return SchemaResponse(items).body
+
+
+async def measure(func, schema: type, rows: List[object], field, repeat: int) -> float:
+    """Микросекунд на строку"""
+    for _ in range(max(repeat // 20, 1)):
+        await func(schema, rows, field)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func(schema, rows, field)
+    return (time.perf_counter() - started) / (repeat * len(rows)) * 1_000_000
+
+
+async def run(rows_count: int, repeat: int) -> int:
+    import json
+
+    print(f"Строк в ответе: {rows_count}, повторов: {repeat}")
+    print("=" * 72)
+    print(f"{'endpoint':<28}{'before µs/row':>15}{'after µs/row':>15}{'speedup':>10}")
+    mismatches = 0
+    for name, schema, factory in ENDPOINTS:
+        rows = [factory(i) for i in range(1, rows_count + 1)]
+        field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+        # Тела должны совпадать как JSON (числа Decimal - строками в обоих вариантах)
+        if json.loads(await before(schema, rows, field)) != json.loads(await after(schema, rows, field)):
+            mismatches += 1
+            print(f"❌ {name}: ответы до и после различаются")
+            continue
+        before_us = await measure(before, schema, rows, field, repeat)
+        after_us = await measure(after, schema, rows, field, repeat)
+        print(f"{name:<28}{before_us:>15.2f}{after_us:>15.2f}{before_us / after_us:>9.2f}x")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации списочных ответов (до/после)")
+    parser.add_argument("--rows", type=int, default=50, help="строк в ответе")
+    parser.add_argument("--repeat", type=int, default=2000, help="повторов на эндпоинт")
+    args = parser.parse_args()
+    return asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Проверка планов горячих запросов репозиториев на засеянных данных (EXPLAIN)
+Каждый метод репозитория выполняется как есть; его SELECT перехватывается событием движка
+и повторяется как EXPLAIN (FORMAT JSON) с теми же параметрами. Проверка проходит, если
+план читает таблицу через ожидаемый индекс и не содержит Seq Scan по ней
+(для секционированных таблиц - по каждой партиции с данными через её копию ожидаемого индекса;
+пустые будущие и почти пустые старые партиции планировщик справедливо читает Seq Scan целиком,
+они не проверяются - см. SMALL_PARTITION_PAGES)
+
+Данные: scripts/generate_synthetic_data.py (на пустых таблицах планировщик выбирает Seq Scan)
+
+Использование:
+    python3 backend/scripts/check_query_plans.py [--verbose]
+Код выхода 1, если хотя бы один запрос не использует индекс
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import AsyncSessionLocal, engine
+from models.task import TaskType
+from repositories.diary_repository import DiaryRepository
+from repositories.notification_repository import NotificationRepository
+from repositories.piggy_repository import PiggyRepository
+from repositories.refresh_token_repository import RefreshTokenRepository
+from repositories.star_repository import StarRepository
+from repositories.task_repository import TaskRepository
+from repositories.user_repository import UserRepository
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.local"
+
+# Партиция не больше стольких страниц читается Seq Scan дешевле индекса: план по ней не проверяется
+SMALL_PARTITION_PAGES = 8
+
+# Семья с наибольшей историей звёзд среди первых N детей: у неё заполнены все таблицы
+SAMPLE_SQL = """
+    SELECT c.id AS child_id, c.user_id, s.id AS star_id, p.id AS piggy_id
+    FROM (
+        SELECT c.id, c.user_id FROM children c JOIN users u ON u.id = c.user_id
+        WHERE u.email LIKE :pattern ORDER BY c.id LIMIT 1000
+    ) c
+    JOIN stars s ON s.child_id = c.id
+    JOIN piggies p ON p.child_id = c.id
+    ORDER BY s.total DESC, c.id
+    LIMIT 1
+"""
+
+
+@dataclass
+class PlanCheck:
+    """Запрос репозитория и индекс, которым он должен читать таблицу"""
+    name: str
+    table: str
+    index: str
+    call: Callable[[AsyncSession, Dict[str, int]], Awaitable[object]]
+
+
+CHECKS = (
+    PlanCheck(
+        "Задачи ребёнка по типу", "tasks", "ix_tasks_child_id_task_type_position_id",
+        lambda s, ids: TaskRepository(s).get_by_child_id(ids["child_id"], TaskType.CHECKLIST),
+    ),
+    PlanCheck(
+        "История звёзд (страница)", "star_history", "ix_star_history_star_id_created_at_id",
+        lambda s, ids: StarRepository(s).get_history_page(ids["star_id"], 20),
+    ),
+    PlanCheck(
+        "История копилки (страница)", "piggy_history", "ix_piggy_history_piggy_id_created_at_id",
+        lambda s, ids: PiggyRepository(s).get_history_page(ids["piggy_id"], 20),
+    ),
+    PlanCheck(
+        "Дневник (страница)", "diary_entries", "ix_diary_entries_child_id_created_at_id",
+        lambda s, ids: DiaryRepository(s).get_summary_page(ids["child_id"], 20),
+    ),
+    PlanCheck(
+        "Уведомления пользователя", "notifications", "ix_notifications_user_id_created_at",
+        lambda s, ids: NotificationRepository(s).get_by_user_id(ids["user_id"]),
+    ),
+    PlanCheck(
+        "Пользователи по роли (админка)", "users", "ix_users_role_created_at",
+        lambda s, ids: UserRepository(s).get_page(0, 50, "parent"),
+    ),
+    PlanCheck(
+        "Активные refresh-токены пользователя", "refresh_tokens", "ix_refresh_tokens_user_id_active",
+        lambda s, ids: RefreshTokenRepository(s).revoke_all_user_tokens(ids["user_id"]),
+    ),
+)
+
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+async def parent_names(session: AsyncSession, plan: dict) -> Dict[str, str]:
+    """Партиции и индексы партиций плана -> имена родительских таблиц и индексов"""
+    names = {
+        node.get(key) for node in plan_nodes(plan) for key in ("Relation Name", "Index Name")
+    } - {None}
+    result = await session.execute(
+        text(
+            "SELECT c.relname, p.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE c.relname = ANY(:names)"
+        ),
+        {"names": list(names)}
+    )
+    return dict(result.all())
+
+
+async def small_partitions(session: AsyncSession, parents: Dict[str, str]) -> Set[str]:
+    """Партиции плана размером не больше SMALL_PARTITION_PAGES страниц (в том числе пустые)"""
+    if not parents:
+        return set()
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relname = ANY(:names) AND c.relkind = 'r' "
+            "AND pg_relation_size(c.oid) <= :pages * current_setting('block_size')::int"
+        ),
+        {"names": list(parents), "pages": SMALL_PARTITION_PAGES}
+    )
+    return set(result.scalars().all())
+
+
+def check_plan(plan: dict, check: PlanCheck, parents: Dict[str, str], small: Set[str]) -> Optional[str]:
+    """Текст ошибки или None, если таблица (её партиции с данными) читается ожидаемым индексом"""
+    nodes = [
+        node for node in plan_nodes(plan)
+        if check.table in (node.get("Relation Name"), parents.get(node.get("Relation Name")))
+        and node.get("Relation Name") not in small
+    ]
+    if any(node["Node Type"] == "Seq Scan" for node in nodes):
+        return f"Seq Scan по {check.table}"
+    used = {parents.get(node.get("Index Name"), node.get("Index Name")) for node in nodes} - {None}
+    if check.index not in used:
+        return f"ожидался {check.index}, использовано: {', '.join(sorted(used)) or 'нет индексов'}"
+    return None
+
+
+async def explain_first_select(session: AsyncSession, check: PlanCheck, ids: Dict[str, int]) -> dict:
+    """Выполнение метода репозитория с перехватом SQL и EXPLAIN первого SELECT"""
+    captured: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await check.call(session, ids)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    statement, parameters = next(
+        (sql, params) for sql, params in captured if sql.lstrip().upper().startswith("SELECT")
+    )
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def run(verbose: bool) -> int:
+    async with AsyncSessionLocal() as session:
+        sample = (await session.execute(text(SAMPLE_SQL), {"pattern": f"%@{SYNTHETIC_EMAIL_DOMAIN}"})).first()
+        if sample is None:
+            print("❌ Нет синтетических данных: сначала выполните scripts/generate_synthetic_data.py")
+            return 1
+        ids = dict(sample._mapping)
+        print(f"Образец: {ids}")
+
+        failures = 0
+        try:
+            for check in CHECKS:
+                plan = await explain_first_select(session, check, ids)
+                parents = await parent_names(session, plan)
+                error = check_plan(plan, check, parents, await small_partitions(session, parents))
+                if error:
+                    failures += 1
+                    print(f"❌ {check.name}: {error}")
+                else:
+                    print(f"✅ {check.name}: {check.index}")
+                if verbose or error:
+                    print(json.dumps(plan, ensure_ascii=False, indent=2))
+        finally:
+            # revoke_all_user_tokens и прочие методы не должны менять данные
+            await session.rollback()
+
+    print(f"\nПроверено запросов: {len(CHECKS)}, без индекса: {failures}")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Проверка планов горячих запросов (EXPLAIN)")
+    parser.add_argument("--verbose", action="store_true", help="печатать планы всех запросов")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(run(args.verbose))
+    except Exception as e:
+        print(f"❌ Ошибка проверки: {e}")
+        import traceback
+        traceback.print_exc()
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,426 @@
+"""
+Генератор синтетических данных для проверки планов запросов и админ-дашбордов на объёмах продакшена
+Семьи (родитель с сессиями и уведомлениями, дети, согласие, PIN), задачи, звёзды с историей
+и сериями, копилка с журналом, дневник и дневная статистика. Загрузка через COPY (asyncpg copy_records_to_table) пачками семей
+
+Данные детерминированы по --seed и --anchor-date: одинаковые параметры дают одинаковые строки
+(кроме значений ID - они берутся из последовательностей таблиц)
+
+Использование:
+    python3 backend/scripts/generate_synthetic_data.py --families 1000000 [--seed 42] [--days 180]
+        [--batch 2000] [--anchor-date 2024-06-01] [--no-analyze]
+    python3 backend/scripts/generate_synthetic_data.py --drop
+
+Только для локальной/стендовой БД: диапазоны ID резервируются сдвигом последовательностей,
+параллельные вставки приложения в те же таблицы во время генерации не поддерживаются
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncpg
+
+from core.config import settings
+from core.security.password import hash_password
+from repositories.archive_repository import add_months, partition_name
+from services.archive_service import PARTITIONED_TABLES
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.local"
+SYNTHETIC_PASSWORD = "Synthetic-123"
+SYNTHETIC_PIN = "1234"
+
+# Обмен по умолчанию (models/settings.py: stars_to_money, money_per_stars)
+EXCHANGE_STARS = 15
+EXCHANGE_MONEY = Decimal("200.00")
+
+# Распределения
+CHILDREN_PER_FAMILY = ((1, 55), (2, 33), (3, 10), (4, 2))
+GENDERS = (("girl", 48), ("boy", 48), ("none", 4))
+STARS_PER_ENTRY = ((1, 40), (2, 25), (3, 20), (5, 10), (10, 5))
+NOTIFICATION_TYPES = (("SYSTEM", 50), ("SUBSCRIPTION", 35), ("CONSENT", 10), ("REFUND", 3), ("COMPLAINT", 2))
+NOTIFICATION_STATUSES = (("READ", 60), ("SENT", 35), ("FAILED", 5))
+
+FIRST_NAMES = (
+    "Алиса", "Маша", "Соня", "Ева", "Варя", "Полина", "Аня", "Вика",
+    "Миша", "Саша", "Артём", "Ваня", "Лёва", "Марк", "Тимур", "Егор",
+)
+TASK_TEXTS = (
+    "Почистить зубы", "Заправить кровать", "Сделать уроки", "Прочитать 10 страниц",
+    "Убрать игрушки", "Покормить кота", "Помыть посуду", "Сделать зарядку",
+    "Собрать портфель", "Полить цветы", "Вынести мусор", "Позаниматься музыкой",
+)
+STAR_REASONS = (
+    "Выполнена задача", "Помощь по дому", "Хорошая оценка", "Прочитана книга",
+    "Спортивная тренировка", "Доброе дело", "Серия дней",
+)
+DIARY_WORDS = (
+    "сегодня", "мы", "ходили", "в", "парк", "школу", "играли", "с", "друзьями", "мама",
+    "папа", "читали", "книгу", "было", "весело", "грустно", "интересно", "контрольная",
+    "рисовал", "рисовала", "бабушка", "кот", "собака", "гуляли", "снег", "дождь", "солнце",
+    "кружок", "танцы", "футбол", "плавание", "подарок", "день", "рождения", "каникулы",
+)
+
+# Порядок загрузки: родительские таблицы раньше дочерних
+COPY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("id", "name", "email", "phone", "password_hash", "role", "created_at"),
+    "refresh_tokens": ("user_id", "token_hash", "device_info", "issued_at", "revoked_at"),
+    "notifications": ("user_id", "type", "message", "status", "created_at"),
+    "children": ("id", "user_id", "name", "gender", "created_at"),
+    "parent_consents": ("user_id", "child_id", "consent_given", "consent_date", "created_at"),
+    "child_access": ("child_id", "pin_hash", "is_active", "failed_attempts", "created_at"),
+    "tasks": ("child_id", "text", "task_type", "status", "completed", "stars", "position", "created_at"),
+    "stars": ("id", "child_id", "today", "total", "created_at"),
+    "star_history": ("star_id", "description", "stars", "created_at"),
+    "star_streaks": ("star_id", "current", "last_date", "best", "created_at"),
+    "piggies": ("id", "child_id", "amount", "created_at"),
+    "piggy_history": ("piggy_id", "type", "amount", "description", "created_at"),
+    "diary_entries": ("child_id", "title", "content", "created_at"),
+    "weekly_stats": ("child_id", "date", "stars", "tasks_completed", "created_at"),
+}
+
+# Таблицы, ID которых нужны дочерним строкам до загрузки
+RESERVED_ID_TABLES = ("users", "children", "stars", "piggies")
+
+
+@dataclass
+class Batch:
+    """Строки одной пачки семей по таблицам"""
+    rows: Dict[str, List[tuple]] = field(default_factory=lambda: {table: [] for table in COPY_COLUMNS})
+
+
+def weighted(rng: random.Random, choices: Tuple[Tuple[object, int], ...]):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def at(day: date, rng: random.Random, start_hour: int = 7, end_hour: int = 22) -> datetime:
+    """Случайный момент дня в часы активности"""
+    seconds = rng.randrange(start_hour * 3600, end_hour * 3600)
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+
+class SyntheticGenerator:
+    """Генерация строк пачками; каждая пачка - свой ГПСЧ от (seed, номер пачки)"""
+
+    def __init__(self, seed: int, anchor: date, days: int, password_hash: str, pin_hash: str):
+        self.seed = seed
+        self.anchor = anchor
+        self.days = days
+        self.password_hash = password_hash
+        self.pin_hash = pin_hash
+
+    def plan(self, batch_index: int, families: range) -> Tuple[random.Random, List[int]]:
+        """Число детей в каждой семье пачки (нужно заранее для резервирования ID)"""
+        rng = random.Random(f"{self.seed}:{batch_index}")
+        return rng, [weighted(rng, CHILDREN_PER_FAMILY) for _ in families]
+
+    def generate(
+        self,
+        rng: random.Random,
+        families: range,
+        children_counts: List[int],
+        first_ids: Dict[str, int],
+    ) -> Batch:
+        batch = Batch()
+        user_id = first_ids["users"]
+        child_id = first_ids["children"]
+
+        for family_index, children_count in zip(families, children_counts):
+            # Рост базы: недавних регистраций больше, чем старых
+            signup_day = self.anchor - timedelta(days=int(self.days * 2 * rng.random() ** 2))
+            batch.rows["users"].append((
+                user_id,
+                f"Родитель {family_index}",
+                f"user{family_index}@{SYNTHETIC_EMAIL_DOMAIN}",
+                f"+7980{family_index:07d}",
+                self.password_hash,
+                "parent",
+                at(signup_day, rng),
+            ))
+            self._parent(batch, rng, family_index, user_id, signup_day)
+            for _ in range(children_count):
+                # ID звёзд и копилки совпадают со сдвигом ID ребёнка: по одной строке на ребёнка
+                offset = child_id - first_ids["children"]
+                self._child(
+                    batch, rng, user_id, child_id,
+                    first_ids["stars"] + offset, first_ids["piggies"] + offset, signup_day,
+                )
+                child_id += 1
+            user_id += 1
+        return batch
+
+    def _parent(self, batch: Batch, rng: random.Random, family_index: int, user_id: int, signup_day: date) -> None:
+        rows = batch.rows
+        # Сессии: ротация refresh-токенов оставляет отозванные, активна последняя на устройство
+        devices = weighted(rng, ((1, 60), (2, 30), (3, 10)))
+        for session_index in range(1 + int(rng.expovariate(1 / 8))):
+            issued_at = at(self.anchor - timedelta(days=rng.randrange(0, self.days)), rng)
+            active = session_index < devices
+            rows["refresh_tokens"].append((
+                user_id,
+                hashlib.sha256(f"synthetic:{self.seed}:{family_index}:{session_index}".encode()).hexdigest(),
+                "synthetic",
+                issued_at,
+                None if active else issued_at + timedelta(days=rng.randint(1, 30)),
+            ))
+        for _ in range(int(rng.expovariate(1 / 4))):
+            day = signup_day + timedelta(days=rng.randrange(0, max(1, (self.anchor - signup_day).days + 1)))
+            rows["notifications"].append((
+                user_id, weighted(rng, NOTIFICATION_TYPES), "Синтетическое уведомление",
+                weighted(rng, NOTIFICATION_STATUSES), at(day, rng),
+            ))
+
+    def _child(
+        self, batch: Batch, rng: random.Random, user_id: int, child_id: int,
+        star_id: int, piggy_id: int, signup_day: date,
+    ) -> None:
+        rows = batch.rows
+        created_day = signup_day + timedelta(days=rng.randrange(0, 3))
+        created_at = at(created_day, rng)
+        # Вовлечённость: большинство детей заходят редко, небольшой хвост - каждый день
+        engagement = rng.betavariate(1.5, 4)
+
+        rows["children"].append((child_id, user_id, rng.choice(FIRST_NAMES), weighted(rng, GENDERS), created_at))
+        if rng.random() < 0.97:
+            rows["parent_consents"].append((user_id, child_id, True, created_at, created_at))
+        rows["child_access"].append((
+            child_id, self.pin_hash if rng.random() < 0.6 else None, True, 0, created_at,
+        ))
+
+        task_count = min(40, 3 + int(rng.expovariate(1 / 6)))
+        for position in range(task_count):
+            kanban = rng.random() < 0.4
+            completed = rng.random() < engagement
+            status = (rng.choice(("TODO", "DOING", "DONE")) if kanban else None)
+            rows["tasks"].append((
+                child_id, rng.choice(TASK_TEXTS), "KANBAN" if kanban else "CHECKLIST",
+                status, completed, rng.randint(1, 3), position, created_at,
+            ))
+
+        # Активные дни от создания ребёнка (в пределах окна истории) до опорной даты
+        first_day = max(created_day, self.anchor - timedelta(days=self.days))
+        total = balance = 0
+        money = Decimal("0.00")
+        streak = best = 0
+        last_active: Optional[date] = None
+        day = first_day
+        while day <= self.anchor:
+            if rng.random() < engagement:
+                entries = min(10, 1 + int(rng.expovariate(1 / 2)))
+                earned = 0
+                for _ in range(entries):
+                    stars = weighted(rng, STARS_PER_ENTRY)
+                    earned += stars
+                    rows["star_history"].append((star_id, rng.choice(STAR_REASONS), stars, at(day, rng)))
+                total += earned
+                balance += earned
+                rows["weekly_stats"].append((
+                    child_id, day.isoformat(), earned, min(entries, task_count), at(day, rng, 20, 23),
+                ))
+
+                streak = streak + 1 if last_active == day - timedelta(days=1) else 1
+                best = max(best, streak)
+                last_active = day
+
+                # Обмен накопленных звёзд примерно раз в неделю
+                if balance >= EXCHANGE_STARS and rng.random() < 0.15:
+                    exchanges = balance // EXCHANGE_STARS
+                    credit = EXCHANGE_MONEY * exchanges
+                    balance -= exchanges * EXCHANGE_STARS
+                    money += credit
+                    rows["piggy_history"].append((
+                        piggy_id, "exchange", credit,
+                        f"Обмен {exchanges * EXCHANGE_STARS} ⭐ на виртуальную валюту", at(day, rng),
+                    ))
+                if money >= 100 and rng.random() < 0.02:
+                    amount = Decimal(rng.randrange(1, int(money) // 100 + 1) * 100)
+                    money -= amount
+                    rows["piggy_history"].append((piggy_id, "withdraw", amount, "Подарок", at(day, rng)))
+
+                if rng.random() < 0.25:
+                    words = [rng.choice(DIARY_WORDS) for _ in range(rng.randint(8, 60))]
+                    content = " ".join(words).capitalize() + "."
+                    title = " ".join(words[:3]).capitalize() if rng.random() < 0.5 else None
+                    rows["diary_entries"].append((child_id, title, content, at(day, rng, 19, 23)))
+            day += timedelta(days=1)
+
+        current = streak if last_active and (self.anchor - last_active).days <= 1 else 0
+        # stars.today - текущий баланс для обмена (EXCHANGE_STARS_SQL списывает из него)
+        rows["stars"].append((star_id, child_id, balance, total, created_at))
+        rows["star_streaks"].append((
+            star_id, current, last_active.isoformat() if last_active else None, best, created_at,
+        ))
+        # Кэш баланса копилки совпадает с журналом (сверка reconcile_piggy_ledger.py проходит)
+        rows["piggies"].append((piggy_id, child_id, money, created_at))
+
+
+async def reserve_ids(conn: asyncpg.Connection, table: str, count: int) -> int:
+    """Резервирование диапазона из count ID; возвращает первый ID диапазона"""
+    if count == 0:
+        return 0
+    last = await conn.fetchval(
+        "SELECT setval(pg_get_serial_sequence($1, 'id'), nextval(pg_get_serial_sequence($1, 'id')) + $2 - 1)",
+        table, count,
+    )
+    return last - count + 1
+
+
+async def ensure_partitions(conn: asyncpg.Connection, first: date, last: date) -> None:
+    """Месячные партиции на весь диапазон дат истории (миграция 010 создаёт их только от даты миграции)"""
+    month = first.replace(day=1)
+    while month <= last:
+        for table in PARTITIONED_TABLES:
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        month = add_months(month, 1)
+
+
+async def load_batch(conn: asyncpg.Connection, batch: Batch) -> int:
+    """COPY всех таблиц пачки в одной транзакции; возвращает число строк"""
+    loaded = 0
+    async with conn.transaction():
+        for table, columns in COPY_COLUMNS.items():
+            records = batch.rows[table]
+            if records:
+                await conn.copy_records_to_table(table, records=records, columns=columns)
+                loaded += len(records)
+    return loaded
+
+
+async def generate(args: argparse.Namespace) -> int:
+    anchor = args.anchor_date or date.today()
+    # bcrypt дорогой: один хеш пароля и PIN на все семьи
+    generator = SyntheticGenerator(
+        args.seed, anchor, args.days, hash_password(SYNTHETIC_PASSWORD), hash_password(SYNTHETIC_PIN)
+    )
+
+    conn = await asyncpg.connect(settings.DATABASE_URL.replace("+asyncpg", ""))
+    try:
+        existing = await conn.fetchval(
+            "SELECT count(*) FROM users WHERE email LIKE $1", f"%@{SYNTHETIC_EMAIL_DOMAIN}"
+        )
+        if existing:
+            print(f"❌ В БД уже есть {existing} синтетических семей, сначала выполните --drop")
+            return 1
+
+        # Уведомления - с даты регистрации (до 2 * days назад), день создания ребёнка +2
+        await ensure_partitions(conn, anchor - timedelta(days=args.days * 2), anchor + timedelta(days=2))
+
+        started = time.perf_counter()
+        totals: Dict[str, int] = {table: 0 for table in COPY_COLUMNS}
+        for batch_index, offset in enumerate(range(0, args.families, args.batch)):
+            families = range(offset, min(offset + args.batch, args.families))
+            rng, children_counts = generator.plan(batch_index, families)
+            children = sum(children_counts)
+            first_ids = {
+                "users": await reserve_ids(conn, "users", len(families)),
+                "children": await reserve_ids(conn, "children", children),
+                "stars": await reserve_ids(conn, "stars", children),
+                "piggies": await reserve_ids(conn, "piggies", children),
+            }
+            batch = generator.generate(rng, families, children_counts, first_ids)
+            loaded = await load_batch(conn, batch)
+            for table, records in batch.rows.items():
+                totals[table] += len(records)
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"  семьи {families.stop}/{args.families}: +{loaded} строк, "
+                f"{sum(totals.values()) / elapsed:,.0f} строк/с"
+            )
+
+        if args.analyze:
+            for table in COPY_COLUMNS:
+                await conn.execute(f"ANALYZE {table}")
+    finally:
+        await conn.close()
+
+    print(f"✅ Сгенерировано за {time.perf_counter() - started:.1f} с (опорная дата {anchor}, seed {args.seed}):")
+    for table, count in totals.items():
+        print(f"  {table:<16}{count:>12,}")
+    return 0
+
+
+async def drop() -> int:
+    """Удаление синтетических данных (по домену email родителя)"""
+    conn = await asyncpg.connect(settings.DATABASE_URL.replace("+asyncpg", ""))
+    try:
+        async with conn.transaction():
+            await conn.execute(
+                "CREATE TEMP TABLE synthetic_children ON COMMIT DROP AS "
+                "SELECT c.id, c.user_id FROM children c JOIN users u ON u.id = c.user_id WHERE u.email LIKE $1",
+                f"%@{SYNTHETIC_EMAIL_DOMAIN}",
+            )
+            statements = (
+                "DELETE FROM star_history WHERE star_id IN "
+                "(SELECT id FROM stars WHERE child_id IN (SELECT id FROM synthetic_children))",
+                "DELETE FROM star_streaks WHERE star_id IN "
+                "(SELECT id FROM stars WHERE child_id IN (SELECT id FROM synthetic_children))",
+                "DELETE FROM piggy_snapshots WHERE piggy_id IN "
+                "(SELECT id FROM piggies WHERE child_id IN (SELECT id FROM synthetic_children))",
+                "DELETE FROM piggy_history WHERE piggy_id IN "
+                "(SELECT id FROM piggies WHERE child_id IN (SELECT id FROM synthetic_children))",
+                "DELETE FROM piggy_goals WHERE piggy_id IN "
+                "(SELECT id FROM piggies WHERE child_id IN (SELECT id FROM synthetic_children))",
+                "DELETE FROM piggies WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM stars WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM tasks WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM diary_entries WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM weekly_stats WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM settings WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM child_access WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM parent_consents WHERE child_id IN (SELECT id FROM synthetic_children)",
+                "DELETE FROM children WHERE id IN (SELECT id FROM synthetic_children)",
+            )
+            for statement in statements:
+                await conn.execute(statement)
+            for table in ("refresh_tokens", "notifications"):
+                await conn.execute(
+                    f"DELETE FROM {table} WHERE user_id IN (SELECT id FROM users WHERE email LIKE $1)",
+                    f"%@{SYNTHETIC_EMAIL_DOMAIN}",
+                )
+            deleted = await conn.execute("DELETE FROM users WHERE email LIKE $1", f"%@{SYNTHETIC_EMAIL_DOMAIN}")
+    finally:
+        await conn.close()
+    print(f"✅ Удалено семей: {deleted.split()[-1]}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Генерация синтетических данных для проверки на масштабе")
+    parser.add_argument("--families", type=int, default=10000, help="число семей")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=180, help="глубина истории активности, дней")
+    parser.add_argument("--batch", type=int, default=2000, help="семей в одной транзакции COPY")
+    parser.add_argument(
+        "--anchor-date", type=date.fromisoformat, help="последний день истории (по умолчанию сегодня)"
+    )
+    parser.add_argument("--no-analyze", dest="analyze", action="store_false", help="не выполнять ANALYZE")
+    parser.add_argument("--drop", action="store_true", help="удалить синтетические данные")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(drop() if args.drop else generate(args))
+    except Exception as e:
+        print(f"❌ Ошибка генерации: {e}")
+        import traceback
+        traceback.print_exc()
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Сверка баланса копилок с журналом операций и создание контрольных точек
+Использование: python3 backend/scripts/reconcile_piggy_ledger.py [--fix] [--no-snapshots]
+  --fix           перезаписать piggies.amount значением из журнала
+  --no-snapshots  не создавать контрольные точки баланса
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем директорию backend в путь
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from core.database import AsyncSessionLocal
+from services.piggy_ledger_service import PiggyLedgerService
+
+
+async def reconcile(fix: bool, snapshot: bool) -> int:
+    """Сверка всех копилок; возвращает код выхода (1 - есть расхождения)"""
+    async with AsyncSessionLocal() as session:
+        try:
+            service = PiggyLedgerService(session)
+            report = await service.reconcile(fix=fix, snapshot=snapshot)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Ошибка при сверке копилок: {e}")
+            import traceback
+            traceback.print_exc()
+            return 2
+    
+    print(f"✅ Проверено копилок: {report['checked']}")
+    print(f"📸 Создано контрольных точек: {report['snapshots_created']}")
+    
+    if not report["drifts"]:
+        print("✅ Расхождений не найдено")
+        return 0
+    
+    print(f"⚠️  Расхождений: {report['drifted']}")
+    print("=" * 60)
+    for drift in report["drifts"]:
+        print(
+            f"piggy_id={drift['piggy_id']} child_id={drift['child_id']} "
+            f"кэш={drift['cached']} журнал={drift['ledger']} разница={drift['drift']}"
+        )
+    if fix:
+        print("\n🔧 Кэш баланса исправлен по журналу")
+    else:
+        print("\n💡 Для исправления запустите с флагом --fix")
+    return 1
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description="Сверка баланса копилок с журналом")
+    parser.add_argument("--fix", action="store_true", help="исправить piggies.amount по журналу")
+    parser.add_argument("--no-snapshots", action="store_true", help="не создавать контрольные точки")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(reconcile(args.fix, not args.no_snapshots)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Сервис архивации растущих таблиц по политике HISTORY_RETENTION_DAYS
+Согласно rules.md: бизнес-логика в services
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from repositories.archive_repository import ArchiveRepository, add_months, partition_month
+from repositories.refresh_token_repository import RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+# Таблицы с месячными партициями по created_at (миграция 010)
+PARTITIONED_TABLES = ("star_history", "notifications")
+
+
+class ArchiveService:
+    """
+    Сервис архивации
+    star_history, notifications: старые партиции выгружаются в ARCHIVE_DIR и отсоединяются целиком,
+    будущие создаются заранее; piggy_history: пачками удаляются строки, покрытые снимком баланса;
+    refresh_tokens: отозванные и истёкшие удаляются без выгрузки
+    Коммитит после каждой партиции и пачки, чтобы не держать блокировки на весь прогон
+    """
+
+    def __init__(self, session: AsyncSession, archive_dir: Optional[str] = None):
+        self.archive_repo = ArchiveRepository(session)
+        self.session = session
+        self.archive_dir = Path(archive_dir or settings.ARCHIVE_DIR)
+
+    async def ensure_partitions(self, today: Optional[date] = None) -> List[str]:
+        """Партиции с текущего месяца на PARTITIONS_AHEAD_MONTHS вперёд"""
+        current = (today or date.today()).replace(day=1)
+        created = []
+        for table in PARTITIONED_TABLES:
+            existing = set(await self.archive_repo.list_partitions(table))
+            for offset in range(settings.PARTITIONS_AHEAD_MONTHS + 1):
+                name = await self.archive_repo.create_partition(table, add_months(current, offset))
+                if name not in existing:
+                    created.append(name)
+        await self.session.commit()
+        return created
+
+    async def archive_partitions(self, table: str, retention_days: int, today: Optional[date] = None) -> List[dict]:
+        """Выгрузка и удаление партиций, целиком старше срока хранения"""
+        cutoff = (today or date.today()) - timedelta(days=retention_days)
+        archived = []
+        for partition in await self.archive_repo.list_partitions(table):
+            try:
+                month = partition_month(table, partition)
+            except ValueError:
+                logger.warning("Пропуск партиции с нестандартным именем: %s", partition)
+                continue
+            if add_months(month, 1) > cutoff:
+                continue
+
+            path = self.archive_dir / table / f"{partition}.csv.gz"
+            rows = await self.archive_repo.export_table(partition, path)
+            await self.archive_repo.detach_and_drop_partition(table, partition)
+            await self.session.commit()
+            logger.info("Партиция %s выгружена (%s строк) и удалена", partition, rows)
+            archived.append({"partition": partition, "rows": rows, "file": str(path) if rows else None})
+        return archived
+
+    async def prune_piggy_history(self, retention_days: int, batch_size: int = 5000) -> int:
+        """Удаление старых строк журнала копилки, уже учтённых в снимках баланса"""
+        before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        pruned = 0
+        batch = 0
+        while True:
+            path = self.archive_dir / "piggy_history" / f"{run}_{batch:04d}.csv.gz"
+            rows = await self.archive_repo.prune_piggy_history(before, batch_size, path)
+            await self.session.commit()
+            pruned += rows
+            batch += 1
+            if rows < batch_size:
+                break
+        if pruned:
+            logger.info("Журнал копилки: выгружено и удалено %s строк", pruned)
+        return pruned
+
+    async def run(self, today: Optional[date] = None) -> Dict[str, object]:
+        """Полный прогон политики хранения"""
+        retention = settings.HISTORY_RETENTION_DAYS
+        report: Dict[str, object] = {"partitions_created": await self.ensure_partitions(today)}
+        for table in PARTITIONED_TABLES:
+            if table in retention:
+                report[table] = await self.archive_partitions(table, retention[table], today)
+        if "piggy_history" in retention:
+            report["piggy_history"] = await self.prune_piggy_history(retention["piggy_history"])
+        if "refresh_tokens" in retention:
+            report["refresh_tokens"] = await RefreshTokenRepository(self.session).cleanup_expired_tokens(
+                retention["refresh_tokens"]
+            )
+            await self.session.commit()
+        return report
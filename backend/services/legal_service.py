@@ -0,0 +1,153 @@
+"""
+Юридические документы (пользовательское соглашение, политика конфиденциальности, условия подписки)
+Согласно требованиям: простые тексты с юридическими аспектами РФ
+
+Документы - версионированные файлы content/legal/<slug>/<version>.md (опубликованная версия не меняется,
+изменение - новый файл). Все версии читаются один раз: HTML, JSON-ответ, ETag и сжатые варианты
+готовятся заранее, запрос к документу не делает ни чтения файлов, ни рендеринга.
+sha256 исходного файла - идентификатор текста, на который ссылается согласие родителей
+"""
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from core.exceptions import NotFoundError, ValidationError
+from core.static_files import cached_response, compress_variants
+from core.utils.markdown import render_markdown
+from schemas.legal import LegalTextResponse
+
+logger = logging.getLogger(__name__)
+
+LEGAL_DIR = Path(__file__).resolve().parent.parent / "content" / "legal"
+# Документ, с которым родитель соглашается при согласии на обработку данных ребёнка (152-ФЗ)
+CONSENT_DOCUMENT = "privacy"
+
+# Текущая версия меняется только с деплоем: короткий кэш и ревалидация по ETag
+CURRENT_CACHE_CONTROL = "public, max-age=300"
+# Конкретная версия не меняется никогда
+VERSION_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass
+class LegalDocument:
+    """Версия документа в памяти"""
+    slug: str
+    version: str
+    title: str
+    published: date
+    content: str
+    html: str
+    sha256: str
+    body: bytes = b""
+    etag: str = ""
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def response(self, headers: Headers, cache_control: str) -> Response:
+        return cached_response(self.body, self.etag, self.variants, headers, "application/json", cache_control)
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+def _parse_front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """Метаданные между строками --- в начале файла и текст документа"""
+    if not text.startswith("---\n"):
+        return {}, text
+    header, _, content = text[4:].partition("\n---\n")
+    meta = {}
+    for line in header.splitlines():
+        key, _, value = line.partition(":")
+        meta[key.strip()] = value.strip()
+    return meta, content
+
+
+def load_document(path: Path) -> LegalDocument:
+    raw = path.read_bytes()
+    meta, content = _parse_front_matter(raw.decode("utf-8"))
+    content = content.strip()
+    document = LegalDocument(
+        slug=path.parent.name,
+        version=meta.get("version", path.stem),
+        title=meta["title"],
+        published=date.fromisoformat(meta["published"]),
+        content=content,
+        html=render_markdown(content),
+        sha256=hashlib.sha256(raw).hexdigest(),
+    )
+    if document.version != path.stem:
+        raise ValueError(f"{path}: версия {document.version} не совпадает с именем файла")
+    document.body = LegalTextResponse(
+        slug=document.slug,
+        title=document.title,
+        content=document.content,
+        html=document.html,
+        last_updated=document.published.strftime("%d.%m.%Y"),
+        version=document.version,
+        sha256=document.sha256,
+    ).model_dump_json().encode("utf-8")
+    document.etag = f'"{document.sha256[:32]}"'
+    document.variants = compress_variants(document.body)
+    return document
+
+
+class LegalLibrary:
+    """Все версии всех документов: slug -> версии по возрастанию"""
+
+    def __init__(self, directory: Path):
+        self.documents: Dict[str, List[LegalDocument]] = {}
+        for path in sorted(directory.glob("*/*.md")):
+            document = load_document(path)
+            self.documents.setdefault(document.slug, []).append(document)
+        for versions in self.documents.values():
+            versions.sort(key=lambda document: _version_key(document.version))
+        logger.info(
+            "Юридические документы загружены: %s",
+            ", ".join(f"{slug} {versions[-1].version}" for slug, versions in self.documents.items()) or "нет",
+        )
+
+    def versions(self, slug: str) -> List[LegalDocument]:
+        versions = self.documents.get(slug)
+        if not versions:
+            raise NotFoundError("Документ не найден")
+        return versions
+
+    def current(self, slug: str) -> LegalDocument:
+        return self.versions(slug)[-1]
+
+    def get(self, slug: str, version: str) -> LegalDocument:
+        for document in self.versions(slug):
+            if document.version == version:
+                return document
+        raise NotFoundError("Версия документа не найдена")
+
+    def by_hash(self, slug: str, sha256: str) -> Optional[LegalDocument]:
+        for document in self.versions(slug):
+            if document.sha256 == sha256:
+                return document
+        return None
+
+    def consent_document(self, sha256: Optional[str] = None) -> LegalDocument:
+        """
+        Версия документа для записи согласия: та, что показана родителю (по sha256), иначе текущая
+        Неизвестный хэш - ошибка: согласие не может ссылаться на текст, которого не было
+        """
+        if sha256 is None:
+            return self.current(CONSENT_DOCUMENT)
+        document = self.by_hash(CONSENT_DOCUMENT, sha256)
+        if document is None:
+            raise ValidationError("Неизвестная версия документа")
+        return document
+
+
+@lru_cache(maxsize=None)
+def get_legal_library() -> LegalLibrary:
+    """Библиотека документов (загружается один раз на процесс, при старте приложения)"""
+    return LegalLibrary(LEGAL_DIR)
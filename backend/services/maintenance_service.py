@@ -0,0 +1,94 @@
+"""
+Сервис задач обслуживания (выполняются планировщиком core/scheduler.py)
+Согласно rules.md: бизнес-логика в services
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.scheduler import Job
+from repositories.child_access_repository import ChildAccessRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.star_repository import StarRepository
+from repositories.weekly_stats_repository import WeeklyStatsRepository
+from services.archive_service import ArchiveService
+from services.notification_digest import DigestService
+from services.piggy_ledger_service import PiggyLedgerService
+
+
+class MaintenanceService:
+    """Сервис задач обслуживания: каждая задача - набор множественных UPDATE/INSERT, без загрузки строк"""
+
+    def __init__(self, session: AsyncSession):
+        self.star_repo = StarRepository(session)
+        self.access_repo = ChildAccessRepository(session)
+        self.stats_repo = WeeklyStatsRepository(session)
+        self.idempotency_repo = IdempotencyRepository(session)
+        self.session = session
+
+    async def expire_streaks(self, today: Optional[date] = None) -> dict:
+        """Обнуление серий, прерванных вчера (check_streak делает то же лениво, но только при заходе ребёнка)"""
+        yesterday = (today or date.today()) - timedelta(days=1)
+        return {"expired": await self.star_repo.expire_streaks(yesterday.isoformat())}
+
+    async def rollup_daily_stats(self, today: Optional[date] = None) -> dict:
+        """Итоги вчерашнего дня в weekly_stats по журналу звёзд"""
+        day = (today or date.today()) - timedelta(days=1)
+        updated, inserted = await self.stats_repo.rollup_day(day)
+        return {"day": day.isoformat(), "updated": updated, "inserted": inserted}
+
+    async def expire_qr_tokens(self) -> dict:
+        """Удаление QR-токенов с истёкшим сроком действия"""
+        return {"expired": await self.access_repo.expire_qr_tokens()}
+
+    async def purge_idempotency_keys(self) -> dict:
+        """Удаление истёкших ключей Idempotency-Key (хранилище postgres; в Redis ключи истекают сами)"""
+        return {"purged": await self.idempotency_repo.purge_expired()}
+
+
+def maintenance_jobs() -> List[Job]:
+    """Задачи планировщика (расписания переопределяются через SCHEDULER_SCHEDULES)"""
+    return [
+        Job(
+            "streak_expiry", "5 0 * * *",
+            lambda session: MaintenanceService(session).expire_streaks(),
+            "Обнуление прерванных серий дней",
+        ),
+        Job(
+            "daily_stats_rollup", "15 0 * * *",
+            lambda session: MaintenanceService(session).rollup_daily_stats(),
+            "Итоги вчерашнего дня в weekly_stats",
+        ),
+        Job(
+            "qr_token_expiry", "*/30 * * * *",
+            lambda session: MaintenanceService(session).expire_qr_tokens(),
+            "Удаление истёкших QR-токенов",
+        ),
+        Job(
+            "idempotency_key_purge", "20 * * * *",
+            lambda session: MaintenanceService(session).purge_idempotency_keys(),
+            "Удаление истёкших ключей Idempotency-Key",
+        ),
+        Job(
+            "notification_digest", "*/5 * * * *",
+            lambda session: DigestService(session).flush(),
+            "Сводки активности детей для родителей",
+        ),
+        Job(
+            "piggy_reconcile", "0 2 * * *",
+            _reconcile_piggies,
+            "Сверка копилок с журналом и снимки баланса",
+        ),
+        Job(
+            "history_archive", "30 3 * * *",
+            lambda session: ArchiveService(session).run(),
+            "Партиции, архивация истории и очистка refresh-токенов",
+        ),
+    ]
+
+
+async def _reconcile_piggies(session: AsyncSession) -> dict:
+    # Без исправления: расхождения только в отчёте (исправление - scripts/reconcile_piggy_ledger.py --fix)
+    report = await PiggyLedgerService(session).reconcile(fix=False, snapshot=True)
+    return {key: report[key] for key in ("checked", "drifted", "snapshots_created")}
@@ -0,0 +1,153 @@
+"""
+Сервис медиа: аватары детей
+Согласно rules.md: бизнес-логика в services
+
+Загрузка читается потоком во временный файл (не больше MAX_UPLOAD_SIZE), адрес - sha256 содержимого:
+одинаковые изображения обрабатываются и хранятся один раз. Превью AVATAR_SIZES в WebP
+строятся в пуле процессов: декодирование изображения не блокирует event loop
+"""
+import asyncio
+import hashlib
+import logging
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Optional, Sequence
+
+from PIL import Image, ImageOps
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.exceptions import NotFoundError, PayloadTooLargeError, ValidationError
+from core.utils.media import avatar_dir, avatar_path
+from models.child import Child
+from repositories.child_repository import ChildRepository
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = frozenset({"JPEG", "PNG", "WEBP", "GIF"})
+WEBP_QUALITY = 85
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def render_avatar(source: str, target: str, sizes: Sequence[int], max_pixels: int) -> None:
+    """
+    Квадратные превью WebP из source в каталог target (выполняется в процессе пула)
+    Варианты пишутся во временный каталог и переименовываются целиком: каталог target
+    либо отсутствует, либо содержит все размеры
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    target_dir = Path(target)
+    staging = target_dir.with_name(f".{target_dir.name}.{uuid.uuid4().hex}")
+    staging.mkdir(parents=True)
+    try:
+        with Image.open(source) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise ValueError(f"Формат {image.format} не поддерживается")
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            for size in sizes:
+                thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+                thumbnail.save(staging / f"{size}.webp", "WEBP", quality=WEBP_QUALITY)
+        try:
+            staging.rename(target_dir)
+        except OSError:
+            # Параллельная загрузка того же файла успела раньше - её результат идентичен
+            if not target_dir.exists():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Пул процессов обработки изображений (создаётся при первой загрузке)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.MEDIA_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Остановка пула (lifespan в main.py)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def avatar_exists(digest: str) -> bool:
+    return all(avatar_path(digest, size).exists() for size in settings.AVATAR_SIZES)
+
+
+def _render_args(source: Path, digest: str) -> tuple:
+    return str(source), str(avatar_dir(digest)), tuple(settings.AVATAR_SIZES), settings.AVATAR_MAX_PIXELS
+
+
+def _temp_path() -> Path:
+    temp_dir = Path(settings.UPLOAD_DIR) / "tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return temp_dir / uuid.uuid4().hex
+
+
+class MediaService:
+    """Сервис аватаров детей"""
+
+    def __init__(self, session: AsyncSession):
+        self.child_repo = ChildRepository(session)
+
+    async def store_avatar(self, chunks: AsyncIterator[bytes], content_length: Optional[int] = None) -> str:
+        """Сохранение загрузки из потока; возвращает sha256 содержимого"""
+        limit = settings.MAX_UPLOAD_SIZE
+        if content_length is not None and content_length > limit:
+            raise PayloadTooLargeError(f"Размер файла больше {limit // (1024 * 1024)} МБ")
+
+        source = _temp_path()
+        digest = hashlib.sha256()
+        received = 0
+        try:
+            with open(source, "wb") as file:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    if received > limit:
+                        raise PayloadTooLargeError(f"Размер файла больше {limit // (1024 * 1024)} МБ")
+                    digest.update(chunk)
+                    await asyncio.to_thread(file.write, chunk)
+            if not received:
+                raise ValidationError("Пустой файл")
+
+            key = digest.hexdigest()
+            if avatar_exists(key):
+                return key
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(get_executor(), render_avatar, *_render_args(source, key))
+            except (ValueError, OSError, Image.DecompressionBombError) as e:
+                logger.info("Отклонено изображение аватара: %s", e)
+                raise ValidationError("Файл не является поддерживаемым изображением (JPEG, PNG, WebP, GIF)")
+            return key
+        finally:
+            await asyncio.to_thread(source.unlink, missing_ok=True)
+
+    async def set_child_avatar(
+        self, child_id: int, user_id: int, chunks: AsyncIterator[bytes], content_length: Optional[int] = None
+    ) -> Child:
+        """Загрузка аватара ребёнка родителем"""
+        child = await self._get_own_child(child_id, user_id)
+        digest = await self.store_avatar(chunks, content_length)
+        return await self.child_repo.update(child, {"avatar_hash": digest})
+
+    async def remove_child_avatar(self, child_id: int, user_id: int) -> Child:
+        """
+        Сброс аватара ребёнка
+        Файлы остаются: по адресу содержимого на них могут ссылаться другие дети
+        """
+        child = await self._get_own_child(child_id, user_id)
+        return await self.child_repo.update(child, {"avatar_hash": None})
+
+    async def _get_own_child(self, child_id: int, user_id: int) -> Child:
+        child = await self.child_repo.get_by_id(child_id)
+        if not child or child.user_id != user_id:
+            raise NotFoundError("Ребёнок не найден")
+        return child
@@ -0,0 +1,126 @@
+"""
+Каналы доставки уведомлений (services/notification_delivery.py)
+- log: запись в лог приложения (по умолчанию: внешних каналов пока нет)
+- file: строка JSON Lines в NOTIFICATION_FILE_PATH (тесты, локальная разработка)
+- smtp: письмо на email пользователя (для тестов - локальный SMTP-сервер, например MailHog)
+Канал выбирается NOTIFICATION_CHANNEL; новый канал - подкласс NotificationChannel в CHANNELS
+"""
+import asyncio
+import json
+import logging
+import smtplib
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, Optional, Type
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """Ошибка доставки: попытка будет повторена"""
+
+
+class PermanentDeliveryError(DeliveryError):
+    """Доставка невозможна (нет адреса и т.п.): без повторов"""
+
+
+@dataclass
+class OutgoingNotification:
+    """Уведомление для канала (без ORM-объекта: канал не трогает сессию)"""
+    id: int
+    user_id: int
+    email: Optional[str]
+    type: str
+    message: str
+    metadata: Optional[dict]
+    created_at: datetime
+    attempt: int
+
+
+class NotificationChannel:
+    """Канал доставки: deliver() завершается без ошибки - уведомление доставлено"""
+    name = "base"
+
+    async def deliver(self, notification: OutgoingNotification) -> None:
+        raise NotImplementedError
+
+
+class LogChannel(NotificationChannel):
+    name = "log"
+
+    async def deliver(self, notification: OutgoingNotification) -> None:
+        logger.info(
+            "Уведомление %s для пользователя %s (%s): %s",
+            notification.id, notification.user_id, notification.type, notification.message,
+        )
+
+
+class FileChannel(NotificationChannel):
+    """Дописывает уведомления в файл JSON Lines"""
+    name = "file"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.NOTIFICATION_FILE_PATH)
+        self._lock = asyncio.Lock()
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    async def deliver(self, notification: OutgoingNotification) -> None:
+        line = json.dumps({
+            "id": notification.id,
+            "user_id": notification.user_id,
+            "type": notification.type,
+            "message": notification.message,
+            "metadata": notification.metadata,
+            "created_at": notification.created_at.isoformat(),
+            "attempt": notification.attempt,
+        }, ensure_ascii=False)
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._append, line)
+            except OSError as e:
+                raise DeliveryError(f"Запись в {self.path}: {e}") from e
+
+
+class SMTPChannel(NotificationChannel):
+    """Письмо через SMTP_HOST:SMTP_PORT (smtplib в потоке: не блокирует event loop)"""
+    name = "smtp"
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) as smtp:
+            smtp.send_message(message)
+
+    async def deliver(self, notification: OutgoingNotification) -> None:
+        if not notification.email:
+            raise PermanentDeliveryError("У пользователя нет email")
+        message = EmailMessage()
+        message["From"] = settings.SMTP_FROM
+        message["To"] = notification.email
+        message["Subject"] = "Дневник успеха: уведомление"
+        message.set_content(notification.message)
+        try:
+            await asyncio.to_thread(self._send, message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentDeliveryError(f"Адрес отклонён: {notification.email}") from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f"SMTP: {e}") from e
+
+
+CHANNELS: Dict[str, Type[NotificationChannel]] = {
+    channel.name: channel for channel in (LogChannel, FileChannel, SMTPChannel)
+}
+
+
+def get_channel(name: Optional[str] = None) -> NotificationChannel:
+    """Канал по имени (по умолчанию NOTIFICATION_CHANNEL)"""
+    name = name or settings.NOTIFICATION_CHANNEL
+    if name not in CHANNELS:
+        raise ValueError(f"Неизвестный канал уведомлений: {name}")
+    return CHANNELS[name]()
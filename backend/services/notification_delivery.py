@@ -0,0 +1,166 @@
+"""
+Доставка уведомлений из outbox (таблица notifications)
+Согласно rules.md: бизнес-логика в services
+
+Запрос только вставляет строку PENDING в своей транзакции (NotificationService.send_notification):
+уведомление появляется в очереди тогда и только тогда, когда закоммичено действие, и время
+запроса не включает доставку. Воркеры (NOTIFICATION_WORKERS asyncio-задач на процесс) арендуют
+пачки коротким UPDATE (FOR UPDATE SKIP LOCKED, attempts + 1, next_attempt_at = now() +
+NOTIFICATION_LEASE_SECONDS) и сразу коммитят: несколько воркеров и процессов не берут одну строку,
+а на время вызовов каналов не держатся ни блокировки, ни открытая транзакция.
+Итог каждой строки пишется своей короткой транзакцией; при падении воркера строки снова
+доступны по истечении аренды (доставка "хотя бы один раз").
+Ошибка канала - повтор через NOTIFICATION_RETRY_BASE_SECONDS * 2^(попытка - 1) (не больше
+NOTIFICATION_RETRY_MAX_SECONDS), после NOTIFICATION_MAX_ATTEMPTS попыток - FAILED.
+Запуск и остановка - lifespan в main.py
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.metrics import (
+    NOTIFICATION_BACKLOG,
+    NOTIFICATION_DELIVERY_ATTEMPTS,
+    NOTIFICATION_DELIVERY_LATENCY,
+    NOTIFICATION_OLDEST_PENDING_AGE,
+)
+from models.notification import NotificationStatus
+from repositories.notification_repository import NotificationRepository
+from services.notification_channels import (
+    NotificationChannel,
+    OutgoingNotification,
+    PermanentDeliveryError,
+    get_channel,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKLOG_REFRESH_SECONDS = 15  # Как часто процесс пересчитывает метрики очереди
+
+
+def retry_delay(attempt: int) -> timedelta:
+    """Задержка перед следующей попыткой (экспоненциальная, со случайным разбросом ±20%)"""
+    seconds = min(
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempt - 1),
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+    )
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+class NotificationDispatcher:
+    """Пул воркеров доставки: по asyncio-задаче на воркер"""
+
+    def __init__(
+        self,
+        channel: Optional[NotificationChannel] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.channel = channel or get_channel()
+        self.workers = settings.NOTIFICATION_WORKERS if workers is None else workers
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self._tasks: List[asyncio.Task] = []
+        self._backlog_refreshed = 0.0
+
+    def start(self) -> None:
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"notifications:{index}"))
+        logger.info("Доставка уведомлений запущена: %s воркеров, канал %s", self.workers, self.channel.name)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await self.deliver_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Ошибки каналов обрабатываются в _deliver; здесь - недоступность БД и т.п.
+                logger.exception("Доставка уведомлений: не удалось обработать пачку")
+                claimed = 0
+            if claimed < self.batch_size:
+                # Очередь разобрана: пауза (с разбросом, чтобы воркеры не опрашивали БД разом)
+                await self._refresh_backlog()
+                await asyncio.sleep(settings.NOTIFICATION_POLL_INTERVAL * random.uniform(0.5, 1.5))
+
+    async def deliver_batch(self) -> int:
+        """Доставка одной пачки; возвращает число взятых уведомлений"""
+        async with AsyncSessionLocal() as session:
+            repo = NotificationRepository(session)
+            claimed = await repo.claim_due(self.batch_size, settings.NOTIFICATION_LEASE_SECONDS)
+            emails = await repo.get_recipient_emails([row.user_id for row in claimed])
+            await session.commit()
+        for row in claimed:
+            values = await self._deliver(row, emails.get(row.user_id))
+            try:
+                async with AsyncSessionLocal() as session:
+                    await NotificationRepository(session).finish_attempt(
+                        row.id, row.created_at, row.attempts, **values
+                    )
+                    await session.commit()
+            except Exception:
+                # Итог не записан: уведомление повторится по истечении аренды
+                logger.exception("Доставка уведомлений: итог для %s не сохранён", row.id)
+        return len(claimed)
+
+    async def _deliver(self, row, email: Optional[str]) -> dict:
+        """Вызов канала вне транзакции; возвращает значения для записи итога"""
+        attempt = row.attempts
+        outgoing = OutgoingNotification(
+            id=row.id,
+            user_id=row.user_id,
+            email=email,
+            type=row.type.value,
+            message=row.message,
+            metadata=json.loads(row.meta_data) if row.meta_data else None,
+            created_at=row.created_at,
+            attempt=attempt,
+        )
+        try:
+            await self.channel.deliver(outgoing)
+        except Exception as e:
+            values = {"last_error": f"{type(e).__name__}: {e}"}
+            if isinstance(e, PermanentDeliveryError) or attempt >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                values["status"] = NotificationStatus.FAILED
+                result = "failed"
+                logger.warning("Уведомление %s не доставлено (попытка %s): %s", row.id, attempt, e)
+            else:
+                values["next_attempt_at"] = datetime.now(timezone.utc) + retry_delay(attempt)
+                result = "retry"
+            NOTIFICATION_DELIVERY_ATTEMPTS.labels(self.channel.name, result).inc()
+            return values
+
+        sent_at = datetime.now(timezone.utc)
+        NOTIFICATION_DELIVERY_ATTEMPTS.labels(self.channel.name, "sent").inc()
+        NOTIFICATION_DELIVERY_LATENCY.labels(self.channel.name).observe(
+            max((sent_at - row.created_at).total_seconds(), 0)
+        )
+        return {"status": NotificationStatus.SENT, "sent_at": sent_at, "last_error": None}
+
+    async def _refresh_backlog(self) -> None:
+        """Размер очереди и возраст старейшего уведомления (не чаще раза в BACKLOG_REFRESH_SECONDS)"""
+        now = time.monotonic()
+        if now - self._backlog_refreshed < BACKLOG_REFRESH_SECONDS:
+            return
+        self._backlog_refreshed = now
+        try:
+            async with AsyncSessionLocal() as session:
+                count, oldest = await NotificationRepository(session).get_backlog()
+        except Exception:
+            logger.debug("Метрики очереди уведомлений не обновлены", exc_info=True)
+            return
+        NOTIFICATION_BACKLOG.set(count)
+        NOTIFICATION_OLDEST_PENDING_AGE.set(
+            (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0
+        )
@@ -0,0 +1,211 @@
+"""
+Сводки активности детей для родителей
+Согласно rules.md: бизнес-логика в services
+
+События (выполнена задача, достигнута цель) не пишутся в notifications по одному: запрос кладёт
+событие в буфер родителя (память процесса или Redis - NOTIFICATION_DIGEST_BACKEND), без обращения к БД.
+Задача планировщика notification_digest превращает накопленное в одно уведомление DIGEST на родителя,
+когда с первого события в буфере прошёл период семьи (family_rules.digest_frequency: час или сутки).
+При "off" события отбрасываются. Доставка сводки - как у любого уведомления (outbox)
+Сводка каждого родителя коммитится отдельно; если запись не удалась, забранные события
+возвращаются в буфер и попадут в сводку при следующем запуске
+"""
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.child import Child
+from models.notification import DigestFrequency, NotificationType
+from repositories.family_rules_repository import FamilyRulesRepository
+from services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+TASK_DONE = "task_done"
+GOAL_REACHED = "goal_reached"
+
+PERIOD_SECONDS = {
+    DigestFrequency.HOURLY: 60 * 60,
+    DigestFrequency.DAILY: 24 * 60 * 60,
+}
+PERIOD_TITLES = {
+    DigestFrequency.HOURLY: "за час",
+    DigestFrequency.DAILY: "за день",
+}
+
+
+class MemoryDigestBuffer:
+    """Буфер событий в памяти процесса (один воркер: планировщик видит только свой процесс)"""
+
+    def __init__(self):
+        self._events: Dict[int, List[dict]] = {}
+        self._since: Dict[int, float] = {}
+
+    async def add(self, parent_id: int, event: dict) -> None:
+        events = self._events.setdefault(parent_id, [])
+        events.append(event)
+        del events[:-settings.NOTIFICATION_DIGEST_MAX_EVENTS]
+        self._since.setdefault(parent_id, time.time())
+
+    async def pending(self) -> Dict[int, float]:
+        """Родители с событиями: время первого события в буфере (Unix)"""
+        return dict(self._since)
+
+    async def take(self, parent_id: int) -> List[dict]:
+        self._since.pop(parent_id, None)
+        return self._events.pop(parent_id, [])
+
+    async def put_back(self, parent_id: int, events: List[dict], since: float) -> None:
+        """Возврат забранных событий перед новыми (сводка не записана)"""
+        merged = events + self._events.get(parent_id, [])
+        self._events[parent_id] = merged[-settings.NOTIFICATION_DIGEST_MAX_EVENTS:]
+        self._since[parent_id] = min(since, self._since.get(parent_id, since))
+
+
+class RedisDigestBuffer:
+    """Буфер событий в Redis: список на родителя + sorted set родителей по времени первого события"""
+
+    PARENTS_KEY = "digest:parents"
+
+    def __init__(self, redis_url: str = None):
+        import redis.asyncio as aioredis
+        self.redis = aioredis.from_url(redis_url or settings.REDIS_URL)
+
+    @staticmethod
+    def _events_key(parent_id: int) -> str:
+        return f"digest:events:{parent_id}"
+
+    async def add(self, parent_id: int, event: dict) -> None:
+        key = self._events_key(parent_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(event, ensure_ascii=False))
+            pipe.ltrim(key, -settings.NOTIFICATION_DIGEST_MAX_EVENTS, -1)
+            pipe.zadd(self.PARENTS_KEY, {str(parent_id): time.time()}, nx=True)
+            await pipe.execute()
+
+    async def pending(self) -> Dict[int, float]:
+        members = await self.redis.zrange(self.PARENTS_KEY, 0, -1, withscores=True)
+        return {int(member): score for member, score in members}
+
+    async def take(self, parent_id: int) -> List[dict]:
+        key = self._events_key(parent_id)
+        # MULTI: событие, добавленное между чтением и удалением, не теряется
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrange(key, 0, -1)
+            pipe.delete(key)
+            pipe.zrem(self.PARENTS_KEY, str(parent_id))
+            raw_events, _, _ = await pipe.execute()
+        return [json.loads(raw) for raw in raw_events]
+
+    async def put_back(self, parent_id: int, events: List[dict], since: float) -> None:
+        key = self._events_key(parent_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, *[json.dumps(event, ensure_ascii=False) for event in reversed(events)])
+            pipe.ltrim(key, -settings.NOTIFICATION_DIGEST_MAX_EVENTS, -1)
+            pipe.zadd(self.PARENTS_KEY, {str(parent_id): since}, lt=True)
+            await pipe.execute()
+
+
+_buffer = None
+
+
+def get_digest_buffer():
+    """Буфер по настройке NOTIFICATION_DIGEST_BACKEND (один на процесс)"""
+    global _buffer
+    if _buffer is None:
+        _buffer = RedisDigestBuffer() if settings.NOTIFICATION_DIGEST_BACKEND == "redis" else MemoryDigestBuffer()
+    return _buffer
+
+
+async def record_activity(child: Child, kind: str, title: str) -> None:
+    """Событие активности ребёнка в сводку его родителя (ошибка буфера не ломает запрос)"""
+    event = {
+        "kind": kind,
+        "child_id": child.id,
+        "child_name": child.name,
+        "title": title,
+        "at": datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        await get_digest_buffer().add(child.user_id, event)
+    except Exception:
+        logger.warning("Событие для сводки родителя %s не сохранено", child.user_id, exc_info=True)
+
+
+def build_digest_message(events: List[dict], frequency: DigestFrequency) -> str:
+    """Текст сводки: строка на ребёнка"""
+    by_child: Dict[int, dict] = defaultdict(lambda: {"name": "", "tasks": 0, "goals": []})
+    for event in events:
+        child = by_child[event["child_id"]]
+        child["name"] = event["child_name"]
+        if event["kind"] == TASK_DONE:
+            child["tasks"] += 1
+        elif event["kind"] == GOAL_REACHED:
+            child["goals"].append(f"«{event['title']}»")
+
+    lines = [f"Успехи детей {PERIOD_TITLES[frequency]}:"]
+    for child in by_child.values():
+        parts = []
+        if child["tasks"]:
+            parts.append(f"выполнено задач - {child['tasks']}")
+        if child["goals"]:
+            parts.append(f"достигнуты цели: {', '.join(child['goals'])}")
+        lines.append(f"{child['name']}: {'; '.join(parts)}")
+    return "\n".join(lines)
+
+
+class DigestService:
+    """Формирование сводок из буфера (задача планировщика notification_digest)"""
+
+    def __init__(self, session: AsyncSession, buffer=None):
+        self.rules_repo = FamilyRulesRepository(session)
+        self.notification_service = NotificationService(session)
+        self.buffer = buffer or get_digest_buffer()
+        self.session = session
+
+    async def flush(self, now: Optional[float] = None) -> dict:
+        """Сводки для родителей, у которых истёк период; возвращает счётчики для last_result"""
+        now = now or time.time()
+        pending = await self.buffer.pending()
+        if not pending:
+            return {"parents": 0, "digests": 0, "events": 0, "dropped": 0}
+
+        frequencies = await self.rules_repo.get_digest_frequencies(list(pending))
+        digests = events_total = dropped = 0
+        for parent_id, since in pending.items():
+            frequency = DigestFrequency(
+                frequencies.get(parent_id) or settings.NOTIFICATION_DIGEST_DEFAULT_FREQUENCY
+            )
+            if frequency != DigestFrequency.OFF and now - since < PERIOD_SECONDS[frequency]:
+                continue
+            events = await self.buffer.take(parent_id)
+            if frequency == DigestFrequency.OFF or not events:
+                dropped += len(events)
+                continue
+            try:
+                await self.notification_service.send_notification(
+                    user_id=parent_id,
+                    type=NotificationType.DIGEST,
+                    message=build_digest_message(events, frequency),
+                    metadata={
+                        "frequency": frequency.value,
+                        "events": len(events),
+                        "from": events[0]["at"],
+                        "to": events[-1]["at"],
+                    },
+                )
+                await self.session.commit()
+            except Exception:
+                await self.session.rollback()
+                logger.warning("Сводка для родителя %s не записана, события возвращены в буфер", parent_id, exc_info=True)
+                await self.buffer.put_back(parent_id, events, since)
+                continue
+            digests += 1
+            events_total += len(events)
+        return {"parents": len(pending), "digests": digests, "events": events_total, "dropped": dropped}
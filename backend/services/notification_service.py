@@ -1,22 +1,23 @@
 """
 Сервис для работы с уведомлениями
 Согласно rules.md: бизнес-логика в services
+
+Уведомление ставится в очередь (outbox) в транзакции запроса; доставка - services/notification_delivery.py
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.notification_repository import NotificationRepository
 from typing import Optional
-from models.notification import NotificationType, NotificationStatus
-from schemas.notification import NotificationCreate
+from models.notification import NotificationType
 import json
 
 
 class NotificationService:
     """Сервис для работы с уведомлениями"""
-    
+
     def __init__(self, session: AsyncSession):
         self.notification_repo = NotificationRepository(session)
         self.session = session
-    
+
     async def send_notification(
         self,
         user_id: int,
@@ -28,25 +29,18 @@ class NotificationService:
         """
         Шаблонная функция для отправки уведомлений
         Согласно требованиям: логирование всех действий
+        Только запись PENDING (один INSERT): отправляют воркеры доставки после коммита запроса
         """
-        notification_data = {
+        notification_id = await self.notification_repo.enqueue({
             "user_id": user_id,
             "type": type,
             "message": message,
             "subscription_id": subscription_id,
-            "status": NotificationStatus.PENDING,
             "meta_data": json.dumps(metadata) if metadata else None
-        }
-        
-        notification = await self.notification_repo.create(notification_data)
-        
-        # Здесь можно добавить отправку через email/push/telegram
-        # Пока просто помечаем как отправленное
-        await self.notification_repo.update_status(notification, NotificationStatus.SENT)
-        
+        })
+
         return {
-            "id": notification.id,
-            "status": "sent",
-            "message": "Уведомление отправлено"
+            "id": notification_id,
+            "status": "pending",
+            "message": "Уведомление поставлено в очередь"
         }
-
@@ -0,0 +1,77 @@
+"""
+Сервис журнала копилки: контрольные точки баланса и сверка
+Согласно rules.md: бизнес-логика в services
+"""
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+from repositories.piggy_repository import PiggyRepository
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PiggyLedgerService:
+    """
+    Сервис журнала копилки
+    piggies.amount - кэш баланса для чтения за O(1) (GET /api/piggy читает только его);
+    источник истины - журнал piggy_history с периодическими снимками piggy_snapshots,
+    снимки создаёт и кэш сверяет ночная задача piggy_reconcile
+    """
+    
+    def __init__(self, session: AsyncSession):
+        self.piggy_repo = PiggyRepository(session)
+        self.session = session
+    
+    async def reconcile(self, fix: bool = False, snapshot: bool = True, batch_size: int = 500) -> dict:
+        """
+        Сверка piggies.amount с журналом по всем копилкам
+        fix=True - перезаписать кэш баланса значением из журнала
+        snapshot=True - заодно создать контрольные точки там, где накопился хвост
+        Каждая копилка проверяется под блокировкой строки (lock_balance): конкурентная операция
+        не выглядит расхождением, снимок не пропускает запись журнала с меньшим id, закоммиченную позже.
+        Коммит после каждой пачки - блокировки не копятся на всю сверку
+        """
+        checked = 0
+        snapshots_created = 0
+        drifts = []
+        after_id = 0
+        
+        while True:
+            batch = await self.piggy_repo.get_ids_batch(after_id, batch_size)
+            if not batch:
+                break
+            
+            for piggy_id, child_id in batch:
+                checked += 1
+                cached_amount = await self.piggy_repo.lock_balance(piggy_id)
+                ledger_balance, _, count, last_id = await self.piggy_repo.get_ledger_balance(piggy_id)
+                
+                if ledger_balance != cached_amount:
+                    drifts.append({
+                        "piggy_id": piggy_id,
+                        "child_id": child_id,
+                        "cached": cached_amount,
+                        "ledger": ledger_balance,
+                        "drift": cached_amount - ledger_balance
+                    })
+                    logger.warning(
+                        "Расхождение баланса копилки %s (ребёнок %s): кэш=%s, журнал=%s",
+                        piggy_id, child_id, cached_amount, ledger_balance
+                    )
+                    if fix:
+                        await self.piggy_repo.set_balance(piggy_id, ledger_balance)
+                
+                if snapshot and count and count >= settings.PIGGY_SNAPSHOT_INTERVAL:
+                    await self.piggy_repo.create_snapshot(piggy_id, ledger_balance, last_id, count)
+                    snapshots_created += 1
+            
+            after_id = batch[-1][0]
+            await self.session.commit()
+        
+        return {
+            "checked": checked,
+            "drifted": len(drifts),
+            "snapshots_created": snapshots_created,
+            "fixed": fix,
+            "drifts": drifts
+        }
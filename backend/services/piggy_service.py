@@ -2,12 +2,14 @@
 Сервис для работы с копилкой
 Согласно rules.md: бизнес-логика в services
 """
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.piggy_repository import PiggyRepository
 from repositories.child_repository import ChildRepository
 from schemas.piggy import PiggyGoalUpdate, PiggyAddRequest
 from models.piggy import Piggy
 from core.exceptions import NotFoundError
+from core.utils.pagination import decode_cursor, next_cursor
 from decimal import Decimal
 
 
@@ -27,6 +29,15 @@ class PiggyService:
         
         return await self.piggy_repo.get_or_create(child_id)
     
+    async def get_history(self, child_id: int, limit: int, cursor: Optional[str] = None) -> dict:
+        """Страница истории копилки (курсорная пагинация)"""
+        piggy = await self.get_piggy(child_id)
+        rows = await self.piggy_repo.get_history_page(piggy.id, limit, decode_cursor(cursor))
+        return {
+            "items": rows[:limit],
+            "next_cursor": next_cursor(rows, limit)
+        }
+    
     async def update_goal(self, child_id: int, goal_data: PiggyGoalUpdate) -> dict:
         """Обновление цели копилки"""
         piggy = await self.get_piggy(child_id)
@@ -42,13 +53,12 @@ class PiggyService:
         await self.session.refresh(piggy)
         return piggy
     
-    async def add_virtual_currency(self, child_id: int, request: PiggyAddRequest) -> Piggy:
+    async def add_virtual_currency(self, child_id: int, request: PiggyAddRequest) -> dict:
         """Добавление виртуальной валюты в копилку (для конвертации в подарки)"""
         piggy = await self.get_piggy(child_id)
-        piggy.amount += request.amount
         
-        await self.piggy_repo.add_history(
-            piggy.id,
+        entry = await self.piggy_repo.append_entry(
+            piggy,
             "add",
             request.amount,
             request.description
@@ -56,5 +66,8 @@ class PiggyService:
         
         await self.session.flush()
         await self.session.refresh(piggy)
-        return piggy
+        return {
+            "piggy": piggy,
+            "entry": entry
+        }
 
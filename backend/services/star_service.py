@@ -4,6 +4,7 @@
 """
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from repositories.star_repository import StarRepository
 from repositories.child_repository import ChildRepository
 from repositories.settings_repository import SettingsRepository
@@ -11,6 +12,7 @@ from repositories.piggy_repository import PiggyRepository
 from schemas.star import StarAddRequest, StarExchangeRequest
 from models.star import Star
 from core.exceptions import NotFoundError, ValidationError
+from core.utils.pagination import decode_cursor, next_cursor
 from decimal import Decimal
 import json
 from datetime import datetime, timedelta
@@ -34,7 +36,16 @@ class StarService:
         
         return await self.star_repo.get_or_create(child_id)
     
-    async def add_stars(self, child_id: int, request: StarAddRequest) -> Star:
+    async def get_history(self, child_id: int, limit: int, cursor: Optional[str] = None) -> dict:
+        """Страница истории звёзд (курсорная пагинация)"""
+        star = await self.get_stars(child_id)
+        rows = await self.star_repo.get_history_page(star.id, limit, decode_cursor(cursor))
+        return {
+            "items": rows[:limit],
+            "next_cursor": next_cursor(rows, limit)
+        }
+    
+    async def add_stars(self, child_id: int, request: StarAddRequest) -> dict:
         """Добавление звёзд"""
         star = await self.get_stars(child_id)
         
@@ -43,7 +54,7 @@ class StarService:
         star.total += request.stars
         
         # Добавляем в историю
-        await self.star_repo.add_history(star.id, request.description, request.stars)
+        entry = await self.star_repo.add_history(star.id, request.description, request.stars)
         
         await self.session.flush()
         await self.session.refresh(star)
@@ -53,48 +64,55 @@ class StarService:
         
         return {
             "star": star,
+            "entry": entry,
             "rewards": rewards
         }
     
-    async def exchange_stars(self, child_id: int, request: StarExchangeRequest) -> dict:
-        """Обмен звёзд на виртуальную валюту (для конвертации в подарки)"""
+    async def exchange_stars(
+        self,
+        child_id: int,
+        request: StarExchangeRequest,
+        idempotency_key: Optional[str] = None
+    ) -> dict:
+        """
+        Обмен звёзд на виртуальную валюту (для конвертации в подарки)
+        Выполняется одним SQL-выражением; повтор с тем же idempotency_key
+        возвращает исходный результат без повторного начисления
+        """
+        if idempotency_key:
+            # Точка сохранения: при гонке двух запросов с одним ключом уникальный
+            # индекс отклонит второе начисление, и мы вернём уже записанный результат
+            try:
+                async with self.session.begin_nested():
+                    result = await self.star_repo.exchange_to_piggy(child_id, request.stars, idempotency_key)
+            except IntegrityError:
+                result = await self.star_repo.exchange_to_piggy(child_id, request.stars, idempotency_key)
+        else:
+            result = await self.star_repo.exchange_to_piggy(child_id, request.stars)
+        
+        if result is None:
+            await self._raise_exchange_error(child_id, request)
+        
+        return {
+            "stars_used": result["stars_used"],
+            "virtual_currency": float(result["virtual_currency"]),
+            "remaining_stars": result["remaining_stars"],
+            "replayed": result["replayed"],
+            "note": "Виртуальная валюта может быть конвертирована в подарки по усмотрению родителей"
+        }
+    
+    async def _raise_exchange_error(self, child_id: int, request: StarExchangeRequest) -> None:
+        """Причина отказа в обмене (только для неуспешного пути)"""
         star = await self.get_stars(child_id)
         settings = await self.settings_repo.get_or_create(child_id)
         
         if star.today < request.stars:
             raise ValidationError("Недостаточно звёзд")
         
-        # Проверяем кратность
         if request.stars < settings.stars_to_money:
             raise ValidationError(f"Минимум {settings.stars_to_money} звёзд для обмена")
         
-        # Вычисляем количество виртуальной валюты (для конвертации в подарки)
-        exchanges = request.stars // settings.stars_to_money
-        stars_used = exchanges * settings.stars_to_money
-        virtual_currency = Decimal(exchanges) * settings.money_per_stars
-        
-        # Обновляем звёзды
-        star.today -= stars_used
-        await self.session.flush()
-        
-        # Добавляем виртуальную валюту в копилку (для конвертации в подарки)
-        piggy = await self.piggy_repo.get_or_create(child_id)
-        piggy.amount += virtual_currency
-        await self.piggy_repo.add_history(
-            piggy.id,
-            "exchange",
-            virtual_currency,
-            f"Обмен {stars_used} ⭐ на виртуальную валюту"
-        )
-        
-        await self.session.flush()
-        
-        return {
-            "stars_used": stars_used,
-            "virtual_currency": float(virtual_currency),
-            "remaining_stars": star.today,
-            "note": "Виртуальная валюта может быть конвертирована в подарки по усмотрению родителей"
-        }
+        raise ValidationError("Не удалось выполнить обмен, попробуйте ещё раз")
     
     async def check_streak(self, child_id: int) -> dict:
         """Проверка и обновление серии дней"""
@@ -177,9 +195,8 @@ class StarService:
         if streak.current in bonuses:
             bonus = bonuses[streak.current]
             piggy = await self.piggy_repo.get_or_create(star.child_id)
-            piggy.amount += bonus
-            await self.piggy_repo.add_history(
-                piggy.id,
+            await self.piggy_repo.append_entry(
+                piggy,
                 "streak",
                 bonus,
                 f"🔥 Виртуальный бонус за {streak.current} дней подряд (для конвертации в подарки)"
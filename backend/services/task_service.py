@@ -7,8 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.task_repository import TaskRepository
 from repositories.child_repository import ChildRepository
 from schemas.task import TaskCreate, TaskUpdate
-from models.task import Task, TaskType
+from models.child import Child
+from models.task import Task, TaskType, TaskStatus
 from core.exceptions import NotFoundError, ForbiddenError
+from services.notification_digest import TASK_DONE, record_activity
 
 
 class TaskService:
@@ -47,17 +49,28 @@ class TaskService:
         task_dict["child_id"] = child_id
         return await self.task_repo.create(task_dict)
     
-    async def update_task(self, task_id: int, child_id: int, task_data: TaskUpdate) -> Task:
-        """Обновление задачи"""
+    async def update_task(self, task_id: int, child: Child, task_data: TaskUpdate) -> Task:
+        """Обновление задачи (выполнение попадает в сводку активности для родителя)"""
         task = await self.task_repo.get_by_id(task_id)
         if not task:
             raise NotFoundError("Задача не найдена")
         
-        if task.child_id != child_id:
+        if task.child_id != child.id:
             raise ForbiddenError("Нет доступа к этой задаче")
         
+        was_done = self._is_done(task)
         update_dict = task_data.model_dump(exclude_unset=True)
-        return await self.task_repo.update(task, update_dict)
+        task = await self.task_repo.update(task, update_dict)
+        if not was_done and self._is_done(task):
+            # Событие в сводку - только после коммита: откат запроса не оставит его в буфере
+            await self.session.commit()
+            await record_activity(child, TASK_DONE, task.text)
+        return task
+    
+    @staticmethod
+    def _is_done(task: Task) -> bool:
+        """Задача выполнена: отмечена в чек-листе или перенесена в "done" канбана"""
+        return task.completed or task.status == TaskStatus.DONE
     
     async def delete_task(self, task_id: int, child_id: int) -> None:
         """Удаление задачи"""
@@ -0,0 +1,75 @@
+"""
+Бюджет SQL-запросов: маршрут с @query_budget через фикстуру query_budget (core/pytest_plugin.py)
+Приложение - минимальное FastAPI на SQLite в памяти: запросы считаются теми же событиями движка,
+что и в основном приложении (core.metrics.instrument_engine)
+"""
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.metrics import instrument_engine
+from core.query_budget import QueryBudgetExceeded, query_budget as route_budget
+
+pytestmark = pytest.mark.anyio
+
+engine = create_async_engine("sqlite+aiosqlite://")
+instrument_engine(engine)
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def get_session():
+    async with SessionLocal() as session:
+        yield session
+
+
+app = FastAPI()
+
+
+@app.get("/numbers")
+@route_budget(max_queries=3, max_repeats=2)
+async def numbers(count: int = 1, session: AsyncSession = Depends(get_session)):
+    """Один одинаковый по форме запрос на число: count > 2 - N+1 по бюджету маршрута"""
+    values = []
+    for n in range(count):
+        values.append((await session.execute(text("SELECT :n"), {"n": n})).scalar_one())
+    return {"numbers": values}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    # Первое подключение (инициализация диалекта) - вне бюджета тестов
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_route_within_budget(client, query_budget):
+    with query_budget(max_queries=3) as stats:
+        response = await client.get("/numbers", params={"count": 2})
+
+    assert response.status_code == 200
+    assert response.json() == {"numbers": [0, 1]}
+    assert stats.count == 2
+
+
+async def test_route_budget_raises_in_tests(client, query_budget):
+    # Плагин включает QUERY_BUDGET_MODE=raise: N+1 в маршруте - исключение, а не WARNING
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        with query_budget():
+            await client.get("/numbers", params={"count": 3})
+
+
+async def test_fixture_fails_block_over_budget(client, query_budget):
+    # Маршрут в своём бюджете, но блок теста ограничен строже
+    with pytest.raises(pytest.fail.Exception, match="Бюджет SQL-запросов превышен"):
+        with query_budget(max_queries=1):
+            await client.get("/numbers", params={"count": 2})
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Сборка фронтенда для продакшена: frontend/ -> frontend/dist/
+- JS и CSS получают имена с хэшем содержимого: src/js/api.js -> src/js/api.3f9c1a2b7e.js
+  (такие файлы отдаются с Cache-Control: immutable - backend/core/static_files.py)
+- ссылки на ассеты в HTML и JS (в том числе динамические script.src = '/src/js/...')
+  переписываются на хэшированные имена, ?v=N убирается
+- текстовые файлы сжимаются заранее: .gz (всегда) и .br (если установлен пакет brotli)
+- dist/asset-manifest.json - соответствие исходных и хэшированных путей
+
+Использование:
+    python3 frontend/build_assets.py [--out frontend/dist]
+Бэкенд (main.py) отдаёт dist/, если в нём есть index.html; иначе - исходники как есть
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него только gzip
+    brotli = None
+
+FRONTEND_DIR = Path(__file__).resolve().parent
+ASSET_DIRS = ("src", "static")
+FINGERPRINT_SUFFIXES = {".js", ".css"}
+COMPRESS_SUFFIXES = {".js", ".css", ".html", ".json", ".svg", ".txt"}
+COPY_SUFFIXES = {".html", ".json", ".ico", ".png", ".svg", ".webmanifest"}
+HASH_LENGTH = 10
+
+# Ссылка на ассет в кавычках или url(): "src/js/api.js?v=4", '/src/js/parent.js', url(static/css/a.css)
+ASSET_REF_RE = re.compile(r"""(?P<prefix>["'(])(?P<slash>/?)(?P<path>(?:src|static)/[\w./-]+\.(?:js|css))(?P<version>\?v=\d+)?""")
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest}{dot}{suffix}"
+
+
+def rewrite_refs(text: str, mapping: Dict[str, str]) -> str:
+    """Замена ссылок на ассеты хэшированными путями (неизвестные пути остаются как есть)"""
+    def replace(match: re.Match) -> str:
+        target = mapping.get(match["path"])
+        if target is None:
+            return match.group(0)
+        return f"{match['prefix']}{match['slash']}{target}"
+    return ASSET_REF_RE.sub(replace, text)
+
+
+def asset_refs(text: str) -> set:
+    return {match["path"] for match in ASSET_REF_RE.finditer(text)}
+
+
+def fingerprint_assets(source: Path) -> Dict[str, Tuple[str, bytes]]:
+    """
+    Содержимое ассетов с переписанными ссылками и хэшированными именами: {исходный путь: (новый путь, байты)}
+    Файл хэшируется после того, как хэшированы все ассеты, на которые он ссылается
+    (иначе изменение зависимости не меняло бы его имя)
+    """
+    pending = {}
+    for directory in ASSET_DIRS:
+        for file in sorted((source / directory).rglob("*")):
+            if file.is_file() and file.suffix in FINGERPRINT_SUFFIXES:
+                pending[file.relative_to(source).as_posix()] = file.read_text(encoding="utf-8")
+
+    mapping: Dict[str, str] = {}
+    built = {}
+    while pending:
+        ready = [
+            path for path, text in pending.items()
+            if all(ref in mapping or ref not in pending or ref == path for ref in asset_refs(text))
+        ]
+        if not ready:
+            raise RuntimeError(f"Циклические ссылки между ассетами: {', '.join(sorted(pending))}")
+        for path in ready:
+            content = rewrite_refs(pending.pop(path), mapping).encode("utf-8")
+            mapping[path] = fingerprinted_name(path, content)
+            built[path] = (mapping[path], content)
+    return built
+
+
+def write_with_variants(path: Path, content: bytes) -> None:
+    """Файл и его сжатые варианты (только если они меньше)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if path.suffix not in COMPRESS_SUFFIXES:
+        return
+    gz = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(gz) < len(content):
+        path.with_name(path.name + ".gz").write_bytes(gz)
+    if brotli is not None:
+        br = brotli.compress(content, quality=11)
+        if len(br) < len(content):
+            path.with_name(path.name + ".br").write_bytes(br)
+
+
+def build(source: Path, out: Path) -> Dict[str, str]:
+    if out.exists():
+        shutil.rmtree(out)
+
+    assets = fingerprint_assets(source)
+    mapping = {path: target for path, (target, _) in assets.items()}
+    for path, (target, content) in assets.items():
+        write_with_variants(out / target, content)
+        # Исходное имя тоже доступно (внешние ссылки), но без долгого кэширования
+        write_with_variants(out / path, content)
+
+    # Прочие файлы из каталогов ассетов (изображения, шрифты) - без изменений
+    for directory in ASSET_DIRS:
+        for file in sorted((source / directory).rglob("*")):
+            relative = file.relative_to(source).as_posix()
+            if file.is_file() and relative not in assets:
+                write_with_variants(out / relative, file.read_bytes())
+
+    # Страницы верхнего уровня и manifest.json
+    for file in sorted(source.iterdir()):
+        if file.is_file() and file.suffix in COPY_SUFFIXES:
+            content = file.read_bytes()
+            if file.suffix == ".html":
+                content = rewrite_refs(content.decode("utf-8"), mapping).encode("utf-8")
+            write_with_variants(out / file.name, content)
+
+    (out / "asset-manifest.json").write_text(json.dumps(mapping, indent=2, sort_keys=True), encoding="utf-8")
+    return mapping
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Сборка фронтенда: хэшированные имена и предварительное сжатие")
+    parser.add_argument("--out", type=Path, default=FRONTEND_DIR / "dist", help="каталог сборки")
+    args = parser.parse_args()
+
+    mapping = build(FRONTEND_DIR, args.out.resolve())
+    print(f"✅ Ассетов с хэшем: {len(mapping)} -> {args.out}")
+    if brotli is None:
+        print("⚠️  Пакет brotli не установлен: собраны только .gz")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
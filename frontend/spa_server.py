@@ -1,145 +1,158 @@
 #!/usr/bin/env python3
-"""SPA сервер для фронтенда с поддержкой клиентского роутинга и проксированием API"""
-import http.server
-import socketserver
-from urllib.parse import urlparse, urlunparse
+"""
+SPA сервер для фронтенда с поддержкой клиентского роутинга и проксированием API (staging, локальная разработка)
+- асинхронный (uvicorn + Starlette): соединения обслуживаются конкурентно в одном event loop
+- /api, /media (аватары), /health, /ready и /metrics проксируются на BACKEND_URL через пул
+  keep-alive соединений httpx; тела запроса и ответа передаются потоком, без буферизации целиком
+- остальные пути: файл, если он есть, иначе index.html (SPA fallback); /staff* - страницы staff
+
+Зависимости - из backend/requirements.txt (uvicorn, starlette, httpx)
+Использование:
+    BACKEND_URL=http://localhost:8000 PORT=3000 python3 frontend/spa_server.py
+"""
 import os
-import urllib.request
-import json
-
-BACKEND_URL = "http://localhost:8000"
-
-class SPAHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        # CORS headers для проксирования API
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, PATCH, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-CSRF-Token')
-        super().end_headers()
-    
-    def do_OPTIONS(self):
-        """Обработка preflight запросов CORS"""
-        self.send_response(200)
-        self.end_headers()
-    
-    def proxy_request(self, method):
-        """Проксирование запроса на backend"""
-        try:
-            # Формируем URL для backend
-            backend_url = f"{BACKEND_URL}{self.path}"
-            if self.path.startswith('/api'):
-                # Убираем /api из пути, так как backend уже имеет префикс /api
-                backend_url = f"{BACKEND_URL}{self.path}"
-            
-            # Получаем заголовки
-            headers = {}
-            for key, value in self.headers.items():
-                if key.lower() not in ['host', 'connection']:
-                    headers[key] = value
-            
-            # Получаем тело запроса
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length) if content_length > 0 else None
-            
-            # Создаём запрос
-            req = urllib.request.Request(backend_url, data=body, headers=headers, method=method)
-            
-            # Выполняем запрос
-            with urllib.request.urlopen(req, timeout=30) as response:
-                # Отправляем статус
-                self.send_response(response.getcode())
-                
-                # Копируем заголовки (кроме некоторых)
-                for header, value in response.headers.items():
-                    if header.lower() not in ['connection', 'transfer-encoding']:
-                        self.send_header(header, value)
-                
-                self.end_headers()
-                
-                # Копируем тело ответа
-                self.wfile.write(response.read())
-        except urllib.error.HTTPError as e:
-            self.send_response(e.code)
-            self.end_headers()
-            self.wfile.write(e.read())
-        except Exception as e:
-            self.send_error(502, f"Proxy error: {str(e)}")
-    
-    def do_GET(self):
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # Проксируем API запросы на backend
-        if path.startswith('/api'):
-            self.proxy_request('GET')
-            return
-        
-        # Специальная обработка для staff страниц
-        if path == '/staff/login' or path == '/staff':
-            staff_html_path = os.path.join(os.getcwd(), 'staff.html')
-            if os.path.exists(staff_html_path):
-                self.path = '/staff.html'
-                return super().do_GET()
-        if path == '/staff/dashboard' or path == '/staff-dashboard.html':
-            staff_dashboard_path = os.path.join(os.getcwd(), 'staff-dashboard.html')
-            if os.path.exists(staff_dashboard_path):
-                self.path = '/staff-dashboard.html'
-                return super().do_GET()
-        
-        # Если запрашивается файл (с расширением) - отдаём как есть
-        if '.' in os.path.basename(path) and path != '/':
-            if os.path.exists('.' + path):
-                return super().do_GET()
-        
-        # Для всех остальных маршрутов отдаём index.html (SPA fallback)
-        if os.path.exists('./index.html'):
-            self.path = '/index.html'
-            return super().do_GET()
-        else:
-            self.send_error(404, "File not found")
-    
-    def do_POST(self):
-        if self.path.startswith('/api'):
-            self.proxy_request('POST')
-        else:
-            self.send_error(404, "Not found")
-    
-    def do_PUT(self):
-        if self.path.startswith('/api'):
-            self.proxy_request('PUT')
-        else:
-            self.send_error(404, "Not found")
-    
-    def do_DELETE(self):
-        if self.path.startswith('/api'):
-            self.proxy_request('DELETE')
-        else:
-            self.send_error(404, "Not found")
-    
-    def do_PATCH(self):
-        if self.path.startswith('/api'):
-            self.proxy_request('PATCH')
-        else:
-            self.send_error(404, "Not found")
-
-if __name__ == '__main__':
-    PORT = 3000
-    os.chdir('/Users/evgeniypomytkin/Вика/frontend')
-    
-    with socketserver.TCPServer(("", PORT), SPAHandler) as httpd:
-        print(f"🚀 Frontend сервер запущен на http://localhost:{PORT}")
-        print(f"📁 Рабочая директория: {os.getcwd()}")
-        print(f"✅ SPA роутинг включен - все маршруты ведут на index.html")
-        print(f"\n📌 Ссылки:")
-        print(f"   - Product: http://localhost:{PORT}")
-        print(f"   - Staff Login: http://localhost:{PORT}/staff/login")
-        print(f"   (Нажмите Ctrl+C для остановки)\n")
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n✅ Сервер остановлен")
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000")
+PORT = int(os.environ.get("PORT", "3000"))
+PROXY_MAX_CONNECTIONS = int(os.environ.get("PROXY_MAX_CONNECTIONS", "100"))
+PROXY_MAX_KEEPALIVE = int(os.environ.get("PROXY_MAX_KEEPALIVE", "20"))
+
+# Собранный фронтенд (python3 build_assets.py), если есть
+FRONTEND_DIR = Path(__file__).resolve().parent
+if (FRONTEND_DIR / "dist" / "index.html").exists():
+    FRONTEND_DIR = FRONTEND_DIR / "dist"
+
+# Имя с хэшем содержимого из build_assets.py: api.3f9c1a2b7e.js
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+IMMUTABLE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+NO_CACHE_HEADERS = {"Cache-Control": "no-cache, no-store, must-revalidate", "Pragma": "no-cache", "Expires": "0"}
+
+PAGE_ROUTES = {
+    "/staff": "staff.html",
+    "/staff/login": "staff.html",
+    "/staff/dashboard": "staff-dashboard.html",
+    "/staff-dashboard.html": "staff-dashboard.html",
+}
+
+# Заголовки соединения (RFC 9110, 7.6.1) не передаются через прокси; host выставляет httpx
+HOP_BY_HOP_HEADERS = frozenset({
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"host",
+})
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    app.state.client = httpx.AsyncClient(
+        base_url=BACKEND_URL,
+        limits=httpx.Limits(max_connections=PROXY_MAX_CONNECTIONS, max_keepalive_connections=PROXY_MAX_KEEPALIVE),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+    try:
+        yield
+    finally:
+        await app.state.client.aclose()
+
+
+async def proxy(request: Request) -> Response:
+    """Проксирование запроса на backend"""
+    client: httpx.AsyncClient = request.app.state.client
+    headers = [(key, value) for key, value in request.headers.raw if key.lower() not in HOP_BY_HOP_HEADERS]
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    backend_request = client.build_request(
+        request.method,
+        httpx.URL(path=request.url.path, query=request.url.query.encode("utf-8")),
+        headers=headers,
+        content=request.stream() if has_body else None,
+    )
+    try:
+        backend_response = await client.send(backend_request, stream=True)
+    except httpx.HTTPError as e:
+        return PlainTextResponse(f"Proxy error: {e}", status_code=502)
+
+    # Тело как есть (aiter_raw: без распаковки, Content-Encoding и Content-Length остаются верными)
+    response = StreamingResponse(
+        backend_response.aiter_raw(),
+        status_code=backend_response.status_code,
+        background=BackgroundTask(backend_response.aclose),
+    )
+    # raw_headers: повторяющиеся заголовки (несколько Set-Cookie) сохраняются
+    response.raw_headers = [
+        (key, value) for key, value in backend_response.headers.raw if key.lower() not in HOP_BY_HOP_HEADERS
+    ]
+    return response
+
+
+def _file(path: Path, url_path: str) -> FileResponse:
+    headers = IMMUTABLE_HEADERS if FINGERPRINT_RE.search(url_path) else NO_CACHE_HEADERS
+    return FileResponse(path, headers=headers)
+
+
+async def spa(request: Request) -> Response:
+    """Файл, если он есть, иначе index.html (SPA fallback)"""
+    path = request.url.path
+    if request.method not in ("GET", "HEAD"):
+        return PlainTextResponse("Not found", status_code=404)
+
+    if path in PAGE_ROUTES and (FRONTEND_DIR / PAGE_ROUTES[path]).is_file():
+        return _file(FRONTEND_DIR / PAGE_ROUTES[path], path)
+
+    # Если запрашивается файл (с расширением) - отдаём как есть
+    if "." in os.path.basename(path):
+        candidate = (FRONTEND_DIR / path.lstrip("/")).resolve()
+        if candidate.is_relative_to(FRONTEND_DIR) and candidate.is_file():
+            return _file(candidate, path)
+
+    index = FRONTEND_DIR / "index.html"
+    if index.is_file():
+        return _file(index, "/index.html")
+    return PlainTextResponse("File not found", status_code=404)
+
+
+PROXY_METHODS = ["GET", "HEAD", "POST", "PUT", "DELETE", "PATCH"]
+# Пути backend: API, загруженные файлы (/media/avatars/<sha>/<size>.webp) и служебные endpoints
+PROXY_PREFIXES = ("/api", "/media")
+PROXY_PATHS = ("/health", "/ready", "/metrics")
+
+app = Starlette(
+    routes=[
+        *(Route(f"{prefix}/{{path:path}}", proxy, methods=PROXY_METHODS) for prefix in PROXY_PREFIXES),
+        *(Route(path, proxy, methods=PROXY_METHODS) for path in (*PROXY_PREFIXES, *PROXY_PATHS)),
+        Route("/{path:path}", spa, methods=PROXY_METHODS),
+    ],
+    middleware=[
+        # CORS headers для проксирования API (preflight OPTIONS отвечает middleware)
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+            allow_headers=["Content-Type", "Authorization", "X-CSRF-Token", "Idempotency-Key"],
+        ),
+    ],
+    lifespan=lifespan,
+)
 
 
+if __name__ == "__main__":
+    print(f"🚀 Frontend сервер запущен на http://localhost:{PORT}")
+    print(f"📁 Каталог: {FRONTEND_DIR}")
+    print(f"🔁 API и /media проксируются на {BACKEND_URL} (пул до {PROXY_MAX_CONNECTIONS} соединений)")
+    print(f"✅ SPA роутинг включен - все маршруты ведут на index.html")
+    print(f"\n📌 Ссылки:")
+    print(f"   - Product: http://localhost:{PORT}")
+    print(f"   - Staff Login: http://localhost:{PORT}/staff/login")
+    print(f"   (Нажмите Ctrl+C для остановки)\n")
+    uvicorn.run(app, host="0.0.0.0", port=PORT, log_level="info")
@@ -251,6 +251,15 @@ class ApiClient {
     return this.put(`/children/${childId}`, childData);
   }
 
+  // Аватар уходит телом запроса как есть (сервер читает поток и сам делает превью)
+  async uploadChildAvatar(childId, file) {
+    return this.request(`/children/${childId}/avatar`, {
+      method: 'PUT',
+      headers: { 'Content-Type': file.type || 'application/octet-stream' },
+      body: file,
+    });
+  }
+
   async generateChildAccess(childId) {
     return this.post(`/children/${childId}/generate-access`);
   }
@@ -281,6 +290,12 @@ class ApiClient {
     return this.get('/stars/');
   }
 
+  async getStarsHistory(cursor = null, limit = 20) {
+    const params = new URLSearchParams({ limit });
+    if (cursor) params.set('cursor', cursor);
+    return this.get(`/stars/history?${params}`);
+  }
+
   async addStars(description, stars) {
     return this.post('/stars/add', { description, stars });
   }
@@ -298,6 +313,12 @@ class ApiClient {
     return this.get('/piggy/');
   }
 
+  async getPiggyHistory(cursor = null, limit = 20) {
+    const params = new URLSearchParams({ limit });
+    if (cursor) params.set('cursor', cursor);
+    return this.get(`/piggy/history?${params}`);
+  }
+
   async updatePiggyGoal(name, amount) {
     return this.put('/piggy/goal', { name, amount });
   }
@@ -325,8 +346,20 @@ class ApiClient {
   }
 
   // Дневник
-  async getDiaryEntries() {
-    return this.get('/diary/');
+  async getDiaryEntries(cursor = null, limit = 20) {
+    const params = new URLSearchParams({ limit });
+    if (cursor) params.set('cursor', cursor);
+    return this.get(`/diary/?${params}`);
+  }
+
+  async getDiaryEntry(entryId) {
+    return this.get(`/diary/${entryId}`);
+  }
+
+  async searchDiaryEntries(query, cursor = null, limit = 20) {
+    const params = new URLSearchParams({ q: query, limit });
+    if (cursor) params.set('cursor', cursor);
+    return this.get(`/diary/search?${params}`);
   }
 
   async createDiaryEntry(title, content) {
@@ -376,11 +409,13 @@ class ApiClient {
     return this.get('/subscription/');
   }
 
-  async createParentConsent(childId, consentGiven, ipAddress = null, userAgent = null) {
+  // documentHash - sha256 показанной версии политики (getPrivacy().sha256)
+  async createParentConsent(childId, consentGiven, ipAddress = null, userAgent = null, documentHash = null) {
     const payload = {
       child_id: childId,
       consent_given: consentGiven
     };
+    if (documentHash) payload.document_hash = documentHash;
     if (ipAddress) payload.ip_address = ipAddress;
     if (userAgent) payload.user_agent = userAgent;
     return this.post('/subscription/consent', payload);
@@ -252,7 +252,7 @@ function renderChildrenModalList() {
       width: 56px;
       height: 56px;
       border-radius: 50%;
-      background: ${child.avatar || getDefaultAvatar(child.gender)};
+      background: ${child.avatar ? `url(${child.avatar}) center / cover` : getDefaultAvatar(child.gender)};
       flex-shrink: 0;
       display: flex;
       align-items: center;
@@ -843,25 +843,37 @@ function onSettingsGenderChange() {
 /**
  * Обработка загрузки аватара в настройках
  */
-function onSettingsAvatarUpload(event) {
-  const file = event.target.files[0];
+async function onSettingsAvatarUpload(event) {
+  const input = event.target;
+  const file = input.files[0];
   if (!file) return;
   
   // Проверяем тип файла
   if (!file.type.startsWith('image/')) {
     alert('Пожалуйста, выберите изображение');
+    input.value = '';
     return;
   }
   
   // Проверяем размер файла (макс 5MB)
   if (file.size > 5 * 1024 * 1024) {
     alert('Размер файла не должен превышать 5MB');
+    input.value = '';
     return;
   }
   
+  const form = document.getElementById('child-settings-form');
+  const childId = form ? form.dataset.childId : null;
+  if (!childId) {
+    console.error('❌ ID ребенка не найден');
+    return;
+  }
+  
+  const avatarPreview = document.getElementById('child-settings-avatar-preview');
+  const previousBackground = avatarPreview ? avatarPreview.style.background : '';
+  
   const reader = new FileReader();
   reader.onload = (e) => {
-    const avatarPreview = document.getElementById('child-settings-avatar-preview');
     if (avatarPreview) {
       avatarPreview.style.backgroundImage = `url(${e.target.result})`;
       avatarPreview.style.backgroundSize = 'cover';
@@ -870,8 +882,26 @@ function onSettingsAvatarUpload(event) {
   };
   reader.readAsDataURL(file);
   
-  // TODO: Загрузка аватара на сервер будет реализована позже
-  console.log('📸 Аватар выбран, но загрузка на сервер еще не реализована');
+  try {
+    console.log('📸 Загрузка аватара ребенка:', childId);
+    const updatedChild = await apiClient.uploadChildAvatar(childId, file);
+    console.log('✅ Аватар загружен');
+    
+    // Превью с сервера (WebP), список детей - с новым аватаром
+    if (avatarPreview && updatedChild.avatar) {
+      avatarPreview.style.backgroundImage = `url(${updatedChild.avatar})`;
+    }
+    await loadChildrenForModal();
+  } catch (error) {
+    console.error('❌ Ошибка загрузки аватара:', error);
+    if (avatarPreview) {
+      avatarPreview.style.background = previousBackground;
+    }
+    alert(`Ошибка загрузки аватара: ${error.message || 'Неизвестная ошибка'}`);
+  } finally {
+    // Повторный выбор того же файла снова вызовет onchange
+    input.value = '';
+  }
 }
 
 /**
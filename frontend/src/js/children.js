@@ -75,7 +75,7 @@ function renderChildrenList() {
       width: 60px;
       height: 60px;
       border-radius: 50%;
-      background: ${child.avatar || getDefaultAvatar(child.gender)};
+      background: ${child.avatar ? `url(${child.avatar})` : getDefaultAvatar(child.gender)};
       background-size: cover;
       background-position: center;
       border: 2px solid var(--border-color);
@@ -239,23 +239,14 @@ async function createChild(event) {
     return;
   }
   
-  // Получаем аватар (если загружен)
-  let avatar = null;
+  // Аватар (если выбран) загружается после создания ребенка
   const avatarInput = form.querySelector('#child-avatar-input');
-  if (avatarInput && avatarInput.files[0]) {
-    const file = avatarInput.files[0];
-    const reader = new FileReader();
-    avatar = await new Promise((resolve) => {
-      reader.onload = (e) => resolve(e.target.result);
-      reader.readAsDataURL(file);
-    });
-  }
+  const avatarFile = avatarInput && avatarInput.files[0] ? avatarInput.files[0] : null;
   
   try {
     const childData = {
       name: name,
-      gender: gender,
-      avatar: avatar
+      gender: gender
     };
     
     console.log('📤 Создание ребенка:', childData);
@@ -272,6 +263,15 @@ async function createChild(event) {
       throw new Error('Ребенок создан, но ID не получен. Попробуйте обновить страницу.');
     }
     
+    if (avatarFile) {
+      try {
+        await apiClient.uploadChildAvatar(child.id, avatarFile);
+      } catch (avatarError) {
+        console.error('❌ Ошибка загрузки аватара:', avatarError);
+        alert('Ребенок создан, но аватар не загрузился: ' + avatarError.message);
+      }
+    }
+    
     // Обновляем список
     await loadChildren();
     renderChildrenList();